@@ -0,0 +1,150 @@
+"""Barridos de parámetros y conjuntos de réplicas en paralelo.
+
+Cada ejecución construye su propio ecosistema a partir de una Configuracion
+(y no de las constantes del módulo dinos), así que los procesos trabajadores
+solo reciben un diccionario de cambios, una semilla y el número de turnos.
+"""
+import csv
+import itertools
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields, replace
+
+from dinos import CONFIG_POR_DEFECTO, Configuracion, crear_ecosistema, poblar_inicial
+
+ESPECIES = ("plantas", "herbivoros", "carnivoros", "omnivoros", "peces")
+# Solo los parámetros enteros se pueden barrer (el terreno se fija para todo el barrido)
+PARAMETROS = tuple(campo.name for campo in fields(Configuracion) if campo.type is int)
+
+def _validar(nombres):
+    desconocidos = [n for n in nombres if n not in PARAMETROS]
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(desconocidos)} (válidos: {', '.join(PARAMETROS)})")
+
+def combinaciones_rejilla(valores):
+    """Producto cartesiano de {parámetro: [valores]} como lista de diccionarios de cambios."""
+    _validar(valores)
+    nombres = list(valores)
+    return [dict(zip(nombres, combinacion)) for combinacion in itertools.product(*(valores[n] for n in nombres))]
+
+def combinaciones_aleatorias(rangos, n, semilla=None):
+    """`n` combinaciones con cada parámetro entero uniforme en su rango {parámetro: (mín, máx)}."""
+    _validar(rangos)
+    rng = random.Random(semilla)
+    return [{nombre: rng.randint(minimo, maximo) for nombre, (minimo, maximo) in rangos.items()} for _ in range(n)]
+
+def simular(cambios, semilla, turnos, motor="objetos"):
+    """Ejecuta una simulación completa y devuelve su resumen (se ejecuta en un proceso trabajador)."""
+    config = replace(CONFIG_POR_DEFECTO, **cambios)
+    ecosistema = crear_ecosistema(motor, semilla, config)
+    poblar_inicial(ecosistema)
+
+    sumas = dict.fromkeys(ESPECIES, 0)
+    extincion = {}
+    conteos = ecosistema.conteos()
+    for _ in range(turnos):
+        ecosistema.simular_turno()
+        conteos = ecosistema.conteos()
+        for especie in ESPECIES:
+            sumas[especie] += conteos[especie]
+            if conteos[especie] == 0 and especie not in extincion:
+                extincion[especie] = ecosistema.turno
+
+    return {
+        "parametros": cambios,
+        "semilla": semilla,
+        "turnos": ecosistema.turno,
+        "final": conteos,
+        "media": {especie: sumas[especie] / max(turnos, 1) for especie in ESPECIES},
+        "extincion": extincion,
+    }
+
+def barrer(combinaciones, semillas, turnos, motor="objetos", procesos=None):
+    """Lanza cada (combinación, semilla) en un ProcessPoolExecutor y produce los resultados según terminan."""
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [
+            pool.submit(simular, cambios, semilla, turnos, motor)
+            for cambios in combinaciones
+            for semilla in semillas
+        ]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+def resumir(resultados):
+    """Agrupa los resultados por combinación: ejecuciones, tasa de extinción y población media por especie."""
+    grupos = {}
+    for resultado in resultados:
+        clave = tuple(sorted(resultado["parametros"].items()))
+        grupos.setdefault(clave, []).append(resultado)
+
+    filas = []
+    for clave, grupo in grupos.items():
+        fila = dict(clave)
+        fila["ejecuciones"] = len(grupo)
+        for especie in ESPECIES:
+            fila[f"extincion_{especie}"] = sum(especie in r["extincion"] for r in grupo) / len(grupo)
+            fila[f"media_{especie}"] = sum(r["media"][especie] for r in grupo) / len(grupo)
+        filas.append(fila)
+    return filas
+
+def escribir_tabla(filas, salida):
+    if not filas:
+        return
+    escritor = csv.DictWriter(salida, fieldnames=list(filas[0]))
+    escritor.writeheader()
+    for fila in filas:
+        escritor.writerow({k: round(v, 3) if isinstance(v, float) else v for k, v in fila.items()})
+
+# --- Lectura de argumentos de la línea de comandos ---
+def leer_rejilla(textos):
+    """["max_herbivoros=20,40", ...] -> {"max_herbivoros": [20, 40], ...}"""
+    valores = {}
+    for texto in textos:
+        nombre, _, lista = texto.partition("=")
+        valores[nombre.strip()] = [int(v) for v in lista.split(",") if v.strip()]
+    return valores
+
+def leer_rangos(textos):
+    """["max_herbivoros=20:60", ...] -> {"max_herbivoros": (20, 60), ...}"""
+    rangos = {}
+    for texto in textos:
+        nombre, _, rango = texto.partition("=")
+        minimo, _, maximo = rango.partition(":")
+        rangos[nombre.strip()] = (int(minimo), int(maximo))
+    return rangos
+
+def leer_semillas(texto):
+    """"1,2,5" o "0-9" -> lista de semillas."""
+    semillas = []
+    for parte in texto.split(","):
+        inicio, guion, fin = parte.partition("-")
+        if guion:
+            semillas.extend(range(int(inicio), int(fin) + 1))
+        elif parte.strip():
+            semillas.append(int(parte))
+    return semillas
+
+def ejecutar_barrido(args):
+    """Subcomando `sweep`: muestra cada ejecución al terminar y escribe la tabla agregada."""
+    if args.sample:
+        combinaciones = combinaciones_aleatorias(leer_rangos(args.range), args.sample, args.sample_seed)
+    else:
+        combinaciones = combinaciones_rejilla(leer_rejilla(args.grid))
+    semillas = leer_semillas(args.seeds)
+    total = len(combinaciones) * len(semillas)
+
+    resultados = []
+    for resultado in barrer(combinaciones, semillas, args.turns, args.motor, args.workers):
+        resultados.append(resultado)
+        extintas = ",".join(sorted(resultado["extincion"])) or "-"
+        print(f"[{len(resultados)}/{total}] {resultado['parametros']} semilla={resultado['semilla']} "
+              f"final={resultado['final']} extintas={extintas}", file=sys.stderr)
+
+    filas = resumir(resultados)
+    if args.output:
+        with open(args.output, "w", newline="") as salida:
+            escribir_tabla(filas, salida)
+    else:
+        escribir_tabla(filas, sys.stdout)
+    return filas
@@ -0,0 +1,214 @@
+"""Pruebas de rendimiento con semillas fijas y resultados comparables entre commits.
+
+Cada medida es una entrada {"valor", "unidad", "mayor_es_mejor"} bajo un
+nombre estable (p. ej. "turnos_s/plantas=2000"), así que dos archivos JSON de
+resultados se comparan nombre a nombre con comparar(). Se mide:
+
+- turnos por segundo y ms por turno con la población de plantas fijada en cada
+  nivel (plantas iniciales = límite de plantas) y los animales con sus límites;
+- memoria pico (tracemalloc) de una ejecución corta en cada nivel;
+- el coste por consulta de is_in_lake y de las búsquedas de comida, pareja y
+  presa en las rejillas espaciales del motor de objetos;
+- el tiempo de pintar un cuadro en un wx.MemoryDC (solo si wxPython está
+  instalado y puede abrir una aplicación).
+"""
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+from dinos import (
+    CONFIG_POR_DEFECTO,
+    Planta, Herbivoro,
+    crear_ecosistema, is_in_lake, poblar_inicial,
+)
+
+NIVELES_PLANTAS = (500, 2000, 5000, 10000)
+SEMILLA = 12345
+CONSULTAS = 20000
+CALENTAMIENTO = 20
+
+def _medida(valor, unidad, mayor_es_mejor=False):
+    return {"valor": valor, "unidad": unidad, "mayor_es_mejor": mayor_es_mejor}
+
+def _ecosistema(plantas, motor="objetos", modelo_plantas="objetos"):
+    """Ecosistema con semilla fija cuya población de plantas se mantiene en torno a `plantas`."""
+    config = replace(CONFIG_POR_DEFECTO, plantas_iniciales=plantas, max_plantas=plantas, dispersion_plantas=True)
+    ecosistema = crear_ecosistema(motor, SEMILLA, config, modelo_plantas)
+    poblar_inicial(ecosistema)
+    return ecosistema
+
+def _puntos(n, semilla=SEMILLA):
+    rng = random.Random(semilla)
+    return [(rng.uniform(0, 480), rng.uniform(0, 380)) for _ in range(n)]
+
+def _por_consulta(funcion, puntos):
+    """Microsegundos por llamada a funcion(x, y) sobre `puntos`."""
+    inicio = time.perf_counter()
+    for x, y in puntos:
+        funcion(x, y)
+    return (time.perf_counter() - inicio) / len(puntos) * 1e6
+
+# --- Simulación ---
+def medir_turnos(plantas, turnos, motor="objetos", modelo_plantas="objetos"):
+    """Turnos por segundo y percentiles del tiempo por turno tras CALENTAMIENTO turnos."""
+    ecosistema = _ecosistema(plantas, motor, modelo_plantas)
+    for _ in range(CALENTAMIENTO):
+        ecosistema.simular_turno()
+    tiempos = []
+    for _ in range(turnos):
+        inicio = time.perf_counter()
+        ecosistema.simular_turno()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return {
+        f"turnos_s/plantas={plantas}": _medida(turnos / sum(tiempos), "turnos/s", True),
+        f"turno_ms_p50/plantas={plantas}": _medida(tiempos[len(tiempos) // 2] * 1000, "ms"),
+        f"turno_ms_p90/plantas={plantas}": _medida(tiempos[len(tiempos) * 9 // 10] * 1000, "ms"),
+    }
+
+def medir_memoria_pico(plantas, turnos, motor="objetos", modelo_plantas="objetos"):
+    """Memoria pico de crear el ecosistema y simular `turnos` turnos (medida aparte: tracemalloc ralentiza)."""
+    tracemalloc.start()
+    ecosistema = _ecosistema(plantas, motor, modelo_plantas)
+    for _ in range(turnos):
+        ecosistema.simular_turno()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {f"memoria_pico_mb/plantas={plantas}": _medida(pico / 2 ** 20, "MiB")}
+
+# --- Consultas aisladas ---
+def medir_lago(consultas=CONSULTAS):
+    return {"is_in_lake": _medida(_por_consulta(is_in_lake, _puntos(consultas)) * 1000, "ns/consulta")}
+
+def medir_busquedas(plantas, consultas=CONSULTAS):
+    """Búsquedas de las rejillas espaciales con los radios de comer, buscar pareja y cazar.
+
+    La de comida recorre los mismos vecinos que consumir_cercano pero sin
+    consumir nada, para que todas las consultas vean la misma población.
+    """
+    ecosistema = _ecosistema(plantas)
+    for _ in range(CALENTAMIENTO):
+        ecosistema.simular_turno()
+    rejilla_plantas = ecosistema.rejillas[Planta]
+    herbivoros = ecosistema.rejillas[Herbivoro]
+    puntos = _puntos(consultas, SEMILLA + 1)
+    return {
+        f"busqueda_comida_us/plantas={plantas}": _medida(
+            _por_consulta(lambda x, y: rejilla_plantas.vecinos(x, y, 30), puntos), "us/consulta"),
+        f"busqueda_pareja_us/plantas={plantas}": _medida(
+            _por_consulta(lambda x, y: herbivoros.vecinos(x, y, 28), puntos), "us/consulta"),
+        f"busqueda_presa_us/plantas={plantas}": _medida(
+            _por_consulta(lambda x, y: herbivoros.vecinos(x, y, 18), puntos), "us/consulta"),
+    }
+
+# --- Dibujo ---
+def medir_pintado(plantas, cuadros=50, motor="objetos", modelo_plantas="objetos"):
+    """ms por cuadro de CapaDibujo sobre un wx.MemoryDC; {} si wxPython no está disponible."""
+    try:
+        import wx
+    except ImportError:
+        return {}
+    from vista import CapaDibujo
+
+    aplicacion = wx.App(False)
+    ecosistema = _ecosistema(plantas, motor, modelo_plantas)
+    for _ in range(CALENTAMIENTO):
+        ecosistema.simular_turno()
+    capa = CapaDibujo(ecosistema.config.terreno)
+    mapa = wx.Bitmap(500, 420)
+    dc = wx.MemoryDC(mapa)
+    capa.dibujar(dc, ecosistema.estado_por_especie(), ecosistema.turno)
+    tiempos = []
+    for _ in range(cuadros):
+        # Un turno por cuadro: la capa de plantas se actualiza con los cambios del turno
+        desde = ecosistema.turno
+        ecosistema.simular_turno()
+        tramos = ()
+        if ecosistema.plantas_nacidas is not None:
+            tramos = ((desde, ecosistema.turno, ecosistema.plantas_nacidas, ecosistema.plantas_muertas),)
+        estado = ecosistema.estado_por_especie()
+        inicio = time.perf_counter()
+        capa.dibujar(dc, estado, ecosistema.turno, tramos)
+        capa.dibujar_estado(dc, [f"Turno: {ecosistema.turno}"])
+        tiempos.append(time.perf_counter() - inicio)
+    dc.SelectObject(wx.NullBitmap)
+    aplicacion.Destroy()
+    return {f"pintado_ms/plantas={plantas}": _medida(statistics.median(tiempos) * 1000, "ms/cuadro")}
+
+# --- Ejecución y comparación ---
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutar_todo(niveles=NIVELES_PLANTAS, turnos=200, motor="objetos", modelo_plantas="objetos", avance=None):
+    """Todas las medidas: {"meta": {...}, "resultados": {nombre: medida}}."""
+    resultados = {}
+    pasos = [("is_in_lake", medir_lago, ())]
+    for plantas in niveles:
+        pasos += [
+            (f"turnos con {plantas} plantas", medir_turnos, (plantas, turnos, motor, modelo_plantas)),
+            (f"memoria con {plantas} plantas", medir_memoria_pico, (plantas, min(turnos, 50), motor, modelo_plantas)),
+            (f"búsquedas con {plantas} plantas", medir_busquedas, (plantas,)),
+            (f"pintado con {plantas} plantas", medir_pintado, (plantas, 50, motor, modelo_plantas)),
+        ]
+    for descripcion, funcion, argumentos in pasos:
+        if avance:
+            avance(descripcion)
+        resultados.update(funcion(*argumentos))
+    meta = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "motor": motor,
+        "plantas": modelo_plantas,
+        "turnos": turnos,
+        "semilla": SEMILLA,
+    }
+    return {"meta": meta, "resultados": resultados}
+
+def comparar(base, nuevo):
+    """Filas (nombre, valor base, valor nuevo, mejora) de las medidas presentes en ambos resultados.
+
+    La mejora es > 1 cuando el nuevo valor es mejor, sea la medida de las que
+    conviene aumentar (turnos/s) o de las que conviene reducir (tiempos, memoria).
+    """
+    filas = []
+    for nombre, medida in nuevo["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None or not anterior["valor"] or not medida["valor"]:
+            continue
+        razon = medida["valor"] / anterior["valor"]
+        filas.append((nombre, anterior["valor"], medida["valor"], razon if medida["mayor_es_mejor"] else 1 / razon))
+    return filas
+
+def ejecutar_benchmarks(args):
+    """Subcomando `bench`: escribe los resultados en JSON y, con --compare, la comparación con otros."""
+    niveles = [int(n) for n in args.levels.split(",") if n.strip()]
+    resultados = ejecutar_todo(niveles, args.turns, args.motor, args.plantas,
+                               avance=lambda texto: print(f"midiendo {texto}...", file=sys.stderr))
+    texto = json.dumps(resultados, indent=2)
+    if args.output:
+        with open(args.output, "w") as salida:
+            salida.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.compare:
+        with open(args.compare) as archivo:
+            base = json.load(archivo)
+        print(f"\nComparación con {args.compare} (commit {base['meta'].get('commit')}); mejora > 1 es mejor:",
+              file=sys.stderr)
+        for nombre, anterior, actual, mejora in comparar(base, resultados):
+            print(f"{nombre:<36} {anterior:12.3f} {actual:12.3f} {mejora:7.2f}x", file=sys.stderr)
@@ -0,0 +1,111 @@
+"""Capa de plantas como campo de biomasa en lugar de objetos Planta.
+
+El mundo se divide en casillas de TAM_CASILLA píxeles y cada casilla guarda
+cuántas plantas contiene. La dispersión (20 % de probabilidad por planta,
+caída uniforme a ±25 px) se calcula para todo el campo a la vez: el número
+esperado de semillas que llega a cada casilla es un filtro de caja sobre la
+biomasa, y los nacimientos se sortean con una Poisson por casilla. El coste
+de un turno depende del número de casillas, no del número de plantas.
+
+Ofrece la misma interfaz que usa Ecosistema con la rejilla de plantas
+(len, insertar y consumir_cercano), así que los animales comen igual.
+"""
+import numpy as np
+
+from motor_numpy import en_agua, mascara_agua
+
+TAM_CASILLA = 5
+# Reglas de Planta.reproducir
+PROBABILIDAD_DISPERSION = 0.20
+RADIO_DISPERSION = 25
+VIDA_PLANTA = 999
+
+def _suma_caja(a, k):
+    """Suma de cada ventana (2k+1) x (2k+1) centrada en cada casilla (fuera del campo cuenta 0)."""
+    ancho = 2 * k + 1
+    s = np.pad(a, ((k + 1, k), (k + 1, k))).cumsum(0).cumsum(1)
+    return s[ancho:, ancho:] - s[:-ancho, ancho:] - s[ancho:, :-ancho] + s[:-ancho, :-ancho]
+
+class CampoPlantas:
+    """Biomasa de plantas por casilla sobre la tierra firme de un Terreno."""
+    def __init__(self, terreno, semilla=None, tam=TAM_CASILLA, ancho=None, alto=None):
+        ancho = terreno.ancho_mundo if ancho is None else ancho
+        alto = terreno.alto_mundo if alto is None else alto
+        self.tam = tam
+        self.columnas = -(-ancho // tam)
+        self.filas = -(-alto // tam)
+        centros_x = (np.arange(self.columnas) + 0.5) * tam
+        centros_y = (np.arange(self.filas) + 0.5) * tam
+        # Casillas cuyo centro está fuera del lago: las únicas donde pueden nacer plantas
+        self.tierra = ~en_agua(mascara_agua(terreno), centros_x[None, :], centros_y[:, None], terreno.escala)
+        self.biomasa = np.zeros((self.filas, self.columnas), dtype=np.int64)
+        self.total = 0
+        self.rng = np.random.default_rng(semilla)
+        self.k_dispersion = round(RADIO_DISPERSION / tam)
+        self._discos = {}
+
+    def __len__(self):
+        return self.total
+
+    def _casilla(self, x, y):
+        fila = min(self.filas - 1, max(0, int(y // self.tam)))
+        columna = min(self.columnas - 1, max(0, int(x // self.tam)))
+        return fila, columna
+
+    def insertar(self, planta):
+        self.biomasa[self._casilla(planta.posicion_x, planta.posicion_y)] += 1
+        self.total += 1
+
+    def _disco(self, radio):
+        """Distancia al cuadrado de cada casilla vecina (inf fuera del radio), en una ventana de ±k casillas."""
+        if radio not in self._discos:
+            k = int(radio // self.tam) + 1
+            d = np.arange(-k, k + 1) * self.tam
+            d2 = (d[None, :] ** 2 + d[:, None] ** 2).astype(float)
+            d2[d2 >= radio * radio] = np.inf
+            self._discos[radio] = (k, d2)
+        return self._discos[radio]
+
+    def consumir_cercano(self, x, y, radio):
+        """Quita una planta de la casilla no vacía más cercana a distancia < radio; True si había alguna."""
+        k, d2 = self._disco(radio)
+        fila, columna = self._casilla(x, y)
+        f0, f1 = max(0, fila - k), min(self.filas, fila + k + 1)
+        c0, c1 = max(0, columna - k), min(self.columnas, columna + k + 1)
+        ventana = self.biomasa[f0:f1, c0:c1]
+        distancias = np.where(ventana > 0, d2[f0 - fila + k:f1 - fila + k, c0 - columna + k:c1 - columna + k], np.inf)
+        mejor = distancias.argmin()
+        if distancias.flat[mejor] == np.inf:
+            return False
+        ventana.flat[mejor] -= 1
+        self.total -= 1
+        return True
+
+    def crecer(self, maximo):
+        """Un turno de dispersión para todo el campo; devuelve cuántas plantas han nacido."""
+        hueco = maximo - self.total
+        if hueco <= 0:
+            return 0
+        k = self.k_dispersion
+        # Suma entera (exacta) de la biomasa que puede dispersarse hasta cada casilla
+        esperadas = _suma_caja(self.biomasa, k) * (PROBABILIDAD_DISPERSION / (2 * k + 1) ** 2)
+        # Las semillas que caen en el lago se pierden, como en Planta.reproducir
+        esperadas[~self.tierra] = 0
+        nacimientos = self.rng.poisson(esperadas)
+        n = int(nacimientos.sum())
+        if n > hueco:
+            # Solo caben `hueco`: se eligen al azar entre todas las semillas
+            casillas = np.repeat(np.arange(nacimientos.size), nacimientos.ravel())
+            elegidas = self.rng.choice(casillas, hueco, replace=False)
+            nacimientos = np.bincount(elegidas, minlength=nacimientos.size).reshape(nacimientos.shape)
+            n = hueco
+        self.biomasa += nacimientos
+        self.total += n
+        return n
+
+    def puntos(self):
+        """[(x, y, vida)] con una planta dibujada en el centro de cada casilla ocupada."""
+        filas, columnas = np.nonzero(self.biomasa)
+        mitad = self.tam // 2
+        return list(zip((columnas * self.tam + mitad).tolist(), (filas * self.tam + mitad).tolist(),
+                        [VIDA_PLANTA] * len(filas)))
@@ -1,6 +1,17 @@
+import argparse
+import csv
+import heapq
+import itertools
+import operator
 import random
 import math
-import wx
+import sys
+import time
+from dataclasses import dataclass, replace
+
+from estadisticas import Estadisticas
+from telemetria import fila_turno
+from terreno import Terreno
 
 # --- Configuración del lago ovalado ---
 LAKE_X_START = 140
@@ -12,41 +23,232 @@ MAX_TURNS = 9000
 # --- NUEVOS LÍMITES DE POBLACIÓN ---
 MAX_HERBIVOROS = 40  # Límite estricto para Herbívoros (Objetivo del usuario)
 MAX_CARNIVOROS = 15  # Límite para evitar el colapso por depredadores
-
-def is_in_lake(x, y):
-    """Verifica si las coordenadas están dentro del área del lago ovalado."""
-    cx = (LAKE_X_START + LAKE_X_END) / 2
-    cy = (LAKE_Y_START + LAKE_Y_END) / 2
-    rx = (LAKE_X_END - LAKE_X_START) / 2
-    ry = (LAKE_Y_END - LAKE_Y_START) / 2
-    return ((x - cx)**2 / rx**2 + (y - cy)**2 / ry**2) <= 1
-
-def get_random_lake_position():
-    """Genera una posición aleatoria garantizada dentro del lago."""
-    cx = (LAKE_X_START + LAKE_X_END) / 2
-    cy = (LAKE_Y_START + LAKE_Y_END) / 2
-    rx = (LAKE_X_END - LAKE_X_START) / 2
-    ry = (LAKE_Y_END - LAKE_Y_START) / 2
-    
-    while True:
-        x = random.uniform(LAKE_X_START, LAKE_X_END)
-        y = random.uniform(LAKE_Y_START, LAKE_Y_END)
-        if is_in_lake(x, y):
-            return x, y
+MAX_PLANTAS = 10000  # Límite para evitar sobrecarga
+
+# Mapa de agua/tierra del lago ovalado, calculado una sola vez
+TERRENO_POR_DEFECTO = Terreno.lago_ovalado(LAKE_X_START, LAKE_Y_START, LAKE_X_END, LAKE_Y_END)
+
+@dataclass(frozen=True)
+class Configuracion:
+    """Parámetros ajustables de una simulación (límites, reproducción y población inicial)."""
+    max_herbivoros: int = MAX_HERBIVOROS
+    max_carnivoros: int = MAX_CARNIVOROS
+    max_plantas: int = MAX_PLANTAS
+    # Los omnívoros no pasan de los herbívoros ni de max_herbivoros; con max_omnivoros > 0, tampoco
+    # de este límite propio (el motor por regiones lo usa para la cuota de cada región)
+    max_omnivoros: int = 0
+    # La versión original nunca añadía las crías de las plantas: solo se dispersan si se activa
+    dispersion_plantas: bool = False
+    # Los peces se mantienen siempre entre estos dos límites
+    min_peces: int = 2
+    max_peces: int = 10
+    # AUMENTO DEL COSTE Y COOLDOWN PARA CONTROLAR LA POBLACIÓN
+    herbivoro_repro_coste: int = 500     # Aumentado de 400
+    herbivoro_repro_cooldown: int = 25   # Aumentado de 20
+    carnivoro_repro_coste: int = 400     # Aumentado de 300
+    carnivoro_repro_cooldown: int = 40   # Aumentado de 30
+    omnivoro_repro_coste: int = 350      # Aumentado de 250
+    omnivoro_repro_cooldown: int = 40    # Aumentado de 30
+    # Poblaciones iniciales más bajas para el equilibrio
+    plantas_iniciales: int = 500
+    herbivoros_iniciales: int = 9
+    carnivoros_iniciales: int = 4
+    omnivoros_iniciales: int = 4
+    peces_iniciales: int = 5
+    # Mapa de agua/tierra (terreno.Terreno): un lago ovalado o una máscara cargada
+    terreno: Terreno = TERRENO_POR_DEFECTO
+
+CONFIG_POR_DEFECTO = Configuracion()
+
+def is_in_lake(x, y, terreno=TERRENO_POR_DEFECTO):
+    """Verifica si las coordenadas están dentro del agua (por defecto, el lago ovalado)."""
+    return terreno.es_agua(x, y)
+
+def get_random_lake_position(rng=random, terreno=TERRENO_POR_DEFECTO):
+    """Genera una posición aleatoria garantizada dentro del agua, sin bucle de rechazo."""
+    return terreno.posicion_agua(rng)
+
+# --- Números aleatorios ---
+class GeneradorAleatorio:
+    """Generador con semilla propia que extrae los uniformes por bloques.
+
+    Ofrece random() y uniform(a, b) como el módulo random, así que las entidades
+    aceptan cualquiera de los dos. random() es el __next__ de un iterador que
+    recorre bloques ya generados, de modo que cada extracción no pasa por código
+    Python y el bloque solo se rellena cada `tam_bloque` valores.
+    """
+    def __init__(self, semilla=None, tam_bloque=4096):
+        self.tam_bloque = tam_bloque
+        self._rng = random.Random(semilla)
+        self._reiniciar()
+
+    def _reiniciar(self, resto=()):
+        # El bloque en curso y su iterador se guardan para que getstate() sepa qué queda sin leer
+        self._bloque = list(resto)
+        self._actual = iter(self._bloque)
+        bloques = itertools.chain((self._actual,), self._bloques())
+        self.random = itertools.chain.from_iterable(bloques).__next__
+
+    def _bloques(self):
+        extraer = self._rng.random
+        while True:
+            self._bloque = list(itertools.starmap(extraer, itertools.repeat((), self.tam_bloque)))
+            self._actual = iter(self._bloque)
+            yield self._actual
+
+    def getstate(self):
+        """Estado para reanudar la secuencia: (estado de random.Random, valores sin leer del bloque).
+
+        No toca el generador en uso, así que guardar un punto de control no altera la simulación.
+        """
+        pendientes = operator.length_hint(self._actual)
+        return self._rng.getstate(), self._bloque[len(self._bloque) - pendientes:]
+
+    def setstate(self, estado):
+        estado, resto = estado
+        self._rng.setstate(estado)
+        self._reiniciar(resto)
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+# --- Índice espacial ---
+class RejillaEspacial:
+    """Rejilla uniforme para buscar entidades cercanas de una especie.
+
+    Cubre el rectángulo de `ancho` x `alto` que empieza en (x0, y0): todo el
+    mundo, o solo una región y su halo en el motor por regiones.
+    """
+    def __init__(self, tam_celda=30, ancho=480, alto=380, x0=0, y0=0):
+        self.tam_celda = tam_celda
+        self.x0 = x0
+        self.y0 = y0
+        self.columnas = int(ancho // tam_celda) + 1
+        self.filas = int(alto // tam_celda) + 1
+        # Cada celda guarda {entidad: orden de inserción}; el orden reproduce el de Ecosistema.entidades
+        self.celdas = [{} for _ in range(self.columnas * self.filas)]
+        self.celda_de = {}
+        self.siguiente_orden = 0
+
+    def __len__(self):
+        return len(self.celda_de)
+
+    def __iter__(self):
+        # celda_de conserva el orden de inserción aunque las entidades cambien de celda
+        return iter(self.celda_de)
+
+    def _columna(self, x):
+        return min(self.columnas - 1, max(0, int((x - self.x0) // self.tam_celda)))
+
+    def _fila(self, y):
+        return min(self.filas - 1, max(0, int((y - self.y0) // self.tam_celda)))
+
+    def _indice(self, x, y):
+        return self._fila(y) * self.columnas + self._columna(x)
+
+    def insertar(self, e):
+        i = self._indice(e.posicion_x, e.posicion_y)
+        self.celdas[i][e] = self.siguiente_orden
+        self.celda_de[e] = i
+        self.siguiente_orden += 1
+
+    def quitar(self, e):
+        i = self.celda_de.pop(e)
+        del self.celdas[i][e]
+
+    def actualizar(self, e):
+        """Mueve la entidad de celda si su posición ha cambiado de casilla."""
+        anterior = self.celda_de[e]
+        nueva = self._indice(e.posicion_x, e.posicion_y)
+        if nueva != anterior:
+            self.celdas[nueva][e] = self.celdas[anterior].pop(e)
+            self.celda_de[e] = nueva
+
+    def vecinos(self, x, y, radio):
+        """Devuelve las entidades a distancia < radio, en el mismo orden que la lista original."""
+        radio2 = radio * radio
+        encontrados = []
+        for fila in range(self._fila(y - radio), self._fila(y + radio) + 1):
+            base = fila * self.columnas
+            for columna in range(self._columna(x - radio), self._columna(x + radio) + 1):
+                for e, orden in self.celdas[base + columna].items():
+                    dx = x - e.posicion_x
+                    dy = y - e.posicion_y
+                    if dx * dx + dy * dy < radio2:
+                        encontrados.append((orden, e))
+        encontrados.sort(key=lambda par: par[0])
+        return [e for _, e in encontrados]
+
+    def candidatos(self, x, y, radio):
+        """Número de entidades cuya distancia comprueba vecinos(x, y, radio) (para el perfilado)."""
+        n = 0
+        for fila in range(self._fila(y - radio), self._fila(y + radio) + 1):
+            base = fila * self.columnas
+            for columna in range(self._columna(x - radio), self._columna(x + radio) + 1):
+                n += len(self.celdas[base + columna])
+        return n
+
+    def consumir_cercano(self, x, y, radio):
+        """Marca como muerta la primera entidad viva a distancia < radio; True si había alguna."""
+        for e in self.vecinos(x, y, radio):
+            if e.viva:
+                e.viva = False
+                return True
+        return False
 
 # --- Clases de entidades ---
+# Todas las clases usan __slots__: sin __dict__ por instancia ocupan menos memoria
+# y el acceso a atributos en simular_turno es más rápido.
 class Especie:
-    def __init__(self, x, y, vida):
+    """Estado común a todas las especies: posición y si sigue viva."""
+    __slots__ = ("posicion_x", "posicion_y", "viva")
+
+    def __init__(self, x, y):
+        self.reiniciar(x, y)
+
+    def reiniciar(self, x, y, direccion=0.0):
+        """Deja la entidad recién nacida en (x, y); Ecosistema.nacer lo usa para reutilizar una muerta."""
         self.posicion_x = x
         self.posicion_y = y
-        self.vida = vida
-        self.edad = 0
         self.viva = True
-        self.salto = 2.0
-        self.direccion = random.uniform(0, 2 * math.pi)
+
+    def mover(self, rng=random, config=CONFIG_POR_DEFECTO): pass
+    def envejecer(self): pass
+
+    def reproducir(self, otros=None):
+        return None
+
+class Animal(Especie):
+    """Especie que se mueve, envejece, come y se reproduce por parejas.
+
+    La edad y los cooldowns no se descuentan turno a turno: `nacimiento` es el
+    turno en que entró en el ecosistema y `fin_comer`/`fin_repro` el turno en
+    que acaba cada cooldown (0 si no hay ninguno). La Agenda del ecosistema
+    los pone a 0 y mata de vejez en el turno que toca.
+    """
+    __slots__ = ("vida", "nacimiento", "direccion", "ya_reprodujo", "fin_comer", "fin_repro")
+    salto = 2.0
+    desgaste = 0.15
+    edad_maxima = 300000
+    vida_inicial = 1000
+
+    def __init__(self, x, y, rng=random):
+        self.reiniciar(x, y, rng.uniform(0, 2 * math.pi))
+
+    def reiniciar(self, x, y, direccion=0.0):
+        super().reiniciar(x, y)
+        self.vida = self.vida_inicial
+        # Lo fija Ecosistema.agregar con el turno en curso
+        self.nacimiento = None
+        self.direccion = direccion
         self.ya_reprodujo = False
-        self.cooldown_comer = 0
-        self.cooldown_repro = 0
+        self.fin_comer = 0
+        self.fin_repro = 0
+
+    @classmethod
+    def cria(cls, x, y, rng):
+        """Cría en (x, y) sin construirla: Ecosistema._admitir la crea solo si cabe en los límites."""
+        return cls, x, y, rng.uniform(0, 2 * math.pi)
 
     def puede_reproducirse_con(self, otra):
         """Verifica si dos entidades pueden reproducirse."""
@@ -55,564 +257,1021 @@ class Especie:
             and self.viva and otra.viva
             and not self.ya_reprodujo and not otra.ya_reprodujo
             and self != otra
-            and self.cooldown_repro == 0 and otra.cooldown_repro == 0
-            and ((self.posicion_x - otra.posicion_x)**2 + (self.posicion_y - otra.posicion_y)**2)**0.5 < 28 
+            and not self.fin_repro and not otra.fin_repro
+            and (self.posicion_x - otra.posicion_x)**2 + (self.posicion_y - otra.posicion_y)**2 < 28 * 28
         )
 
-    def mover(self):
+    def mover(self, rng=random, config=CONFIG_POR_DEFECTO):
         """Mueve la especie y la hace rebotar en límites."""
-        self.direccion += random.uniform(-0.06, 0.06)
-        dx = math.cos(self.direccion) * self.salto
-        dy = math.sin(self.direccion) * self.salto
-        tentative_x = self.posicion_x + dx
-        tentative_y = self.posicion_y + dy
+        self.posicion_x, self.posicion_y, self.direccion = self.paso(
+            self.posicion_x, self.posicion_y, self.direccion, rng, config)
+
+    @classmethod
+    def paso(cls, x, y, direccion, rng=random, config=CONFIG_POR_DEFECTO):
+        """(x, y, dirección) tras moverse desde (x, y), sin tocar ninguna entidad (lo usa también fases.py)."""
+        direccion += rng.uniform(-0.06, 0.06)
+        dx = math.cos(direccion) * cls.salto
+        dy = math.sin(direccion) * cls.salto
+        tentative_x = x + dx
+        tentative_y = y + dy
+        terreno = config.terreno
 
         # Rebotar si el movimiento tentativo choca contra el lago (desde fuera), excepto los peces
-        if is_in_lake(tentative_x, tentative_y) and not isinstance(self, Pez):
-            self.direccion += math.pi + random.uniform(-0.1, 0.1) 
+        if terreno.es_agua(tentative_x, tentative_y) and not issubclass(cls, Pez):
+            direccion += math.pi + rng.uniform(-0.1, 0.1) 
         else:
-            self.posicion_x = max(0, min(480, tentative_x))
-            self.posicion_y = max(0, min(380, tentative_y))
+            ancho = terreno.ancho_mundo
+            alto = terreno.alto_mundo
+            x = max(0, min(ancho, tentative_x))
+            y = max(0, min(alto, tentative_y))
             
-            if self.posicion_x <= 0 or self.posicion_x >= 480:
-                self.direccion = math.pi - self.direccion
-            if self.posicion_y <= 0 or self.posicion_y >= 380:
-                self.direccion = -self.direccion
+            if x <= 0 or x >= ancho:
+                direccion = math.pi - direccion
+            if y <= 0 or y >= alto:
+                direccion = -direccion
+        return x, y, direccion
 
     def envejecer(self):
-        """Aumenta la edad y disminuye lentamente la vida."""
-        self.edad += 1
-        self.vida -= 0.15
-        if self.cooldown_comer > 0:
-            self.cooldown_comer -= 1
-        if self.cooldown_repro > 0:
-            self.cooldown_repro -= 1
-        if self.edad > 300000 or self.vida <= 0:
+        """Disminuye lentamente la vida (la muerte por edad la programa la Agenda)."""
+        self.vida -= self.desgaste
+        if self.vida <= 0:
             self.viva = False
 
-    def reproducir(self, otros=None):
-        return None
-
 class Planta(Especie):
-    def __init__(self, x, y):
-        super().__init__(x, y, vida=999)
-        self.salto = 0
-
-    def mover(self): pass
-    def envejecer(self): self.vida = 999
-
-    def reproducir(self, plantas=None):
-        if plantas is not None and len(plantas) >= 10000: # Límite para evitar sobrecarga
+    """Recurso base: no se mueve ni envejece, solo guarda posición y si sigue viva."""
+    __slots__ = ()
+    # Nombre de la especie en los conteos y las estadísticas
+    nombre = "plantas"
+    # Valores fijos, compartidos por todas las plantas en lugar de guardarse en cada una
+    vida = 999
+    salto = 0
+    direccion = 0.0
+    ya_reprodujo = False
+    fin_comer = 0
+    fin_repro = 0
+
+    def __init__(self, x, y, rng=random):
+        # rng se acepta para que todas las especies se construyan igual; las plantas no lo usan (la
+        # versión original sorteaba una dirección, así que las trayectorias con semilla cambiaron)
+        super().__init__(x, y)
+
+    def reproducir(self, plantas=None, config=CONFIG_POR_DEFECTO, rng=random):
+        if not config.dispersion_plantas or (plantas is not None and len(plantas) >= config.max_plantas):
             return None
-        if random.random() < 0.20:
-            attempt_x = self.posicion_x + random.uniform(-25, 25)
-            attempt_y = self.posicion_y + random.uniform(-25, 25)
-            attempt_x = max(0, min(480, attempt_x))
-            attempt_y = max(0, min(380, attempt_y))
+        return self.dispersar(self.posicion_x, self.posicion_y, rng, config)
+
+    @staticmethod
+    def dispersar(x, y, rng=random, config=CONFIG_POR_DEFECTO):
+        """Cría de una planta en (x, y) si sale el sorteo y cae en tierra (el límite lo comprueba quien llama)."""
+        if rng.random() < 0.20:
+            attempt_x = x + rng.uniform(-25, 25)
+            attempt_y = y + rng.uniform(-25, 25)
+            attempt_x = max(0, min(config.terreno.ancho_mundo, attempt_x))
+            attempt_y = max(0, min(config.terreno.alto_mundo, attempt_y))
  
-            if not is_in_lake(attempt_x, attempt_y):
-                return Planta(attempt_x, attempt_y)
+            if not config.terreno.es_agua(attempt_x, attempt_y):
+                return Planta, attempt_x, attempt_y, 0.0
         return None
 
-class Herbivoro(Especie):
-    def __init__(self, x, y):
-        # VIDA INICIAL AUMENTADA (de 1000 a 1200) para resistir mejor
-        super().__init__(x, y, vida=1200) 
-
-    def comer(self, plantas):
-        if self.cooldown_comer > 0: return
-        for planta in plantas:
-            distancia= ((self.posicion_x - planta.posicion_x)**2 + (self.posicion_y - planta.posicion_y)**2)**0.5
-            if planta.viva and distancia < 30:
-                # VIDA GANADA AUMENTADA (de 12 a 20) para combatir el hambre
-                self.vida = min(self.vida + 20, 10000) 
-                planta.viva = False
-                self.cooldown_comer = 4
-                return
-
-    def reproducir(self, otros, plantas):
-        # AUMENTO DEL COSTE Y COOLDOWN PARA CONTROLAR LA POBLACIÓN
-        REPRO_COST = 500  # Aumentado de 400
-        REPRO_COOLDOWN = 25 # Aumentado de 20
+class Herbivoro(Animal):
+    __slots__ = ()
+    nombre = "herbivoros"
+    # VIDA INICIAL AUMENTADA (de 1000 a 1200) para resistir mejor
+    vida_inicial = 1200
+
+    def comer(self, plantas, agenda):
+        if self.fin_comer: return
+        # plantas es la rejilla de objetos Planta o un CampoPlantas: ambos saben consumir la más cercana
+        if plantas.consumir_cercano(self.posicion_x, self.posicion_y, 30):
+            # VIDA GANADA AUMENTADA (de 12 a 20) para combatir el hambre
+            self.vida = min(self.vida + 20, 10000) 
+            agenda.enfriar_comer(self, 4)
+
+    def reproducir(self, otros, plantas, config, rng, agenda, estadisticas):
+        REPRO_COST = config.herbivoro_repro_coste
+        REPRO_COOLDOWN = config.herbivoro_repro_cooldown
         
-        if self.cooldown_repro > 0 or self.ya_reprodujo:
+        if self.fin_repro or self.ya_reprodujo:
             return None
 
-        for otro in otros:
+        for otro in otros.vecinos(self.posicion_x, self.posicion_y, 28):
             if self.puede_reproducirse_con(otro):
                 self.vida -= REPRO_COST
+                antes = otro.vida
                 otro.vida -= REPRO_COST
+                estadisticas.cambio_vida(otro, antes)
                 if self.vida <= 0: self.viva = False
                 if otro.vida <= 0: otro.viva = False
                 if not self.viva or not otro.viva:
                     return None
                 
-                if random.random() < 0.25:  
+                if rng.random() < 0.25:  
                     self.ya_reprodujo = otro.ya_reprodujo = True
-                self.cooldown_repro = otro.cooldown_repro = REPRO_COOLDOWN
+                agenda.enfriar_repro(self, REPRO_COOLDOWN)
+                agenda.enfriar_repro(otro, REPRO_COOLDOWN)
 
                 for _ in range(5): 
-                    offset_x = random.uniform(-20, 20)
-                    offset_y = random.uniform(-20, 20)
+                    offset_x = rng.uniform(-20, 20)
+                    offset_y = rng.uniform(-20, 20)
             
-                    nuevo_x = max(0, min(480, self.posicion_x + offset_x))
-                    nuevo_y = max(0, min(380, self.posicion_y + offset_y))
-                    if not is_in_lake(nuevo_x, nuevo_y):
-                        return Herbivoro(nuevo_x, nuevo_y)
+                    nuevo_x = max(0, min(config.terreno.ancho_mundo, self.posicion_x + offset_x))
+                    nuevo_y = max(0, min(config.terreno.alto_mundo, self.posicion_y + offset_y))
+                    if not config.terreno.es_agua(nuevo_x, nuevo_y):
+                        return self.cria(nuevo_x, nuevo_y, rng)
            
                 break 
         return None
 
-class Carnivoro(Especie):
-    def __init__(self, x, y):
-        super().__init__(x, y, vida=950)
+class Carnivoro(Animal):
+    __slots__ = ()
+    nombre = "carnivoros"
+    vida_inicial = 950
 
-    def cazar(self, presas):
-        if self.cooldown_comer > 0: 
+    def cazar(self, presas, rng, agenda):
+        if self.fin_comer: 
             return
-        for presa in presas:
-            distancia = ((self.posicion_x - presa.posicion_x)**2 + (self.posicion_y - presa.posicion_y)**2)**0.5 
-          
-            if presa.viva and distancia < 18:
-                if random.random () < 0.7:
+        for presa in presas.vecinos(self.posicion_x, self.posicion_y, 18):
+            if presa.viva:
+                if rng.random() < 0.7:
                     # VIDA GANADA REDUCIDA (de 14 a 10)
                     self.vida = min(self.vida + 10, 1150)
                     presa.viva = False
                     # COOLDOWN AUMENTADO (de 12 a 15) para espaciar ataques
-                    self.cooldown_comer = 15 
+                    agenda.enfriar_comer(self, 15)
     
-                    return
+                    return True
 
-    def reproducir(self, otros, plantas):
-        # AUMENTO DEL COSTE Y COOLDOWN PARA CONTROLAR LA POBLACIÓN
-        REPRO_COST = 400  # Aumentado de 300
-        REPRO_COOLDOWN = 40 # Aumentado de 30
+    def reproducir(self, otros, plantas, config, rng, agenda, estadisticas):
+        REPRO_COST = config.carnivoro_repro_coste
+        REPRO_COOLDOWN = config.carnivoro_repro_cooldown
         
-        if self.cooldown_repro > 0 or self.ya_reprodujo:
+        if self.fin_repro or self.ya_reprodujo:
             return None
 
-        for otro in otros:
+        for otro in otros.vecinos(self.posicion_x, self.posicion_y, 28):
             if self.puede_reproducirse_con(otro):
                 self.vida -= REPRO_COST
+                antes = otro.vida
                 otro.vida -= REPRO_COST
+                estadisticas.cambio_vida(otro, antes)
                 if self.vida <= 0: self.viva = False
                 if otro.vida <= 0: otro.viva = False
                 if not self.viva or not otro.viva:
                     return None
 
-                if random.random() < 0.25:  
+                if rng.random() < 0.25:  
                     self.ya_reprodujo = otro.ya_reprodujo = True
-                self.cooldown_repro = otro.cooldown_repro = REPRO_COOLDOWN
+                agenda.enfriar_repro(self, REPRO_COOLDOWN)
+                agenda.enfriar_repro(otro, REPRO_COOLDOWN)
 
                 for _ in range(5):  
-                    offset_x = random.uniform(-20, 20)
-                    offset_y = random.uniform(-20, 20) 
-                    nuevo_x = max(0, min(480, self.posicion_x + offset_x))
-                    nuevo_y = max(0, min(380, self.posicion_y + offset_y))
-                    if not is_in_lake(nuevo_x, nuevo_y):
-                        return Carnivoro(nuevo_x, nuevo_y)
+                    offset_x = rng.uniform(-20, 20)
+                    offset_y = rng.uniform(-20, 20) 
+                    nuevo_x = max(0, min(config.terreno.ancho_mundo, self.posicion_x + offset_x))
+                    nuevo_y = max(0, min(config.terreno.alto_mundo, self.posicion_y + offset_y))
+                    if not config.terreno.es_agua(nuevo_x, nuevo_y):
+                        return self.cria(nuevo_x, nuevo_y, rng)
                 break
         return None
 
 
-class Omnivoro(Especie):
-    def __init__(self, x, y):
-        super().__init__(x, y, vida=920)
+class Omnivoro(Animal):
+    __slots__ = ()
+    nombre = "omnivoros"
+    vida_inicial = 920
 
-    def alimentarse(self, plantas, herbivoros):
-        if self.cooldown_comer > 0:
+    def alimentarse(self, plantas, herbivoros, rng, agenda):
+        if self.fin_comer:
             return
         
         # 1. Intentar comer plantas
-        for planta in plantas:
-            if planta.viva and ((self.posicion_x - planta.posicion_x)**2 + (self.posicion_y - planta.posicion_y)**2)**0.5 < 20:
-                self.vida = min(self.vida + 8, 1100)
-                planta.viva = False
-                self.cooldown_comer = 4
-                return
+        if plantas.consumir_cercano(self.posicion_x, self.posicion_y, 20):
+            self.vida = min(self.vida + 8, 1100)
+            agenda.enfriar_comer(self, 4)
+            return
         
         # 2. Intentar cazar herbívoros
-        for herbivoro in herbivoros:
-            if herbivoro.viva and ((self.posicion_x - herbivoro.posicion_x)**2 + (self.posicion_y - herbivoro.posicion_y)**2)**0.5 < 18:
-                if random.random() < 0.6:
+        for herbivoro in herbivoros.vecinos(self.posicion_x, self.posicion_y, 18):
+            if herbivoro.viva:
+                if rng.random() < 0.6:
                     # VIDA GANADA REDUCIDA (de 10 a 8)
                     self.vida = min(self.vida + 8, 1100) 
                 herbivoro.viva = False
                 # COOLDOWN AUMENTADO (de 6 a 8) para espaciar ataques
-                self.cooldown_comer = 8 
-                return
+                agenda.enfriar_comer(self, 8)
+                return True
 
-    def reproducir(self, otros, plantas):
-        # AUMENTO DEL COSTE Y COOLDOWN PARA CONTROLAR LA POBLACIÓN
-        REPRO_COST = 350 # Aumentado de 250
-        REPRO_COOLDOWN = 40 # Aumentado de 30
+    def reproducir(self, otros, plantas, config, rng, agenda, estadisticas):
+        REPRO_COST = config.omnivoro_repro_coste
+        REPRO_COOLDOWN = config.omnivoro_repro_cooldown
         
-        if self.cooldown_repro > 0 or self.ya_reprodujo:
+        if self.fin_repro or self.ya_reprodujo:
             return None
 
-        for otro in otros:
+        for otro in otros.vecinos(self.posicion_x, self.posicion_y, 28):
             if self.puede_reproducirse_con(otro):
                 self.vida -= REPRO_COST
+                antes = otro.vida
                 otro.vida -= REPRO_COST
+                estadisticas.cambio_vida(otro, antes)
                 if self.vida <= 0: self.viva = False
                 if otro.vida <= 0: otro.viva = False
                 if not self.viva or not otro.viva:
                     return None
                 
-                if random.random() < 0.25:  
+                if rng.random() < 0.25:  
                     self.ya_reprodujo = otro.ya_reprodujo = True
-                self.cooldown_repro = otro.cooldown_repro = REPRO_COOLDOWN
+                agenda.enfriar_repro(self, REPRO_COOLDOWN)
+                agenda.enfriar_repro(otro, REPRO_COOLDOWN)
 
                 for _ in range(5):  
-                    offset_x = random.uniform(-20, 20)
-                    offset_y = random.uniform(-20, 20) 
-                    nuevo_x = max(0, min(480, self.posicion_x + offset_x))
-                    nuevo_y = max(0, min(380, self.posicion_y + offset_y))
-                    if not is_in_lake(nuevo_x, nuevo_y):
-                        return Omnivoro(nuevo_x, nuevo_y)
+                    offset_x = rng.uniform(-20, 20)
+                    offset_y = rng.uniform(-20, 20) 
+                    nuevo_x = max(0, min(config.terreno.ancho_mundo, self.posicion_x + offset_x))
+                    nuevo_y = max(0, min(config.terreno.alto_mundo, self.posicion_y + offset_y))
+                    if not config.terreno.es_agua(nuevo_x, nuevo_y):
+                        return self.cria(nuevo_x, nuevo_y, rng)
                 break
         return None
 
-class Pez(Especie):
-    def __init__(self, x, y):
-        super().__init__(x, y, vida=1000)
-        self.salto = 1.2
-
-    def mover(self):
+class Pez(Animal):
+    __slots__ = ()
+    nombre = "peces"
+    salto = 1.2
+    # Envejecimiento más lento para peces
+    desgaste = 0.05
+    edad_maxima = 50000
+    vida_inicial = 1000
+
+    @classmethod
+    def paso(cls, x, y, direccion, rng=random, config=CONFIG_POR_DEFECTO):
         """Mueve el pez asegurándose de que permanezca DENTRO del lago."""
-        self.direccion += random.uniform(-0.15, 0.15)
-        dx = math.cos(self.direccion) * self.salto
-        dy = math.sin(self.direccion) * self.salto
-        tentative_x = self.posicion_x + dx
-        tentative_y = self.posicion_y + dy
-
-        if is_in_lake(tentative_x, tentative_y):
-            self.posicion_x = tentative_x
-            self.posicion_y = tentative_y
-        else:
-            self.direccion += math.pi + random.uniform(-0.5, 0.5)
-            self.posicion_x -= math.cos(self.direccion) * (self.salto * 0.1)
-            self.posicion_y -= math.sin(self.direccion) * (self.salto * 0.1)
-            
-    def envejecer(self):
-        """Envejecimiento más lento para peces."""
-        self.edad += 1
-        self.vida -= 0.05
-        if self.cooldown_repro > 0:
-            self.cooldown_repro -= 1
-        if self.edad > 50000 or self.vida <= 0: 
-            self.viva = False
-
-    def reproducir(self, otros, poblacion_actual):
-        """Permite la reproducción si la población actual es menor al límite máximo (10)."""
-        if self.cooldown_repro > 0 or self.ya_reprodujo or poblacion_actual >= 10:
+        direccion += rng.uniform(-0.15, 0.15)
+        dx = math.cos(direccion) * cls.salto
+        dy = math.sin(direccion) * cls.salto
+        tentative_x = x + dx
+        tentative_y = y + dy
+
+        if config.terreno.es_agua(tentative_x, tentative_y):
+            return tentative_x, tentative_y, direccion
+        direccion += math.pi + rng.uniform(-0.5, 0.5)
+        x -= math.cos(direccion) * (cls.salto * 0.1)
+        y -= math.sin(direccion) * (cls.salto * 0.1)
+        return x, y, direccion
+
+
+    def reproducir(self, otros, poblacion_actual, rng, config, agenda, estadisticas):
+        """Permite la reproducción si la población actual es menor al límite máximo (config.max_peces)."""
+        if self.fin_repro or self.ya_reprodujo or poblacion_actual >= config.max_peces:
             return None
 
-        for otro in otros:
+        for otro in otros.vecinos(self.posicion_x, self.posicion_y, 28):
             if self.puede_reproducirse_con(otro):
                 self.vida -= 50 
+                antes = otro.vida
                 otro.vida -= 50
+                estadisticas.cambio_vida(otro, antes)
                 if not self.viva or not otro.viva:
                     return None
                 
-                if poblacion_actual < 10 and random.random() < 0.35:  
+                if poblacion_actual < config.max_peces and rng.random() < 0.35:  
                     self.ya_reprodujo = otro.ya_reprodujo = True
-                    self.cooldown_repro = otro.cooldown_repro = 50 
+                    agenda.enfriar_repro(self, 50)
+                    agenda.enfriar_repro(otro, 50)
 
-                    offset_x = random.uniform(-10, 10)
-                    offset_y = random.uniform(-10, 10)
+                    offset_x = rng.uniform(-10, 10)
+                    offset_y = rng.uniform(-10, 10)
                     
                     nuevo_x = self.posicion_x + offset_x
                     nuevo_y = self.posicion_y + offset_y
                     
-                    if not is_in_lake(nuevo_x, nuevo_y):
-                        nuevo_x, nuevo_y = get_random_lake_position() 
+                    if not config.terreno.es_agua(nuevo_x, nuevo_y):
+                        nuevo_x, nuevo_y = config.terreno.posicion_agua(rng) 
                         
-                    return Pez(nuevo_x, nuevo_y)
+                    return self.cria(nuevo_x, nuevo_y, rng)
                 
         return None
 
+# --- Agenda de temporizadores ---
+# Avisos que la Agenda aplica al llegar su turno
+FIN_COMER, FIN_REPRO, VEJEZ = range(3)
+
+class Agenda:
+    """Rueda de tiempos con el fin de los cooldowns y la muerte por edad de cada animal.
+
+    Cada casilla de la rueda guarda los avisos de un turno (turno % tam); los
+    que caen más allá de una vuelta esperan en un montículo y pasan a la rueda
+    cuando entran en ella. Cada turno solo se tocan los animales con algún
+    aviso, en vez de descontar contadores de todos.
+
+    Con `en_orden` (turno que procesa los animales uno tras otro) el fin del
+    cooldown de reproducción no se programa: el bucle del turno lo quita al
+    procesar al animal en el turno `fin_repro`, igual que el antiguo contador
+    llegaba a 0 en su envejecer(). Ese contador bajaba también en el turno en
+    que se ponía si el animal aún no había envejecido, así que entonces el
+    cooldown acaba un turno antes (ver enfriar_repro).
+    """
+    def __init__(self, tam=64, en_orden=False):
+        self.tam = tam
+        self.turno = 0
+        self.casillas = [[] for _ in range(tam)]
+        self.lejanos = []
+        self._orden = itertools.count()
+        # Al pasar de este tamaño se purgan del montículo los avisos de animales muertos
+        self._limite_lejanos = 1024
+        self.en_orden = en_orden
+        # Con en_orden, animales ya procesados en el turno en curso (los añade el bucle del turno)
+        self.envejecidos = set()
+
+    def programar(self, turno, entidad, aviso):
+        """Aplica `aviso` a `entidad` al empezar `turno` (posterior al actual)."""
+        if turno - self.turno < self.tam:
+            self.casillas[turno % self.tam].append((turno, entidad, aviso))
+        else:
+            heapq.heappush(self.lejanos, (turno, next(self._orden), entidad, aviso))
+
+    def enfriar_comer(self, entidad, turnos):
+        entidad.fin_comer = self.turno + turnos
+        self.programar(entidad.fin_comer, entidad, FIN_COMER)
+
+    def enfriar_repro(self, entidad, turnos):
+        fin = self.turno + turnos
+        if not self.en_orden:
+            entidad.fin_repro = fin
+            self.programar(fin, entidad, FIN_REPRO)
+        elif entidad in self.envejecidos:
+            entidad.fin_repro = fin
+        else:
+            # Pareja que aún no ha envejecido en este turno: su contador bajaba ya en este
+            entidad.fin_repro = fin - 1
+
+    def inscribir(self, entidad):
+        """Programa la vejez y los cooldowns pendientes de un animal que entra en el ecosistema."""
+        if entidad.nacimiento is None:
+            entidad.nacimiento = self.turno
+        self.programar(entidad.nacimiento + entidad.edad_maxima + 1, entidad, VEJEZ)
+        if entidad.fin_comer:
+            self.programar(entidad.fin_comer, entidad, FIN_COMER)
+        if entidad.fin_repro and not self.en_orden:
+            self.programar(entidad.fin_repro, entidad, FIN_REPRO)
+
+    def avanzar(self):
+        """Pasa al turno siguiente y aplica sus avisos."""
+        self.turno += 1
+        turno = self.turno
+        self.envejecidos.clear()
+        lejanos = self.lejanos
+        while lejanos and lejanos[0][0] - turno < self.tam:
+            t, _, entidad, aviso = heapq.heappop(lejanos)
+            self.casillas[t % self.tam].append((t, entidad, aviso))
+        if len(lejanos) > self._limite_lejanos:
+            self.lejanos = [a for a in lejanos if a[2].viva]
+            heapq.heapify(self.lejanos)
+            self._limite_lejanos = max(1024, 2 * len(self.lejanos))
+
+        i = turno % self.tam
+        casilla = self.casillas[i]
+        self.casillas[i] = []
+        for t, entidad, aviso in casilla:
+            # Un aviso obsoleto (cooldown ya reprogramado, p. ej. tras cargar) no toca nada
+            if aviso == FIN_COMER:
+                if entidad.fin_comer == t:
+                    entidad.fin_comer = 0
+            elif aviso == FIN_REPRO:
+                if entidad.fin_repro == t:
+                    entidad.fin_repro = 0
+            elif entidad.nacimiento + entidad.edad_maxima + 1 == t:
+                # La entidad puede haberse reutilizado para otro nacimiento (Ecosistema.nacer)
+                entidad.viva = False
+
+    def edad(self, entidad):
+        return self.turno - entidad.nacimiento
+
+    def restante(self, fin):
+        """Turnos que faltan para que acabe un cooldown que termina en `fin` (0 si no hay)."""
+        return max(0, fin - self.turno) if fin else 0
+
 # --- Ecosistema ---
 class Ecosistema:
-    def __init__(self):
+    # Nombre del motor en los puntos de control y en crear_ecosistema
+    motor = "objetos"
+    # Los animales actúan uno tras otro en el orden de la lista (ver Agenda)
+    en_orden = True
+
+    def __init__(self, config=CONFIG_POR_DEFECTO, semilla=None, plantas="objetos", region=None):
+        """`region` (x0, y0, x1, y1) limita las rejillas a ese rectángulo (por defecto, todo el mundo)."""
+        self.config = config
+        # Toda la aleatoriedad del ecosistema sale de aquí: misma semilla, misma trayectoria
+        self.rng = GeneradorAleatorio(semilla)
         self.entidades = []
-        self.turno = 0
+        # Lleva el turno en curso y los temporizadores de cada animal
+        self.agenda = Agenda(en_orden=self.en_orden)
+        # Reserva de entidades muertas por especie: los nacimientos las reutilizan en lugar de
+        # crear objetos (None para no reutilizar nunca una entidad, como en el motor por regiones)
+        self.reserva = {cls: [] for cls in (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)}
+        # Contadores del último turno (asignaciones: entidades que no han salido de la reserva)
+        # y, si se asigna, su registro (telemetria.Telemetria)
+        self.nacimientos = 0
+        self.cazas = 0
+        self.asignaciones = 0
+        self.telemetria = None
+        # Métricas que se actualizan con cada cambio (estadisticas.Estadisticas)
+        self.estadisticas = Estadisticas()
+        # Un índice espacial por especie, actualizado al mover, nacer y morir
+        x0, y0, x1, y1 = region or (0, 0, config.terreno.ancho_mundo, config.terreno.alto_mundo)
+        self.rejillas = {
+            cls: RejillaEspacial(ancho=x1 - x0, alto=y1 - y0, x0=x0, y0=y0)
+            for cls in (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)
+        }
+        # Con plantas="campo" las plantas son biomasa por casilla y no objetos en la lista
+        self.campo = None
+        if plantas == "campo":
+            from campo_plantas import CampoPlantas
+            self.campo = self.rejillas[Planta] = CampoPlantas(config.terreno, semilla)
+        elif plantas != "objetos":
+            raise ValueError(f"Modelo de plantas desconocido: {plantas}")
+        # Plantas que han nacido y muerto en el último turno, como (x, y) enteros, para que la
+        # vista actualice su capa de plantas sin redibujarlas todas (None con el campo de plantas)
+        self.plantas_nacidas = self.plantas_muertas = None
+        self._vaciar_cambios_plantas()
+
+    @property
+    def turno(self):
+        return self.agenda.turno
+
+    @turno.setter
+    def turno(self, turno):
+        # Solo antes de agregar entidades (p. ej. al cargar un punto de control)
+        self.agenda.turno = self.estadisticas.turno = turno
 
     def agregar(self, especie):
-        self.entidades.append(especie)
+        tipo = type(especie)
+        self.rejillas[tipo].insertar(especie)
+        if tipo is not Planta:
+            self.agenda.inscribir(especie)
+            self.entidades.append(especie)
+        elif self.campo is None:
+            self.entidades.append(especie)
+            self.plantas_nacidas.append((int(especie.posicion_x), int(especie.posicion_y)))
+        else:
+            return
+        self.estadisticas.alta(especie)
+
+    def cerrar(self):
+        """Libera los recursos del motor (los trabajadores de EcosistemaFases); aquí no hay ninguno."""
+
+    def _vaciar_cambios_plantas(self):
+        """Empieza las listas de plantas nacidas y muertas de un turno nuevo."""
+        if self.campo is None:
+            self.plantas_nacidas = []
+            self.plantas_muertas = []
+
+    def nacer(self, cls, x, y, direccion=0.0):
+        """Entidad de `cls` recién nacida en (x, y), sin agregar; reutiliza una muerta de la reserva si hay."""
+        libres = self.reserva[cls] if self.reserva is not None else None
+        if libres:
+            e = libres.pop()
+        else:
+            e = cls.__new__(cls)
+            self.asignaciones += 1
+        e.reiniciar(x, y, direccion)
+        self.estadisticas.contar("nacimientos", cls.nombre)
+        return e
+
+    def conteos(self):
+        """Número de entidades vivas de cada especie."""
+        return {
+            "plantas": len(self.rejillas[Planta]),
+            "herbivoros": len(self.rejillas[Herbivoro]),
+            "carnivoros": len(self.rejillas[Carnivoro]),
+            "omnivoros": len(self.rejillas[Omnivoro]),
+            "peces": len(self.rejillas[Pez]),
+        }
+
+    def _poblacion(self):
+        return sum(len(rejilla) for rejilla in self.rejillas.values())
+
+    def estado_por_especie(self):
+        """{clase: [(x, y, vida), ...]} en coordenadas enteras con las entidades vivas de cada especie (para la vista)."""
+        estado = {
+            cls: [(int(e.posicion_x), int(e.posicion_y), e.vida) for e in rejilla]
+            for cls, rejilla in self.rejillas.items() if rejilla is not self.campo
+        }
+        if self.campo is not None:
+            estado[Planta] = self.campo.puntos()
+        return estado
+
+    def _compactar(self):
+        """Quita de una pasada las entidades muertas de la lista y de sus registros por especie y las guarda en la reserva."""
+        vivas = []
+        reserva = self.reserva
+        estadisticas = self.estadisticas
+        for e in self.entidades:
+            if e.viva:
+                vivas.append(e)
+            else:
+                self.rejillas[type(e)].quitar(e)
+                estadisticas.morir(e)
+                if type(e) is Planta:
+                    self.plantas_muertas.append((int(e.posicion_x), int(e.posicion_y)))
+                if reserva is not None:
+                    reserva[type(e)].append(e)
+        self.entidades = vivas
 
     def simular_turno(self):
-        self.turno += 1
-        nuevas_entidades = []
+        # Fin de cooldowns y muertes por edad de este turno
+        self.agenda.avanzar()
+        estadisticas = self.estadisticas
+        estadisticas.empezar_turno(self.turno)
+        self._vaciar_cambios_plantas()
+        # Crías (clase, x, y, dirección): solo se construyen las que admiten los límites
+        crias = []
+        plantas_anteriores = len(self.rejillas[Planta])
+        cazas = 0
+        self.asignaciones = 0
     
-        for e in self.entidades: 
-            e.ya_reprodujo = False
-
-        # Recolectar poblaciones actuales antes de la simulación
-        plantas = [e for e in self.entidades if isinstance(e, Planta) and e.viva]
-        herbivoros = [e for e in self.entidades if isinstance(e, Herbivoro) and e.viva]
-        carnivoros = [e for e in self.entidades if isinstance(e, Carnivoro) and e.viva]
-        omnivoros = [e for e in self.entidades if isinstance(e, Omnivoro) and e.viva]
-        peces = [e for e in self.entidades if isinstance(e, Pez) and e.viva]
-
-        # 1. Ejecutar acciones y generar nuevas crías
+        for especie in (Herbivoro, Carnivoro, Omnivoro, Pez):
+            for e in self.rejillas[especie]:
+                e.ya_reprodujo = False
+
+        # Registros de cada especie: índice espacial y, con len(), conteo O(1).
+        # Al inicio del turno solo contienen entidades vivas.
+        plantas = self.rejillas[Planta]
+        herbivoros = self.rejillas[Herbivoro]
+        carnivoros = self.rejillas[Carnivoro]
+        omnivoros = self.rejillas[Omnivoro]
+        peces = self.rejillas[Pez]
+
+        config = self.config
+        rng = self.rng
+        agenda = self.agenda
+        envejecidos = agenda.envejecidos
+        turno = agenda.turno
+
+        # 1. Ejecutar acciones y anotar las nuevas crías
         for e in self.entidades: 
             if not e.viva:
                 continue
 
-            e.mover() 
-            e.envejecer()
-            nuevo = None
-
-            if isinstance(e, Planta):
-                nuevo = e.reproducir(plantas)
-            elif isinstance(e, Herbivoro):
-                e.comer(plantas)
-                nuevo = e.reproducir(herbivoros, plantas)
-            elif isinstance(e, Carnivoro):
-                e.cazar(herbivoros)
-                nuevo = e.reproducir(carnivoros, plantas)
-            elif isinstance(e, Omnivoro):
-                e.alimentarse(plantas, herbivoros)
-                nuevo = e.reproducir(omnivoros, plantas)
-            elif isinstance(e, Pez):
-                nuevo = e.reproducir(peces, len(peces))
-
-            if nuevo:
-                nuevas_entidades.append(nuevo)
-
-        # 2. Filtrar entidades muertas
-        self.entidades = [e for e in self.entidades if e.viva]
+            tipo = type(e)
+            if tipo is Planta:
+                # Las plantas no se mueven ni envejecen: solo se dispersan
+                cria = e.reproducir(plantas, config, rng)
+            else:
+                antes = e.vida
+                e.mover(rng, config) 
+                e.envejecer()
+                envejecidos.add(e)
+                if e.fin_repro and e.fin_repro <= turno:
+                    e.fin_repro = 0
+                cria = None
+
+                # Comer y reproducirse solo se intentan con el cooldown acabado
+                if tipo is Herbivoro:
+                    herbivoros.actualizar(e)
+                    if not e.fin_comer:
+                        e.comer(plantas, agenda)
+                    if not e.fin_repro:
+                        cria = e.reproducir(herbivoros, plantas, config, rng, agenda, estadisticas)
+                elif tipo is Carnivoro:
+                    carnivoros.actualizar(e)
+                    if not e.fin_comer and e.cazar(herbivoros, rng, agenda):
+                        cazas += 1
+                        estadisticas.contar("cazas", "carnivoros")
+                    if not e.fin_repro:
+                        cria = e.reproducir(carnivoros, plantas, config, rng, agenda, estadisticas)
+                elif tipo is Omnivoro:
+                    omnivoros.actualizar(e)
+                    if not e.fin_comer and e.alimentarse(plantas, herbivoros, rng, agenda):
+                        cazas += 1
+                        estadisticas.contar("cazas", "omnivoros")
+                    if not e.fin_repro:
+                        cria = e.reproducir(omnivoros, plantas, config, rng, agenda, estadisticas)
+                elif tipo is Pez:
+                    peces.actualizar(e)
+                    if not e.fin_repro:
+                        cria = e.reproducir(peces, len(peces), rng, config, agenda, estadisticas)
+                # Envejecer, comer y reproducirse cambian la vida; la de la pareja la avisa reproducir()
+                estadisticas.cambio_vida(e, antes)
+
+            if cria:
+                crias.append(cria)
+
+        # 2. Filtrar entidades muertas (una sola pasada)
+        self._compactar()
+        vivas = self._poblacion()
         
-        # 3. Aplicar límites de población a las nuevas crías ANTES de añadirlas
-        current_herb_count = len([e for e in self.entidades if isinstance(e, Herbivoro)])
-        current_omni_count = len([e for e in self.entidades if isinstance(e, Omnivoro)])
-        current_carn_count = len([e for e in self.entidades if isinstance(e, Carnivoro)])
-        current_fish_count = len([e for e in self.entidades if isinstance(e, Pez)])
-
-        for nuevo in nuevas_entidades:
-            if isinstance(nuevo, Herbivoro):
-                if current_herb_count < MAX_HERBIVOROS:
-                    self.entidades.append(nuevo)
-                    current_herb_count += 1
-            
-            elif isinstance(nuevo, Omnivoro):
-                # OMNIVOROS: No más que herbívoros Y menor que el límite global (40)
-                if current_omni_count < current_herb_count and current_omni_count < MAX_HERBIVOROS:
-                    self.entidades.append(nuevo)
-                    current_omni_count += 1
-            
-            elif isinstance(nuevo, Carnivoro):
-                if current_carn_count < MAX_CARNIVOROS:
-                    self.entidades.append(nuevo)
-                    current_carn_count += 1
+        if self.campo is not None:
+            # Dispersión de todo el campo de plantas, ya limitada a config.max_plantas; las plantas
+            # del campo no son entidades, así que sus eventos se cuentan aquí
+            estadisticas.contar("muertes", "plantas", plantas_anteriores - len(plantas))
+            estadisticas.contar("nacimientos", "plantas", self.campo.crecer(config.max_plantas))
+            estadisticas.reponer("plantas", len(plantas))
+
+        # 3. Aplicar límites de población a las nuevas crías ANTES de añadirlas.
+        self._admitir(crias)
                     
-            elif isinstance(nuevo, Pez):
-                # Peces: Límite 10
-                if current_fish_count < 10:
-                    self.entidades.append(nuevo)
-                    current_fish_count += 1
-                    
-        # 4. Control Estricto de Población de Peces (2 <= Pez <= 10) (FINAL)
-        pez_actual = [e for e in self.entidades if isinstance(e, Pez)]
-        pez_count = len(pez_actual)
-
-        # Mínimo (Añadir si es < 2)
-        if pez_count < 2:
-            for _ in range(2 - pez_count):
-                x, y = get_random_lake_position()
-                self.entidades.append(Pez(x, y))
-
-        # Máximo (Eliminar si es > 10)
-        pez_actual = [e for e in self.entidades if isinstance(e, Pez)]
-        pez_count = len(pez_actual)
-        
-        if pez_count > 10:
-            excess = pez_count - 10
+        # 4. Control Estricto de Población de Peces (min_peces <= Pez <= max_peces) (FINAL)
+        self._controlar_peces(vivas)
+        self.cazas = cazas
+        estadisticas.terminar_turno()
+
+        if self.telemetria is not None:
+            self.telemetria.registrar(fila_turno(self))
+
+    def _admitir(self, crias):
+        """Crea y añade las crías que caben en los límites de población (paso 3 del turno)."""
+        config = self.config
+        plantas = self.rejillas[Planta]
+        herbivoros = self.rejillas[Herbivoro]
+        carnivoros = self.rejillas[Carnivoro]
+        omnivoros = self.rejillas[Omnivoro]
+        peces = self.rejillas[Pez]
+        # Los conteos salen de los registros, que agregar() mantiene al día.
+        for tipo, x, y, direccion in crias:
+            if tipo is Planta:
+                admitir = len(plantas) < config.max_plantas
+            elif tipo is Herbivoro:
+                admitir = len(herbivoros) < config.max_herbivoros
+            elif tipo is Omnivoro:
+                # OMNIVOROS: No más que herbívoros Y menor que el límite global (40)
+                admitir = (len(omnivoros) < len(herbivoros) and len(omnivoros) < config.max_herbivoros
+                           and (not config.max_omnivoros or len(omnivoros) < config.max_omnivoros))
+            elif tipo is Carnivoro:
+                admitir = len(carnivoros) < config.max_carnivoros
+            else:
+                # Peces: Límite max_peces
+                admitir = len(peces) < config.max_peces
+            if admitir:
+                self.agregar(self.nacer(tipo, x, y, direccion))
+
+    def _controlar_peces(self, vivas):
+        """Mantiene min_peces <= peces <= max_peces (paso 4 del turno) y cierra la cuenta de nacimientos.
+
+        `vivas` es la población tras quitar los muertos del turno.
+        """
+        config = self.config
+        rng = self.rng
+        peces = self.rejillas[Pez]
+        # Mínimo (Añadir si es < min_peces)
+        if len(peces) < config.min_peces:
+            for _ in range(config.min_peces - len(peces)):
+                x, y = config.terreno.posicion_agua(rng)
+                self.agregar(self.nacer(Pez, x, y, rng.uniform(0, 2 * math.pi)))
+        self.nacimientos = self._poblacion() - vivas
+
+        # Máximo (Eliminar si es > max_peces)
+        if len(peces) > config.max_peces:
             # Priorizar la eliminación de los peces más viejos y con menos vida
-            pez_actual.sort(key=lambda f: (f.vida, f.edad)) 
-            pez_to_remove = set(pez_actual[:excess])
-            
-            self.entidades = [e for e in self.entidades if not isinstance(e, Pez) or e not in pez_to_remove]
-
-
-class VistaEcosistema:
-    def __init__(self):
-        self.app = wx.App()
-        self.ventana = wx.Frame(None, title="Ecosistema Virtual Equilibrado", size=(500, 420))
-        self.panel = wx.Panel(self.ventana, style=wx.WANTS_CHARS)
-        self.panel.Bind(wx.EVT_PAINT, self.on_paint)
+            # (nsmallest equivale a ordenar y cortar, sin ordenar todos los peces)
+            for pez in heapq.nsmallest(len(peces) - config.max_peces, peces, key=lambda f: (f.vida, -f.nacimiento)):
+                pez.viva = False
+            self._compactar()
+
+MOTORES = ("objetos", "numpy", "fases")
+
+def crear_ecosistema(motor="objetos", semilla=None, config=CONFIG_POR_DEFECTO, plantas="objetos",
+                     trabajadores=0, procesos=False):
+    """Construye el motor de simulación: "objetos" (Ecosistema), "numpy" (EcosistemaNumpy) o
+    "fases" (EcosistemaFases, turno en dos fases).
+
+    `plantas` elige el modelo de plantas del motor de objetos: "objetos" o "campo" (CampoPlantas).
+    `trabajadores` (hilos, o procesos con procesos=True) calculan las propuestas del motor fases.
+    """
+    if motor == "numpy":
+        if plantas != "objetos":
+            raise ValueError("El motor numpy ya guarda las plantas en arreglos; usa plantas=\"objetos\"")
+        from motor_numpy import EcosistemaNumpy
+        return EcosistemaNumpy(semilla, config)
+    if motor == "fases":
+        from fases import EcosistemaFases
+        return EcosistemaFases(config, semilla, plantas, trabajadores, procesos)
+    if motor != "objetos":
+        raise ValueError(f"Motor desconocido: {motor}")
+    return Ecosistema(config, semilla, plantas)
+
+def get_random_land_position(rng=random, terreno=TERRENO_POR_DEFECTO):
+    """Obtiene una posición válida FUERA del lago (para especies terrestres), sin bucle de rechazo."""
+    # Enteros uniformes entre los píxeles de tierra de [50, 450] x [50, 350]
+    return terreno.posicion_tierra(rng)
+
+def poblar_inicial(ecosistema):
+    """Añade la población inicial indicada en la configuración del ecosistema."""
+    config = ecosistema.config
+    rng = ecosistema.rng
+    for _ in range(config.plantas_iniciales):
+        x, y = get_random_land_position(rng, config.terreno) 
+        ecosistema.agregar(Planta(x, y, rng))
+    for _ in range(config.herbivoros_iniciales):
+        x, y = get_random_land_position(rng, config.terreno)
+        ecosistema.agregar(Herbivoro(x, y, rng))
+    for _ in range(config.carnivoros_iniciales):
+        x, y = get_random_land_position(rng, config.terreno)
+        ecosistema.agregar(Carnivoro(x, y, rng)) 
+    for _ in range(config.omnivoros_iniciales):
+        x, y = get_random_land_position(rng, config.terreno)
+        ecosistema.agregar(Omnivoro(x, y, rng))
         
-        self.panel.Bind(wx.EVT_KEY_DOWN, self.on_key_down)
-        self.panel.SetFocus()
-
-        self.ecosistema = Ecosistema()
-        self.inicializar_entidades()
-
-        self.sim_timer = wx.Timer(self.panel)
-        self.panel.Bind(wx.EVT_TIMER, self.on_sim_timer, self.sim_timer)
-        self.sim_timer.Start(50)
-
-        self.draw_timer = wx.Timer(self.panel)
-        self.panel.Bind(wx.EVT_TIMER, self.on_draw_timer, self.draw_timer)
-        self.draw_timer.Start(16)
-
-        self.ventana.Centre()
-        self.ventana.Show()
-
-    def _get_valid_position(self): 
-        """Obtiene una posición válida FUERA del lago (para especies terrestres)."""
-        while True:
-            x = random.randint(50, 450)
-            y = random.randint(50, 350)
-            if not is_in_lake(x, y):
-                return x, y
-            
-    def _get_lake_position(self):
-        """Obtiene una posición válida DENTRO del lago (para peces)."""
-        return get_random_lake_position()
-
-    def inicializar_entidades(self):
-        """Inicializa todas las entidades, con poblaciones iniciales más bajas para el equilibrio."""
-        for _ in range(500): # Menos plantas
-            x, y = self._get_valid_position() 
-            self.ecosistema.agregar(Planta(x, y))
-        for _ in range(9): # Empezar con 20 Herbívoros (para evitar el estancamiento)
-            x, y = self._get_valid_position()
-            self.ecosistema.agregar(Herbivoro(x, y))
-        for _ in range(4): # 4 Carnívoros
-            x, y = self._get_valid_position()
-            self.ecosistema.agregar(Carnivoro(x, y)) 
-        for _ in range(4): # 4 Omnívoros
-            x, y = self._get_valid_position()
-            self.ecosistema.agregar(Omnivoro(x, y))
-            
-        # 5 Peces DENTRO del lago
-        for _ in range(5):
-            x, y = self._get_lake_position()
-            self.ecosistema.agregar(Pez(x, y))
-            
-    def on_paint(self, event):
-        dc = wx.PaintDC(self.panel)
-        dc.SetBackground(wx.Brush(wx.Colour(34, 139, 34)))  # forest green (Bosque)
-        dc.Clear()
-
-        # 1. Dibujar el Lago ovalado
-        dc.SetBrush(wx.Brush(wx.Colour(135, 206, 250))) # Azul claro
-        dc.SetPen(wx.Pen(wx.Colour(0, 0, 255), 1))      # Borde azul
-        dc.DrawEllipse(LAKE_X_START, LAKE_Y_START, LAKE_X_END - LAKE_X_START, LAKE_Y_END - LAKE_Y_START)
-
-        plantas = herbivoros = carnivoros = omnivoros = peces = 0
-
-        for e in self.ecosistema.entidades:
-            x = int(e.posicion_x)
-            y = int(e.posicion_y)
-            max_life = 0
-
-            if isinstance(e, Planta):
-                plantas += 1
-                dc.SetPen(wx.Pen(wx.Colour(0, 128, 0), 2))
-                dc.DrawLine(x, y+5, x, y-5)
-                dc.SetBrush(wx.Brush(wx.Colour(255, 255, 0))) 
-                dc.DrawCircle(x, y-5, 4)
-                dc.SetBrush(wx.Brush(wx.Colour(0, 128, 0))) 
-                dc.DrawEllipse(x-6, y-2, 12, 6)
-                continue
-
-            elif isinstance(e, Pez):
-                peces += 1
-                max_life = 1000
-                dc.SetPen(wx.Pen(wx.Colour(0, 0, 128), 1))              
-                dc.SetBrush(wx.Brush(wx.Colour(255, 105, 180)))         
-                dc.DrawEllipse(x-10, y-5, 20, 10)
-                dc.SetBrush(wx.Brush(wx.Colour(139, 0, 0)))            
-                dc.DrawPolygon([(x+10, y), (x+18, y-5), (x+18, y+5)]) 
-                dc.SetBrush(wx.Brush(wx.Colour(0, 0, 0)))
-                dc.DrawCircle(x-6, y, 1)
-
-
-            elif isinstance(e, Herbivoro):
-                herbivoros += 1
-                max_life = 1250 # Cambiado a 1250 para reflejar el aumento de vida
-                dc.SetPen(wx.Pen(wx.Colour(0, 0, 180), 3))
-                dc.SetBrush(wx.Brush(wx.Colour(100, 180, 255)))
-                dc.DrawRectangle(x-12, y-6, 24, 12)
-                dc.DrawLine(x-12, y, x-20, y-10)
-                dc.DrawCircle(x-20, y-10, 5)
-                dc.DrawLine(x-6, y+6, x-6, y+15)
-                dc.DrawLine(x+6, y+6, x+6, y+15)
-
-            elif isinstance(e, Carnivoro):
-                carnivoros += 1 
-                max_life = 1150
-                dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 3))              
-                dc.SetBrush(wx.Brush(wx.Colour(220, 0, 0)))           
-                dc.DrawRectangle(x-15, y-7, 30, 14) 
-                dc.SetPen(wx.Pen(wx.Colour(255, 0, 0), 1))           
-                dc.DrawLine(x-9, y+2, x-12, y+6)
-                dc.DrawLine(x+9, y+2, x+12, y+6)
-                dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 3))              
-                dc.DrawLine(x-4, y+7, x-4, y+18)
-                dc.DrawLine(x+4, y+7, x+4, y+18)
-
-            elif isinstance(e, Omnivoro):
-                omnivoros += 1
-                max_life = 1100 
-                dc.SetPen(wx.Pen(wx.Colour(120, 0, 120), 3))          
-                dc.SetBrush(wx.Brush(wx.Colour(180, 0, 220)))         
-                dc.DrawEllipse(x-12, y-7, 24, 14)
-                dc.SetBrush(wx.Brush(wx.Colour(255, 165, 0)))         
-                dc.DrawPolygon([(x-3, y-7), (x, y-12), (x+3, y-7)])
-                dc.DrawLine(x+12, y, x+18, y)
-
-            # Barra de vida
-            if max_life > 0:
-                current_life = max(0, min(e.vida, max_life)) 
-                health_ratio = current_life / max_life
-                bar_full_width = 24
-                bar_height = 5
-                bar_x = x - (bar_full_width // 2)
-                bar_y = y - 25 
-                dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 1))              
-                dc.SetBrush(wx.Brush(wx.Colour(128, 128, 128)))       
-                dc.DrawRectangle(bar_x, bar_y, bar_full_width, bar_height)
-                health_color = wx.Colour(0, 255, 0)                  
-                if health_ratio < 0.3:
-                    health_color = wx.Colour(255, 0, 0)              
-                elif health_ratio < 0.6:
-                    health_color = wx.Colour(255, 255, 0)            
-                dc.SetBrush(wx.Brush(health_color))
-                dc.DrawRectangle(bar_x, bar_y, int(bar_full_width * health_ratio), bar_height)
-
-        # Mostrar estado
-        dc.SetFont(wx.Font(8, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
-        dc.SetTextForeground(wx.Colour(255, 255, 255))      
-        status_text = (
-            f"Turno: {self.ecosistema.turno} / {MAX_TURNS} | " 
-            f"Plantas: {plantas} | " 
-            f"Herbív.: {herbivoros} (Max {MAX_HERBIVOROS}) | " # Mostrar límite
-            f"Carnív.: {carnivoros} (Max {MAX_CARNIVOROS}) | " # Mostrar límite
-            f"Omnív.: {omnivoros} (Max <= Herbív.) | " # Mostrar límite
-            f"Peces: {peces} (2-10)"
-        )
-        dc.DrawText(status_text, 5, 390)
-        
-    def on_sim_timer(self, event):
-        self.ecosistema.simular_turno()
-        if self.ecosistema.turno >= MAX_TURNS:
-            self.sim_timer.Stop()
-            print(f"Simulación detenida después de {MAX_TURNS} turnos.")
-
-    def on_draw_timer(self, event):
-        self.panel.Refresh()
+    # Peces DENTRO del lago
+    for _ in range(config.peces_iniciales):
+        x, y = get_random_lake_position(rng, config.terreno)
+        ecosistema.agregar(Pez(x, y, rng))
+
+# --- Ejecución sin interfaz gráfica ---
+COLUMNAS_CONTEOS = ("turno", "plantas", "herbivoros", "carnivoros", "omnivoros", "peces")
+
+def ejecutar(turnos=MAX_TURNS, semilla=None, motor="objetos", cada=0, salida=None, config=CONFIG_POR_DEFECTO,
+             plantas="objetos", reanudar=None, guardar=None, guardar_cada=0, telemetria=None, perfil=None,
+             grabar=None, cada_clave=250, trabajadores=0, procesos=False):
+    """Simula `turnos` turnos seguidos sin vista y escribe conteos cada `cada` turnos y al final.
+
+    Con `reanudar` parte del punto de control de esa ruta (con su motor y su
+    configuración) en lugar de una población nueva. Con `guardar` escribe un
+    punto de control cada `guardar_cada` turnos y otro al terminar. Con
+    `telemetria` añade las métricas de cada turno a ese archivo. Con `perfil`
+    mide cada fase del turno y exporta los percentiles a ese JSON. Con `grabar`
+    graba cada turno en ese archivo, con una clave cada `cada_clave` turnos.
+    `trabajadores` y `procesos` reparten las propuestas del motor fases.
+    Devuelve el ecosistema final.
+    """
+    if reanudar:
+        from punto_control import cargar
+        ecosistema = cargar(reanudar)
+        if ecosistema.motor == "fases":
+            ecosistema.repartir(trabajadores, procesos)
+    else:
+        ecosistema = crear_ecosistema(motor, semilla, config, plantas, trabajadores, procesos)
+        poblar_inicial(ecosistema)
+    guardado = None
+    if guardar:
+        from punto_control import GuardadoPeriodico
+        guardado = GuardadoPeriodico(guardar, guardar_cada)
+    if telemetria:
+        from telemetria import Telemetria
+        ecosistema.telemetria = Telemetria(telemetria)
+    perfilador = None
+    if perfil:
+        from perfil import Perfilador
+        perfilador = Perfilador(ventana=max(turnos, 1))
+        perfilador.activar(ecosistema)
+    grabador = None
+    if grabar:
+        from grabacion import Grabador
+        grabador = Grabador(grabar, cada_clave)
+        grabador.registrar(ecosistema)
+    escritor = csv.writer(salida) if salida is not None else None
+    if escritor:
+        escritor.writerow(COLUMNAS_CONTEOS)
+
+    turno_inicial = ecosistema.turno
+    asignaciones = 0
+    inicio = time.perf_counter()
+    try:
+        for _ in range(turnos):
+            ecosistema.simular_turno()
+            asignaciones += ecosistema.asignaciones
+            if escritor and cada and ecosistema.turno % cada == 0:
+                escritor.writerow(fila_conteos(ecosistema))
+            if guardado:
+                guardado.tras_turno(ecosistema)
+            if grabador:
+                grabador.registrar(ecosistema)
+    finally:
+        ecosistema.cerrar()
+    duracion = time.perf_counter() - inicio
+    if guardado:
+        guardado.cerrar(ecosistema)
+    if grabador:
+        grabador.cerrar()
+    if ecosistema.telemetria is not None:
+        ecosistema.telemetria.cerrar()
+    if perfilador:
+        perfilador.desactivar()
+        perfilador.exportar(perfil)
+        print("\n".join(perfilador.lineas()), file=sys.stderr)
+
+    if escritor and not (cada and ecosistema.turno % cada == 0):
+        escritor.writerow(fila_conteos(ecosistema))
+    simulados = ecosistema.turno - turno_inicial
+    print(f"Simulación detenida después de {ecosistema.turno} turnos "
+          f"({simulados / max(duracion, 1e-9):.0f} turnos/s, {asignaciones} entidades creadas en memoria, "
+          f"{asignaciones / max(simulados, 1):.1f} por turno).", file=sys.stderr)
+    return ecosistema
+
+def fila_conteos(ecosistema):
+    conteos = ecosistema.conteos()
+    return [ecosistema.turno] + [conteos[clave] for clave in COLUMNAS_CONTEOS[1:]]
+
+def medir_memoria(n=10000):
+    """Bytes por entidad de cada especie y de un ecosistema completo con `n` plantas (tracemalloc).
+
+    Incluye los flotantes de posición/dirección de cada instancia y, para el
+    ecosistema, las entradas de las rejillas espaciales y de la lista de entidades.
+    """
+    import tracemalloc
+
+    resultados = {}
+    rng = GeneradorAleatorio(0)
+    for cls in (Planta, Herbivoro, Carnivoro, Omnivoro, Pez):
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        entidades = [cls(rng.uniform(0, 480), rng.uniform(0, 380), rng) for _ in range(n)]
+        resultados[cls.__name__] = (tracemalloc.get_traced_memory()[0] - antes) / n
+        tracemalloc.stop()
+        del entidades
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    ecosistema = Ecosistema(semilla=0)
+    for _ in range(n):
+        x, y = get_random_land_position(ecosistema.rng)
+        ecosistema.agregar(Planta(x + 0.5, y + 0.5, ecosistema.rng))
+    resultados["Ecosistema (por planta)"] = (tracemalloc.get_traced_memory()[0] - antes) / n
+    tracemalloc.stop()
+    return resultados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dinos", description="Simulador de ecosistema.")
+    subparsers = parser.add_subparsers(dest="comando")
+
+    gui = subparsers.add_parser("gui", help="abre la ventana de la simulación (por defecto)")
+    gui.add_argument("--motor", choices=MOTORES, default="objetos")
+    gui.add_argument("--seed", type=int, default=None, help="semilla aleatoria")
+    gui.add_argument("--plantas", choices=("objetos", "campo"), default="objetos",
+                     help="plantas como objetos o como campo de biomasa por casilla")
+    gui.add_argument("--resume", default=None, metavar="RUTA", help="continuar desde un punto de control")
+    gui.add_argument("--save", default=None, metavar="RUTA", help="guardar puntos de control (y uno al cerrar)")
+    gui.add_argument("--save-every", type=int, default=500, metavar="N", help="turnos entre puntos de control")
+    gui.add_argument("--telemetry", default=None, metavar="RUTA", help="archivo donde añadir las métricas por turno")
+    gui.add_argument("--profile", default=None, metavar="RUTA",
+                     help="perfilar desde el inicio y exportar los percentiles a este JSON al cerrar")
+    gui.add_argument("--record", default=None, metavar="RUTA", help="grabar cada turno para verlo con replay")
+    gui.add_argument("--keyframe-every", type=int, default=250, metavar="N", help="turnos entre claves de la grabación")
+
+    run = subparsers.add_parser("run", help="simula sin interfaz gráfica")
+    run.add_argument("--turns", type=int, default=MAX_TURNS, help=f"número de turnos (por defecto {MAX_TURNS})")
+    run.add_argument("--seed", type=int, default=None, help="semilla aleatoria")
+    run.add_argument("--motor", choices=MOTORES, default="objetos")
+    run.add_argument("--plantas", choices=("objetos", "campo"), default="objetos",
+                     help="plantas como objetos o como campo de biomasa por casilla")
+    run.add_argument("--plant-spread", action="store_true",
+                     help="añadir las crías de las plantas hasta su límite (la versión original no lo hace)")
+    run.add_argument("--resume", default=None, metavar="RUTA",
+                     help="continuar desde un punto de control (--turns turnos más)")
+    run.add_argument("--save", default=None, metavar="RUTA", help="guardar puntos de control (y uno al terminar)")
+    run.add_argument("--save-every", type=int, default=0, metavar="N", help="turnos entre puntos de control")
+    run.add_argument("--telemetry", default=None, metavar="RUTA", help="archivo donde añadir las métricas por turno")
+    run.add_argument("--profile", default=None, metavar="RUTA", help="medir cada fase del turno y exportar a este JSON")
+    run.add_argument("--record", default=None, metavar="RUTA", help="grabar cada turno para verlo con replay")
+    run.add_argument("--keyframe-every", type=int, default=250, metavar="N", help="turnos entre claves de la grabación")
+    run.add_argument("--workers", type=int, default=0, metavar="N",
+                     help="hilos para las propuestas del motor fases (0: en este hilo)")
+    run.add_argument("--processes", action="store_true",
+                     help="con --workers, usar procesos en lugar de hilos (experimental: envía la foto cada turno)")
+    run.add_argument("--every", type=int, default=0, metavar="N", help="escribir conteos cada N turnos")
+    run.add_argument("--output", default=None, help="archivo CSV para los conteos (por defecto, la salida estándar)")
+
+    sweep = subparsers.add_parser("sweep", help="barrido de parámetros en paralelo (varios procesos)")
+    sweep.add_argument("--grid", action="append", default=[], metavar="PARAM=V1,V2",
+                       help="valores de un parámetro de Configuracion (se combinan todos con todos)")
+    sweep.add_argument("--range", action="append", default=[], metavar="PARAM=MIN:MAX",
+                       help="rango de un parámetro para el muestreo aleatorio (--sample)")
+    sweep.add_argument("--sample", type=int, default=0, metavar="N", help="N combinaciones aleatorias de los rangos")
+    sweep.add_argument("--sample-seed", type=int, default=None, help="semilla del muestreo de combinaciones")
+    sweep.add_argument("--seeds", default="0-9", help="semillas de cada combinación: 1,2,3 o 0-9")
+    sweep.add_argument("--turns", type=int, default=2000)
+    sweep.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    sweep.add_argument("--motor", choices=MOTORES, default="objetos")
+    sweep.add_argument("--output", default=None, help="archivo CSV para la tabla agregada")
+
+    bench = subparsers.add_parser("bench", help="pruebas de rendimiento con semillas fijas (resultados en JSON)")
+    bench.add_argument("--levels", default="500,2000,5000,10000", metavar="N1,N2",
+                       help="niveles de población de plantas")
+    bench.add_argument("--turns", type=int, default=200, help="turnos medidos en cada nivel")
+    bench.add_argument("--motor", choices=MOTORES, default="objetos")
+    bench.add_argument("--plantas", choices=("objetos", "campo"), default="objetos",
+                       help="plantas como objetos o como campo de biomasa por casilla")
+    bench.add_argument("--output", default=None, help="archivo JSON (por defecto, la salida estándar)")
+    bench.add_argument("--compare", default=None, metavar="RUTA", help="resultados anteriores con los que comparar")
+
+    world = subparsers.add_parser("world", help="mundo grande simulado por regiones en varios procesos")
+    world.add_argument("--width", type=int, default=4800, help="ancho del mundo (el normal mide 480)")
+    world.add_argument("--height", type=int, default=3800, help="alto del mundo (el normal mide 380)")
+    world.add_argument("--lakes", type=int, default=None, help="lagos al azar (por defecto, uno por área del mundo normal)")
+    world.add_argument("--tiles", default="2x2", metavar="FxC", help="regiones: filas x columnas (un proceso por región)")
+    world.add_argument("--serial", action="store_true", help="simular todas las regiones en este proceso")
+    world.add_argument("--turns", type=int, default=1000)
+    world.add_argument("--seed", type=int, default=None, help="semilla aleatoria")
+    world.add_argument("--every", type=int, default=0, metavar="N", help="escribir conteos cada N turnos")
+    world.add_argument("--output", default=None, help="archivo CSV para los conteos (por defecto, la salida estándar)")
+
+    replicas = subparsers.add_parser("replicas", help="muchas réplicas del mismo escenario en un solo motor por lotes "
+                                                      "(misma distribución que --motor numpy, pero no comparables "
+                                                      "turno a turno con él)")
+    replicas.add_argument("--count", type=int, default=100, help="número de réplicas")
+    replicas.add_argument("--turns", type=int, default=2000)
+    replicas.add_argument("--seed", type=int, default=None, help="semilla aleatoria (común a todo el lote)")
+    replicas.add_argument("--every", type=int, default=0, metavar="N", help="escribir conteos cada N turnos")
+    replicas.add_argument("--output", default=None, help="archivo CSV para las series (por defecto, la salida estándar)")
+
+    serve = subparsers.add_parser("serve", help="simula sin interfaz y difunde el estado a visores (view)")
+    serve.add_argument("--turns", type=int, default=MAX_TURNS, help=f"número de turnos (por defecto {MAX_TURNS})")
+    serve.add_argument("--seed", type=int, default=None, help="semilla aleatoria")
+    serve.add_argument("--motor", choices=MOTORES, default="objetos")
+    serve.add_argument("--plantas", choices=("objetos", "campo"), default="objetos",
+                       help="plantas como objetos o como campo de biomasa por casilla")
+    serve.add_argument("--resume", default=None, metavar="RUTA", help="continuar desde un punto de control")
+    serve.add_argument("--speed", type=int, default=1, metavar="N",
+                       help="N veces el tiempo real (20 turnos/s); 0 = tan rápido como sea posible")
+    serve.add_argument("--fps", type=int, default=30, help="tramas por segundo como máximo")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", default=None, metavar="RUTA", help="escuchar en un socket Unix en lugar de TCP")
+
+    view = subparsers.add_parser("view", help="ventana que muestra un ecosistema servido con serve")
+    view.add_argument("--host", default="127.0.0.1")
+    view.add_argument("--port", type=int, default=8765)
+    view.add_argument("--unix", default=None, metavar="RUTA", help="conectar a un socket Unix en lugar de TCP")
+
+    replay = subparsers.add_parser("replay", help="reproduce una grabación (--record) sin volver a simular")
+    replay.add_argument("grabacion", metavar="RUTA")
+    replay.add_argument("--speed", type=int, default=1, metavar="N", help="N veces el tiempo real (de 1 a 100)")
+    replay.add_argument("--turn", type=int, default=None, metavar="T", help="empezar en el turno T")
+
+    memory = subparsers.add_parser("memory", help="mide los bytes por entidad de cada especie")
+    memory.add_argument("--count", type=int, default=MAX_PLANTAS, help="entidades por medición")
+
+    args = parser.parse_args(argv)
+    if getattr(args, "motor", "objetos") != "objetos" and getattr(args, "plantas", "objetos") != "objetos":
+        parser.error("--plantas campo solo está disponible con --motor objetos")
+
+    if args.comando == "memory":
+        for nombre, bytes_por_entidad in medir_memoria(args.count).items():
+            print(f"{nombre:<24} {bytes_por_entidad:8.1f} bytes")
+        return 0
+
+    if args.comando == "sweep":
+        from barrido import ejecutar_barrido
+        try:
+            ejecutar_barrido(args)
+        except ValueError as error:
+            parser.error(str(error))
+        return 0
+
+    if args.comando == "world":
+        from regiones import ejecutar_mundo
+        ejecutar_mundo(args)
+        return 0
+
+    if args.comando == "replicas":
+        from replicas import ejecutar_replicas
+        ejecutar_replicas(args)
+        return 0
+
+    if args.comando == "serve":
+        from servidor import ejecutar_servidor
+        ejecutar_servidor(args)
+        return 0
+
+    if args.comando == "view":
+        from vista import VistaRemota
+        VistaRemota(args.host, args.port, args.unix).iniciar()
+        return 0
+
+    if args.comando == "replay":
+        from vista import VistaReproduccion
+        VistaReproduccion(args.grabacion, max(1, min(100, args.speed)), args.turn).iniciar()
+        return 0
+
+    if args.comando == "bench":
+        from benchmarks import ejecutar_benchmarks
+        ejecutar_benchmarks(args)
+        return 0
+
+    if args.comando == "run":
+        opciones = dict(plantas=args.plantas, reanudar=args.resume, guardar=args.save, guardar_cada=args.save_every,
+                        telemetria=args.telemetry, perfil=args.profile, grabar=args.record,
+                        cada_clave=args.keyframe_every, trabajadores=args.workers, procesos=args.processes,
+                        config=replace(CONFIG_POR_DEFECTO, dispersion_plantas=args.plant_spread))
+        if args.output:
+            with open(args.output, "w", newline="") as salida:
+                ejecutar(args.turns, args.seed, args.motor, args.every, salida, **opciones)
+        else:
+            ejecutar(args.turns, args.seed, args.motor, args.every, sys.stdout, **opciones)
+        return 0
+
+    from vista import VistaEcosistema
+    vista = VistaEcosistema(getattr(args, "motor", "objetos"), getattr(args, "seed", None),
+                            getattr(args, "plantas", "objetos"), getattr(args, "resume", None),
+                            getattr(args, "save", None), getattr(args, "save_every", 500),
+                            getattr(args, "telemetry", None), getattr(args, "profile", None),
+                            getattr(args, "record", None), getattr(args, "keyframe_every", 250))
+    vista.iniciar()
+    return 0
 
-    def on_key_down(self, event): 
-        if event.GetKeyCode() == wx.WXK_ESCAPE:
-            self.ventana.Close()
 
-    def iniciar(self):
-        self.app.MainLoop()
 
 if __name__ == "__main__":
-    vista = VistaEcosistema()
-    vista.iniciar()
+    # Se usa el módulo importado (y no __main__) para que vista y motor_numpy compartan las mismas clases
+    import dinos
+    sys.exit(dinos.main())
@@ -0,0 +1,254 @@
+"""Estadísticas del ecosistema al día en cada turno sin recorrer las entidades.
+
+El motor avisa de cada cambio de estado: altas y bajas (nacer, morir, entrar o
+salir de una región), cada cambio de la vida de un animal (envejecer, comer,
+reproducirse) y cada evento (nacimientos, muertes, cazas). Con cada aviso se
+actualiza en O(1):
+
+- la media y la varianza de la vida de cada especie animal (Momentos, Welford);
+- un histograma de edades por casillas fijas de ANCHO_EDAD turnos;
+- los eventos del último turno, sus totales y su tasa en los últimos VENTANA
+  turnos (una suma deslizante sobre un búfer circular);
+- el turno en que se extinguió cada especie.
+
+Así cualquier métrica se consulta en O(1) en cualquier turno. Las edades
+crecen todas a la vez, así que el histograma no se recalcula al pasar el
+turno: se guarda cuántos animales vivos nacieron en cada turno y solo se
+cambian de casilla los que cumplen justo un múltiplo de ANCHO_EDAD.
+
+Los motores por lotes (numpy, regiones) no avisan entidad a entidad: reponen
+una vez por turno la población, los Momentos y el histograma de cada especie
+con reponer() y suman sus eventos con contar().
+"""
+import math
+
+ESPECIES = ("plantas", "herbivoros", "carnivoros", "omnivoros", "peces")
+ANIMALES = ESPECIES[1:]
+EVENTOS = ("nacimientos", "muertes", "cazas")
+# Turnos con los que se calculan las tasas
+VENTANA = 100
+# Casillas del histograma de edades: [0, 1000), [1000, 2000)... y la última abierta
+ANCHO_EDAD = 1000
+CASILLAS_EDAD = 10
+
+class Momentos:
+    """Número, media y suma de cuadrados de las desviaciones (m2) de unos valores que cambian."""
+    __slots__ = ("n", "media", "m2")
+
+    def __init__(self, n=0, media=0.0, m2=0.0):
+        self.n = n
+        self.media = media
+        self.m2 = m2
+
+    def agregar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+
+    def quitar(self, x):
+        if self.n <= 1:
+            self.n, self.media, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = x - self.media
+        self.media -= delta / self.n
+        self.m2 = max(0.0, self.m2 - delta * (x - self.media))
+
+    def cambiar(self, antes, despues):
+        """Uno de los valores pasa de `antes` a `despues`."""
+        if not self.n:
+            # Sin valores no hay nada que cambiar: p. ej. en una región, al deshacer el coste de
+            # reproducirse con un fantasma cuando el último animal local de la especie ya ha muerto
+            return
+        delta = despues - antes
+        media = self.media + delta / self.n
+        self.m2 = max(0.0, self.m2 + delta * (despues - media + antes - self.media))
+        self.media = media
+
+    def combinar(self, otro):
+        """Añade los valores de `otro` (p. ej. los de otra región) con la fórmula de Chan."""
+        n = self.n + otro.n
+        if not otro.n:
+            return
+        delta = otro.media - self.media
+        self.m2 += otro.m2 + delta * delta * self.n * otro.n / n
+        self.media += delta * otro.n / n
+        self.n = n
+
+    @property
+    def varianza(self):
+        return self.m2 / self.n if self.n else 0.0
+
+    def tupla(self):
+        return self.n, self.media, self.m2
+
+def _casilla(edad):
+    return min(edad // ANCHO_EDAD, CASILLAS_EDAD - 1)
+
+class Estadisticas:
+    """Métricas de un ecosistema; el motor llama a los avisos y cualquiera puede consultarlas.
+
+    Los eventos se acumulan hasta terminar_turno(), que los pasa a `ultimos`,
+    a `totales` y a la ventana de las tasas.
+    """
+    def __init__(self, turno=0):
+        self.turno = turno
+        self.poblacion = dict.fromkeys(ESPECIES, 0)
+        self.vida = {nombre: Momentos() for nombre in ANIMALES}
+        self.edades = {nombre: [0] * CASILLAS_EDAD for nombre in ANIMALES}
+        # {turno de nacimiento: animales vivos nacidos en él} de cada especie
+        self._nacidos = {nombre: {} for nombre in ANIMALES}
+        # Turno en que cada especie se quedó sin entidades (None mientras quede alguna)
+        self.extinciones = dict.fromkeys(ESPECIES)
+        self.eventos = {evento: dict.fromkeys(ESPECIES, 0) for evento in EVENTOS}
+        self.ultimos = {evento: dict.fromkeys(ESPECIES, 0) for evento in EVENTOS}
+        self.totales = {evento: dict.fromkeys(ESPECIES, 0) for evento in EVENTOS}
+        self.terminados = 0
+        self._historia = {evento: {nombre: [0] * VENTANA for nombre in ESPECIES} for evento in EVENTOS}
+        self._ventana = {evento: dict.fromkeys(ESPECIES, 0) for evento in EVENTOS}
+
+    # --- Avisos del motor ---
+    def alta(self, e):
+        """Una entidad entra en el ecosistema (nace, se carga o llega de otra región)."""
+        if e.nombre == "plantas":
+            self.alta_valores("plantas")
+        else:
+            self.alta_valores(e.nombre, e.vida, e.nacimiento)
+
+    def alta_valores(self, nombre, vida=None, nacimiento=None):
+        """Como alta() con los valores sueltos (p. ej. de una entidad empaquetada); sin nacimiento, el turno actual."""
+        if not self.poblacion[nombre]:
+            self.extinciones[nombre] = None
+        self.poblacion[nombre] += 1
+        if nombre == "plantas":
+            return
+        if nacimiento is None:
+            nacimiento = self.turno
+        self.vida[nombre].agregar(vida)
+        nacidos = self._nacidos[nombre]
+        nacidos[nacimiento] = nacidos.get(nacimiento, 0) + 1
+        self.edades[nombre][_casilla(self.turno - nacimiento)] += 1
+
+    def baja(self, e):
+        """Una entidad sale del ecosistema sin que cuente como muerte (p. ej. se va a otra región)."""
+        nombre = e.nombre
+        self.poblacion[nombre] -= 1
+        if not self.poblacion[nombre]:
+            self.extinciones[nombre] = self.turno
+        if nombre == "plantas":
+            return
+        self.vida[nombre].quitar(e.vida)
+        nacidos = self._nacidos[nombre]
+        quedan = nacidos[e.nacimiento] - 1
+        if quedan:
+            nacidos[e.nacimiento] = quedan
+        else:
+            del nacidos[e.nacimiento]
+        self.edades[nombre][_casilla(self.turno - e.nacimiento)] -= 1
+
+    def morir(self, e):
+        self.baja(e)
+        self.eventos["muertes"][e.nombre] += 1
+
+    def cambio_vida(self, e, antes):
+        """La vida de un animal ha pasado de `antes` a e.vida."""
+        self.vida[e.nombre].cambiar(antes, e.vida)
+
+    def contar(self, evento, nombre, n=1):
+        self.eventos[evento][nombre] += n
+
+    def reponer(self, nombre, poblacion, vida=None, edades=None):
+        """Sustituye la población, los Momentos de la vida y el histograma de edades de una especie."""
+        if poblacion and not self.poblacion[nombre]:
+            self.extinciones[nombre] = None
+        elif not poblacion and self.poblacion[nombre]:
+            self.extinciones[nombre] = self.turno
+        self.poblacion[nombre] = poblacion
+        if vida is not None:
+            self.vida[nombre] = vida
+            self.edades[nombre] = list(edades)
+            # Las edades ya no se siguen por turno de nacimiento hasta la próxima reposición
+            self._nacidos[nombre] = {}
+
+    def empezar_turno(self, turno):
+        """Pasa al turno siguiente: cambia de casilla las edades que cruzan un límite."""
+        self.turno = turno
+        for nombre in ANIMALES:
+            nacidos = self._nacidos[nombre]
+            if not nacidos:
+                continue
+            edades = self.edades[nombre]
+            for k in range(1, CASILLAS_EDAD):
+                n = nacidos.get(turno - k * ANCHO_EDAD)
+                if n:
+                    edades[k - 1] -= n
+                    edades[k] += n
+
+    def terminar_turno(self):
+        """Cierra los eventos del turno: pasan a `ultimos`, a `totales` y a la ventana de las tasas."""
+        i = self.terminados % VENTANA
+        for evento, contadores in self.eventos.items():
+            historia = self._historia[evento]
+            ventana = self._ventana[evento]
+            totales = self.totales[evento]
+            ultimos = self.ultimos[evento]
+            for nombre, n in contadores.items():
+                ventana[nombre] += n - historia[nombre][i]
+                historia[nombre][i] = n
+                totales[nombre] += n
+                ultimos[nombre] = n
+                contadores[nombre] = 0
+        self.terminados += 1
+
+    # --- Regiones ---
+    def parte(self):
+        """Estado de una región para sumarlo en el coordinador con combinar()."""
+        return (dict(self.poblacion), {nombre: m.tupla() for nombre, m in self.vida.items()},
+                {nombre: list(edades) for nombre, edades in self.edades.items()},
+                {evento: dict(contadores) for evento, contadores in self.ultimos.items()})
+
+    def combinar(self, partes):
+        """Repone cada especie con la suma de las partes y cuenta sus eventos del último turno."""
+        for nombre in ESPECIES:
+            poblacion = sum(parte[0][nombre] for parte in partes)
+            if nombre == "plantas":
+                self.reponer(nombre, poblacion)
+                continue
+            vida = Momentos()
+            edades = [0] * CASILLAS_EDAD
+            for _, vidas, histogramas, _ in partes:
+                vida.combinar(Momentos(*vidas[nombre]))
+                edades = [a + b for a, b in zip(edades, histogramas[nombre])]
+            self.reponer(nombre, poblacion, vida, edades)
+        for *_, ultimos in partes:
+            for evento, contadores in ultimos.items():
+                for nombre, n in contadores.items():
+                    self.eventos[evento][nombre] += n
+
+    # --- Consultas ---
+    def media_vida(self, nombre):
+        return self.vida[nombre].media
+
+    def desviacion_vida(self, nombre):
+        return math.sqrt(self.vida[nombre].varianza)
+
+    def histograma_edades(self, nombre):
+        """[(edad mínima de la casilla, animales)]; la última casilla no tiene edad máxima."""
+        return [(k * ANCHO_EDAD, n) for k, n in enumerate(self.edades[nombre])]
+
+    def tasa(self, evento, nombre=None):
+        """Eventos por turno en los últimos VENTANA turnos, de `nombre` o de todas las especies."""
+        turnos = min(self.terminados, VENTANA)
+        if not turnos:
+            return 0.0
+        ventana = self._ventana[evento]
+        return (ventana[nombre] if nombre else sum(ventana.values())) / turnos
+
+    def resumen(self):
+        """Copia pequeña de las métricas para la vista (se toma con cada Instantanea)."""
+        return {
+            "vida": {nombre: (self.vida[nombre].media, self.desviacion_vida(nombre)) for nombre in ANIMALES},
+            "tasas": {evento: self.tasa(evento) for evento in EVENTOS},
+            "extinciones": {nombre: turno for nombre, turno in self.extinciones.items() if turno is not None},
+        }
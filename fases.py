@@ -0,0 +1,438 @@
+"""Turno en dos fases: propuestas sobre una foto del turno y resolución determinista.
+
+En Ecosistema.simular_turno cada entidad actúa sobre lo que han dejado las
+anteriores (plantas comidas, presas cazadas, la vida y el cooldown de la
+pareja), así que el resultado depende del orden de la lista y el bucle no se
+puede repartir. EcosistemaFases divide el turno en:
+
+1. Foto: posición y estado de cada entidad al empezar el turno, en listas
+   planas y en el orden de sus rejillas (Foto).
+2. Propuestas: cada entidad, leyendo solo la foto, calcula su movimiento, las
+   plantas o presas que comería, las parejas posibles, su cría y un sorteo de
+   prioridad. Las entidades se reparten en bloques de TAM_BLOQUE por especie y
+   cada bloque usa su propio random.Random, sembrado con la semilla del turno
+   y su número, así que el resultado es el mismo con cualquier número de
+   trabajadores (hilos o procesos) o sin ninguno.
+3. Resolución, en este proceso: se aplican los movimientos y, por orden de
+   prioridad, cada animal se queda con la primera planta de su lista que
+   siga sin comer, cada depredador con la primera presa viva y cada animal
+   con la primera pareja libre. Así una planta tiene un comedor, una presa un
+   depredador y un animal una pareja por turno.
+
+Las reglas (radios, ganancias, costes, límites) son las de Ecosistema, salvo
+que un animal que muere al envejecer ya no come ni se reproduce ese turno, una
+planta comida no se dispersa, las presas y parejas se buscan en su posición
+al empezar el turno y cada animal propone como mucho CANDIDATOS de cada una.
+Las trayectorias no coinciden con las del turno en orden.
+"""
+import multiprocessing
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from dinos import (
+    CONFIG_POR_DEFECTO,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez, Ecosistema,
+)
+from telemetria import fila_turno
+
+ESPECIES = (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)
+ANIMALES = (Herbivoro, Carnivoro, Omnivoro, Pez)
+# Entidades por bloque de propuestas: fija el reparto de números aleatorios, no el de trabajadores
+TAM_BLOQUE = 1024
+# Plantas, presas o parejas que propone cada animal, por si las primeras ya están cogidas
+CANDIDATOS = 8
+TAM_CELDA = 30
+# Campos de Configuracion con el coste y el cooldown de reproducción de los terrestres
+REPRODUCCION = {Herbivoro: "herbivoro_repro", Carnivoro: "carnivoro_repro", Omnivoro: "omnivoro_repro"}
+
+# --- Foto y propuestas (solo leen la foto: pueden ir en otro hilo o proceso) ---
+@dataclass
+class Foto:
+    """Estado al empezar el turno, sin objetos de entidades (se envía tal cual a los procesos)."""
+    turno: int
+    semilla: int
+    plantas: list   # [(x, y)]
+    animales: dict  # {clase: [(x, y, dirección, vida, fin_comer, fin_repro)]}
+
+@dataclass
+class Propuesta:
+    """Lo que un animal haría este turno; los índices son de la foto de su especie."""
+    indice: int
+    x: float
+    y: float
+    direccion: float
+    vida: float
+    prioridad: float
+    plantas: tuple = ()
+    presas: tuple = ()
+    gana: bool = False
+    parejas: tuple = ()
+    marca: bool = False
+    cria: tuple = None
+
+class _Indice:
+    """Puntos (las dos primeras componentes de cada tupla) agrupados por celdas de `tam`."""
+    def __init__(self, puntos, tam=TAM_CELDA):
+        self.puntos = puntos
+        self.tam = tam
+        self.celdas = {}
+        for i, punto in enumerate(puntos):
+            self.celdas.setdefault((int(punto[0] // tam), int(punto[1] // tam)), []).append(i)
+
+    def vecinos(self, x, y, radio):
+        """Índices de los puntos a distancia < radio, en el orden de la foto."""
+        radio2 = radio * radio
+        tam = self.tam
+        puntos = self.puntos
+        encontrados = []
+        for columna in range(int((x - radio) // tam), int((x + radio) // tam) + 1):
+            for fila in range(int((y - radio) // tam), int((y + radio) // tam) + 1):
+                for i in self.celdas.get((columna, fila), ()):
+                    dx = x - puntos[i][0]
+                    dy = y - puntos[i][1]
+                    if dx * dx + dy * dy < radio2:
+                        encontrados.append(i)
+        encontrados.sort()
+        return encontrados
+
+class Vecindad:
+    """Búsquedas de vecinos en la foto; el índice de cada especie se construye la primera vez que se pide."""
+    def __init__(self, foto):
+        self.foto = foto
+        self._indices = {}
+
+    def vecinos(self, cls, x, y, radio):
+        indice = self._indices.get(cls)
+        if indice is None:
+            puntos = self.foto.plantas if cls is Planta else self.foto.animales[cls]
+            indice = self._indices[cls] = _Indice(puntos)
+        return indice.vecinos(x, y, radio)
+
+def _proponer_plantas(foto, inicio, fin, rng, config):
+    """[(índice, cría)] de las plantas [inicio, fin) que se dispersan."""
+    if not config.dispersion_plantas or len(foto.plantas) >= config.max_plantas:
+        return []
+    dispersar = Planta.dispersar
+    crias = []
+    for i in range(inicio, fin):
+        x, y = foto.plantas[i]
+        cria = dispersar(x, y, rng, config)
+        if cria:
+            crias.append((i, cria))
+    return crias
+
+def _cria_terrestre(cls, x, y, rng, terreno):
+    for _ in range(5):
+        nuevo_x = max(0, min(terreno.ancho_mundo, x + rng.uniform(-20, 20)))
+        nuevo_y = max(0, min(terreno.alto_mundo, y + rng.uniform(-20, 20)))
+        if not terreno.es_agua(nuevo_x, nuevo_y):
+            return cls.cria(nuevo_x, nuevo_y, rng)
+    return None
+
+def _proponer_animales(foto, vecindad, cls, inicio, fin, rng, config):
+    """Propuestas de los animales [inicio, fin) de la especie `cls`."""
+    terreno = config.terreno
+    estados = foto.animales[cls]
+    propuestas = []
+    for i in range(inicio, fin):
+        x, y, direccion, vida, fin_comer, fin_repro = estados[i]
+        x, y, direccion = cls.paso(x, y, direccion, rng, config)
+        p = Propuesta(i, x, y, direccion, vida - cls.desgaste, rng.random())
+        propuestas.append(p)
+        if p.vida <= 0:
+            continue
+
+        if not fin_comer:
+            if cls is Herbivoro:
+                p.plantas = tuple(vecindad.vecinos(Planta, x, y, 30)[:CANDIDATOS])
+            elif cls is Carnivoro:
+                # Cada presa se caza con probabilidad 0.7: solo se proponen las que salen
+                cercanas = vecindad.vecinos(Herbivoro, x, y, 18)[:CANDIDATOS]
+                p.presas = tuple(j for j in cercanas if rng.random() < 0.7)
+            elif cls is Omnivoro:
+                p.plantas = tuple(vecindad.vecinos(Planta, x, y, 20)[:CANDIDATOS])
+                p.presas = tuple(vecindad.vecinos(Herbivoro, x, y, 18)[:CANDIDATOS])
+                p.gana = rng.random() < 0.6
+
+        if not fin_repro:
+            parejas = [j for j in vecindad.vecinos(cls, x, y, 28) if j != i and not estados[j][5]]
+            if not parejas:
+                continue
+            p.parejas = tuple(parejas[:CANDIDATOS])
+            if cls is Pez:
+                if len(estados) < config.max_peces and rng.random() < 0.35:
+                    p.marca = True
+                    nuevo_x = x + rng.uniform(-10, 10)
+                    nuevo_y = y + rng.uniform(-10, 10)
+                    if not terreno.es_agua(nuevo_x, nuevo_y):
+                        nuevo_x, nuevo_y = terreno.posicion_agua(rng)
+                    p.cria = Pez.cria(nuevo_x, nuevo_y, rng)
+            else:
+                p.marca = rng.random() < 0.25
+                p.cria = _cria_terrestre(cls, x, y, rng, terreno)
+    return propuestas
+
+def proponer(foto, bloques, config=CONFIG_POR_DEFECTO, vecindad=None):
+    """{k: propuestas} de los bloques (k, clase, inicio, fin) dados, leyendo solo la foto."""
+    vecindad = vecindad or Vecindad(foto)
+    resultado = {}
+    for k, cls, inicio, fin in bloques:
+        rng = random.Random(foto.semilla * 1_000_003 + k)
+        if cls is Planta:
+            resultado[k] = _proponer_plantas(foto, inicio, fin, rng, config)
+        else:
+            resultado[k] = _proponer_animales(foto, vecindad, cls, inicio, fin, rng, config)
+    return resultado
+
+# --- Reparto de los bloques ---
+def _trabajar(conexion, config):
+    """Bucle del proceso trabajador: recibe (foto, bloques) y devuelve sus propuestas."""
+    while True:
+        mensaje = conexion.recv()
+        if mensaje is None:
+            break
+        conexion.send(proponer(*mensaje, config))
+    conexion.close()
+
+class _RepartoLocal:
+    """Todos los bloques en este hilo (trabajadores=0)."""
+    def __init__(self, config):
+        self.config = config
+
+    def proponer(self, foto, bloques):
+        return proponer(foto, bloques, self.config)
+
+    def cerrar(self):
+        pass
+
+class _RepartoHilos:
+    """Bloques repartidos entre hilos que comparten la foto y sus índices."""
+    def __init__(self, config, trabajadores):
+        self.config = config
+        self.trabajadores = trabajadores
+        self._pool = ThreadPoolExecutor(trabajadores, thread_name_prefix="propuestas")
+
+    def proponer(self, foto, bloques):
+        vecindad = Vecindad(foto)
+        partes = [bloques[k::self.trabajadores] for k in range(self.trabajadores)]
+        resultado = {}
+        for parte in self._pool.map(lambda parte: proponer(foto, parte, self.config, vecindad), partes):
+            resultado.update(parte)
+        return resultado
+
+    def cerrar(self):
+        self._pool.shutdown()
+
+class _RepartoProcesos:
+    """Bloques repartidos entre procesos; cada uno recibe la foto del turno y la configuración al empezar.
+
+    Experimental: la foto entera se serializa para cada proceso en cada turno, así
+    que solo compensa con muchas entidades por turno y varios núcleos libres.
+    """
+    def __init__(self, config, trabajadores):
+        self.conexiones = []
+        self.procesos = []
+        for k in range(trabajadores):
+            conexion, remota = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(target=_trabajar, args=(remota, config),
+                                              name=f"propuestas-{k}", daemon=True)
+            proceso.start()
+            remota.close()
+            self.conexiones.append(conexion)
+            self.procesos.append(proceso)
+
+    def proponer(self, foto, bloques):
+        n = len(self.conexiones)
+        for k, conexion in enumerate(self.conexiones):
+            conexion.send((foto, bloques[k::n]))
+        resultado = {}
+        for conexion in self.conexiones:
+            resultado.update(conexion.recv())
+        return resultado
+
+    def cerrar(self):
+        for conexion, proceso in zip(self.conexiones, self.procesos):
+            conexion.send(None)
+            proceso.join()
+        self.conexiones = self.procesos = []
+
+# --- Ecosistema ---
+class EcosistemaFases(Ecosistema):
+    """Ecosistema cuyo turno se calcula en dos fases (ver el módulo); solo con plantas como objetos."""
+    motor = "fases"
+    # Todos los animales actúan a la vez sobre la foto del turno: los cooldowns acaban al empezarlo
+    en_orden = False
+
+    def __init__(self, config=CONFIG_POR_DEFECTO, semilla=None, plantas="objetos", trabajadores=0, procesos=False):
+        if plantas != "objetos":
+            raise ValueError("El turno en dos fases necesita las plantas como objetos; usa plantas=\"objetos\"")
+        super().__init__(config, semilla, plantas)
+        self.reparto = None
+        self.repartir(trabajadores, procesos)
+
+    def repartir(self, trabajadores=0, procesos=False):
+        """Calcula las propuestas con `trabajadores` hilos (o procesos, experimental), o en este hilo si es 0."""
+        if self.reparto is not None:
+            self.reparto.cerrar()
+        if not trabajadores:
+            self.reparto = _RepartoLocal(self.config)
+        elif procesos:
+            self.reparto = _RepartoProcesos(self.config, trabajadores)
+        else:
+            self.reparto = _RepartoHilos(self.config, trabajadores)
+
+    def cerrar(self):
+        self.reparto.cerrar()
+        self.reparto = _RepartoLocal(self.config)
+
+    def _foto(self):
+        """Foto del turno y las entidades de cada especie en el mismo orden."""
+        objetos = {cls: list(self.rejillas[cls]) for cls in ESPECIES}
+        # Una extracción del generador del ecosistema por turno: los puntos de control la reproducen
+        semilla = int(self.rng.random() * 2 ** 53)
+        foto = Foto(
+            self.turno, semilla,
+            [(e.posicion_x, e.posicion_y) for e in objetos[Planta]],
+            {cls: [(e.posicion_x, e.posicion_y, e.direccion, e.vida, e.fin_comer, e.fin_repro) for e in objetos[cls]]
+             for cls in ANIMALES},
+        )
+        return foto, objetos
+
+    def _proponer(self, foto):
+        bloques = []
+        for cls in ESPECIES:
+            n = len(foto.plantas) if cls is Planta else len(foto.animales[cls])
+            for inicio in range(0, n, TAM_BLOQUE):
+                bloques.append((len(bloques), cls, inicio, min(n, inicio + TAM_BLOQUE)))
+        resultado = self.reparto.proponer(foto, bloques)
+        return {cls: [x for k, c, _, _ in bloques if c is cls for x in resultado[k]] for cls in ESPECIES}
+
+    def simular_turno(self):
+        self.agenda.avanzar()
+        self.estadisticas.empezar_turno(self.turno)
+        self._vaciar_cambios_plantas()
+        self.asignaciones = 0
+        for especie in ANIMALES:
+            for e in self.rejillas[especie]:
+                e.ya_reprodujo = False
+
+        foto, objetos = self._foto()
+        propuestas = self._proponer(foto)
+        crias = self._resolver(propuestas, objetos)
+
+        self._compactar()
+        vivas = self._poblacion()
+        self._admitir(crias)
+        self._controlar_peces(vivas)
+        self.estadisticas.terminar_turno()
+
+        if self.telemetria is not None:
+            self.telemetria.registrar(fila_turno(self))
+
+    def _resolver(self, propuestas, objetos):
+        """Aplica las propuestas resolviendo los conflictos y devuelve las crías (paso 3 del módulo)."""
+        config = self.config
+        agenda = self.agenda
+        estadisticas = self.estadisticas
+        plantas = objetos[Planta]
+        herbivoros = objetos[Herbivoro]
+
+        # Movimiento y envejecimiento; `vidas` guarda la vida de antes para avisar al final de cada cambio
+        orden = []
+        vidas = []
+        for n, cls in enumerate(ANIMALES):
+            rejilla = self.rejillas[cls]
+            for p in propuestas[cls]:
+                e = objetos[cls][p.indice]
+                if not e.viva:
+                    # Muerto de vejez al empezar el turno (Agenda.avanzar)
+                    continue
+                vidas.append((e, e.vida))
+                e.posicion_x, e.posicion_y, e.direccion, e.vida = p.x, p.y, p.direccion, p.vida
+                rejilla.actualizar(e)
+                if e.vida <= 0:
+                    e.viva = False
+                else:
+                    orden.append((p.prioridad, n, p.indice, e, p))
+        # Menor sorteo primero; a igualdad, especie y orden en la foto
+        orden.sort(key=lambda t: t[:3])
+
+        # Plantas: un comedor por planta
+        comieron = set()
+        for _, _, _, e, p in orden:
+            for j in p.plantas:
+                planta = plantas[j]
+                if planta.viva:
+                    planta.viva = False
+                    if type(e) is Herbivoro:
+                        e.vida = min(e.vida + 20, 10000)
+                    else:
+                        e.vida = min(e.vida + 8, 1100)
+                    agenda.enfriar_comer(e, 4)
+                    comieron.add(e)
+                    break
+
+        # Presas: un depredador por presa; el omnívoro solo caza si no ha comido planta
+        cazas = 0
+        for _, _, _, e, p in orden:
+            if not p.presas or e in comieron:
+                continue
+            for j in p.presas:
+                presa = herbivoros[j]
+                if presa.viva:
+                    presa.viva = False
+                    cazas += 1
+                    estadisticas.contar("cazas", e.nombre)
+                    if type(e) is Carnivoro:
+                        e.vida = min(e.vida + 10, 1150)
+                        agenda.enfriar_comer(e, 15)
+                    else:
+                        if p.gana:
+                            e.vida = min(e.vida + 8, 1100)
+                        agenda.enfriar_comer(e, 8)
+                    break
+        self.cazas = cazas
+
+        # Parejas: una por animal; el que propone pone la cría
+        crias = []
+        emparejados = set()
+        for _, _, _, e, p in orden:
+            if not p.parejas or not e.viva or e in emparejados:
+                continue
+            cls = type(e)
+            for j in p.parejas:
+                otro = objetos[cls][j]
+                if not otro.viva or otro in emparejados:
+                    continue
+                emparejados.add(e)
+                emparejados.add(otro)
+                if cls is Pez:
+                    coste, cooldown = 50, 50
+                else:
+                    coste = getattr(config, REPRODUCCION[cls] + "_coste")
+                    cooldown = getattr(config, REPRODUCCION[cls] + "_cooldown")
+                e.vida -= coste
+                otro.vida -= coste
+                if e.vida <= 0:
+                    e.viva = False
+                if otro.vida <= 0:
+                    otro.viva = False
+                if not e.viva or not otro.viva:
+                    break
+                if p.marca:
+                    e.ya_reprodujo = otro.ya_reprodujo = True
+                # Los peces solo cuentan como reproducidos (y se enfrían) si sale su sorteo
+                if cls is not Pez or p.marca:
+                    agenda.enfriar_repro(e, cooldown)
+                    agenda.enfriar_repro(otro, cooldown)
+                if p.cria:
+                    crias.append(p.cria)
+                break
+
+        for e, antes in vidas:
+            estadisticas.cambio_vida(e, antes)
+
+        # Se dispersan las plantas que no se han comido
+        crias[:0] = [cria for i, cria in propuestas[Planta] if plantas[i].viva]
+        return crias
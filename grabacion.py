@@ -0,0 +1,230 @@
+"""Grabación de una ejecución turno a turno y su reproducción sin volver a simular.
+
+El archivo empieza con MAGIA y el SALUDO de tramas.py, y después tiene un
+mensaje por turno: una CLAVE (estado completo) cada `cada_clave` turnos y una
+DELTA (posiciones en píxeles de lo que se ha movido, nacimientos y muertes) en
+los demás. La carga de cada mensaje guarda el turno y los conteos tal cual y el
+resto comprimido con zlib, así que al abrir el archivo se indexan todos los
+turnos y sus conteos sin descomprimir nada. Para ir a un turno se aplica la
+clave anterior más cercana y las deltas que la siguen.
+
+Con 10.000 plantas y una clave cada 250 turnos, una ejecución completa de
+9.000 turnos ocupa unos pocos MB.
+"""
+import bisect
+import mmap
+import queue
+import threading
+import time
+import zlib
+from array import array
+
+from simulador import Instantanea, INTERVALO_PUBLICACION, TURNOS_POR_SEGUNDO, TURNOS_SERIES
+from tramas import (
+    CABECERA, CLAVE, CONTEOS, DELTA, NOMBRES, SALUDO,
+    EstadoRemoto, Seguidor, codificar_saludo, decodificar_saludo, mensaje,
+)
+
+MAGIA = b"ECOGRB01"
+CADA_CLAVE = 250
+VELOCIDADES = (1, 2, 5, 10, 20, 50, 100)
+
+def _comprimir(tipo, carga):
+    return mensaje(tipo, carga[:CONTEOS.size] + zlib.compress(carga[CONTEOS.size:]))
+
+def _descomprimir(carga):
+    return carga[:CONTEOS.size] + zlib.decompress(carga[CONTEOS.size:])
+
+# --- Grabación ---
+class Grabador:
+    """Graba cada turno en `ruta`; la compresión y la escritura van en un hilo aparte."""
+    def __init__(self, ruta, cada_clave=CADA_CLAVE):
+        self.ruta = ruta
+        self.cada_clave = cada_clave
+        self.seguidor = Seguidor()
+        self.grabados = 0
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._escribir, name="grabacion", daemon=True)
+        self._hilo.start()
+
+    def registrar(self, ecosistema):
+        """Graba el estado actual (llamar antes del primer turno y después de cada uno)."""
+        if self.grabados == 0:
+            self._cola.put((SALUDO, codificar_saludo(ecosistema)))
+        trama = self.seguidor.trama(ecosistema)
+        if self.grabados % self.cada_clave == 0:
+            self._cola.put((CLAVE, trama.clave()))
+        else:
+            self._cola.put((DELTA, trama.delta))
+        self.grabados += 1
+
+    def _escribir(self):
+        with open(self.ruta, "wb") as archivo:
+            archivo.write(MAGIA)
+            while True:
+                elemento = self._cola.get()
+                if elemento is None:
+                    return
+                tipo, mensaje_ = elemento
+                if tipo == SALUDO:
+                    archivo.write(mensaje_)
+                else:
+                    archivo.write(_comprimir(tipo, mensaje_[CABECERA.size:]))
+
+    def cerrar(self, ecosistema=None):
+        """Espera a que se escriba todo lo grabado."""
+        if self._cola is None:
+            return
+        self._cola.put(None)
+        self._hilo.join()
+        self._cola = None
+
+# --- Lectura ---
+class Grabacion:
+    """Índice de una grabación: turno, posición y conteos de cada mensaje y dónde están las claves."""
+    def __init__(self, ruta):
+        with open(ruta, "rb") as archivo:
+            self.datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.datos[:len(MAGIA)] != MAGIA:
+            raise ValueError(f"{ruta} no es una grabación del ecosistema")
+        desde = len(MAGIA)
+        longitud, tipo = CABECERA.unpack_from(self.datos, desde)
+        if bytes((tipo,)) != SALUDO:
+            raise ValueError(f"{ruta} no empieza con el saludo")
+        inicio = desde + CABECERA.size
+        self.config, self.turnos_max = decodificar_saludo(self.datos[inicio:inicio + longitud - 1])
+        desde = inicio + longitud - 1
+
+        self.turnos = array("q")
+        self.posiciones = array("q")
+        self.conteos = {nombre: array("q") for nombre in NOMBRES}
+        self.claves = []
+        total = len(self.datos)
+        # Un mensaje incompleto al final (ejecución interrumpida) se descarta
+        while desde + CABECERA.size + CONTEOS.size <= total:
+            longitud, tipo = CABECERA.unpack_from(self.datos, desde)
+            if desde + CABECERA.size + longitud - 1 > total:
+                break
+            turno, *conteos = CONTEOS.unpack_from(self.datos, desde + CABECERA.size)
+            if bytes((tipo,)) == CLAVE:
+                self.claves.append(len(self.turnos))
+            self.turnos.append(turno)
+            self.posiciones.append(desde)
+            for nombre, valor in zip(NOMBRES, conteos):
+                self.conteos[nombre].append(valor)
+            desde += CABECERA.size + longitud - 1
+        if not self.claves or self.claves[0] != 0:
+            raise ValueError(f"{ruta} no tiene ningún turno grabado")
+
+    def __len__(self):
+        return len(self.turnos)
+
+    def indice(self, turno):
+        """Índice del último mensaje con turno <= `turno` (o del primero)."""
+        return max(0, bisect.bisect_right(self.turnos, turno) - 1)
+
+    def aplicar(self, estado, i):
+        """Aplica el mensaje `i` a un EstadoRemoto."""
+        desde = self.posiciones[i]
+        longitud, tipo = CABECERA.unpack_from(self.datos, desde)
+        carga = self.datos[desde + CABECERA.size:desde + CABECERA.size + longitud - 1]
+        estado.aplicar(bytes((tipo,)), _descomprimir(carga))
+
+    def ir_a(self, estado, actual, i):
+        """Lleva `estado`, que está en el mensaje `actual` (-1 si vacío), al mensaje `i`.
+
+        Si no hay una clave entre medias sigue aplicando deltas; si no, parte de
+        la clave anterior a `i` más cercana.
+        """
+        clave = self.claves[bisect.bisect_right(self.claves, i) - 1]
+        if actual < clave or actual > i:
+            actual = clave - 1
+        for j in range(actual + 1, i + 1):
+            self.aplicar(estado, j)
+
+    def series(self, i, n=TURNOS_SERIES):
+        """Conteos de los `n` turnos grabados que acaban en el mensaje `i`, para las gráficas."""
+        desde = max(0, i + 1 - n)
+        return {nombre: self.conteos[nombre][desde:i + 1].tolist() for nombre in NOMBRES}
+
+    def cerrar(self):
+        self.datos.close()
+
+# --- Reproducción ---
+class Reproductor:
+    """Reproduce una Grabacion en un hilo y publica Instantaneas, como un Simulador.
+
+    `velocidad` multiplica TURNOS_POR_SEGUNDO (de 1 a 100); buscar() y
+    alternar_pausa() los aplica el hilo entre dos turnos.
+    """
+    def __init__(self, grabacion, velocidad=1, turno=None):
+        self.grabacion = grabacion
+        self.velocidad = velocidad
+        self.pausado = False
+        self.estado = EstadoRemoto()
+        self.actual = -1
+        self._buscado = None
+        self._cambio = threading.Event()
+        self._detener = threading.Event()
+        self._ir_a(grabacion.indice(grabacion.turnos[0] if turno is None else turno))
+        self._hilo = threading.Thread(target=self._bucle, name="reproduccion", daemon=True)
+
+    @property
+    def turno(self):
+        return self.grabacion.turnos[self.actual]
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._cambio.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
+
+    def buscar(self, turno):
+        self._buscado = turno
+        self._cambio.set()
+
+    def alternar_pausa(self):
+        self.pausado = not self.pausado
+        self._cambio.set()
+
+    def _ir_a(self, i):
+        self.grabacion.ir_a(self.estado, self.actual, i)
+        self.actual = i
+        self._publicar()
+
+    def _publicar(self):
+        self.instantanea = Instantanea(self.estado.turno, self.estado.conteos, self.estado.estado_por_especie(),
+                                       self.grabacion.series(self.actual))
+
+    def _bucle(self):
+        grabacion = self.grabacion
+        ultimo = len(grabacion) - 1
+        siguiente = ultima_publicacion = time.perf_counter()
+        while not self._detener.is_set():
+            if self._buscado is not None:
+                turno, self._buscado = self._buscado, None
+                self._ir_a(grabacion.indice(turno))
+                siguiente = time.perf_counter()
+            if self.pausado or self.actual >= ultimo:
+                # Parado: se espera a que cambie algo (búsqueda, pausa o detener)
+                self._cambio.wait()
+                self._cambio.clear()
+                siguiente = time.perf_counter()
+                continue
+
+            grabacion.aplicar(self.estado, self.actual + 1)
+            self.actual += 1
+            ahora = time.perf_counter()
+            if ahora - ultima_publicacion >= INTERVALO_PUBLICACION or self.actual == ultimo:
+                self._publicar()
+                ultima_publicacion = ahora
+
+            siguiente += 1 / (TURNOS_POR_SEGUNDO * self.velocidad)
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                self._detener.wait(espera)
+            else:
+                siguiente = time.perf_counter()
@@ -0,0 +1,562 @@
+"""Motor alternativo del ecosistema: estado por especie en arreglos de NumPy.
+
+Cada especie guarda posiciones, dirección, vida, edad, cooldowns y banderas en
+arreglos paralelos, y el turno se calcula con operaciones por lotes en lugar de
+llamar a mover()/envejecer() objeto por objeto. Las reglas (radios, costes,
+límites de población) son las mismas que en Ecosistema; el orden interno del
+turno es por fases, así que las trayectorias no coinciden paso a paso.
+
+Las estadísticas (estadisticas.Estadisticas) también van por lotes: los
+eventos se cuentan al nacer, morir y cazar, y la vida y las edades de cada
+especie se reponen una vez al final del turno con operaciones sobre los arreglos.
+"""
+import math
+
+import numpy as np
+
+from dinos import (
+    CONFIG_POR_DEFECTO,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez,
+)
+from estadisticas import ANCHO_EDAD, CASILLAS_EDAD, Estadisticas, Momentos
+from telemetria import fila_turno
+
+# Tamaño del mundo por defecto (el de cada ecosistema sale de su terreno)
+ANCHO = 480
+ALTO = 380
+
+# Vida inicial de cada especie al nacer
+VIDA_INICIAL = {Planta: 999, Herbivoro: 1200, Carnivoro: 950, Omnivoro: 920, Pez: 1000}
+SALTO = {Planta: 0.0, Herbivoro: 2.0, Carnivoro: 2.0, Omnivoro: 2.0, Pez: 1.2}
+
+# Lado de celda de los índices: con celdas menores que el radio se descartan más candidatos
+TAM_CELDA = 10
+
+def mascara_agua(terreno):
+    """Mapa de bits de un Terreno como arreglo booleano (filas x columnas)."""
+    return np.frombuffer(terreno.agua, dtype=np.uint8).reshape(terreno.alto, terreno.ancho).astype(bool)
+
+def en_agua(agua, x, y, escala=1):
+    """Versión vectorizada de Terreno.es_agua sobre una máscara de mascara_agua."""
+    filas, columnas = agua.shape
+    if escala != 1:
+        x = np.asarray(x) * (1 / escala)
+        y = np.asarray(y) * (1 / escala)
+    return agua[np.clip(np.asarray(y).astype(np.int64), 0, filas - 1),
+                np.clip(np.asarray(x).astype(np.int64), 0, columnas - 1)]
+
+def _cercanos(ax, ay, bx, by, radio):
+    """Matriz booleana (len(a) x len(b)) de pares a distancia < radio."""
+    dx = ax[:, None] - bx[None, :]
+    dy = ay[:, None] - by[None, :]
+    return dx * dx + dy * dy < radio * radio
+
+def _casilla(v, tam):
+    """Número de casilla de cada coordenada (las posiciones nunca son negativas)."""
+    # Truncar un producto es bastante más barato que la división entera de flotantes
+    return (v * (1.0 / tam)).astype(np.int64)
+
+class IndiceCeldas:
+    """Puntos agrupados por celdas de lado `tam` mediante una ordenación por celda."""
+    def __init__(self, x, y, tam, ancho=ANCHO, alto=ALTO):
+        self.x = x
+        self.y = y
+        self.tam = tam
+        self.columnas = int(ancho // tam) + 1
+        self.filas = int(alto // tam) + 1
+        # Con enteros pequeños la ordenación estable de NumPy es por radix (int16 si caben)
+        tipo = np.int16 if self.columnas * self.filas <= np.iinfo(np.int16).max else np.int32
+        celda = (np.clip(_casilla(y, tam), 0, self.filas - 1) * self.columnas
+                 + np.clip(_casilla(x, tam), 0, self.columnas - 1)).astype(tipo)
+        self.orden = np.argsort(celda, kind="stable")
+        self.inicios = np.zeros(self.columnas * self.filas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(celda, minlength=self.columnas * self.filas), out=self.inicios[1:])
+
+    def pares(self, ax, ay, radio):
+        """Pares (a, b) a distancia < radio, agrupados por a en orden creciente.
+
+        Cada a solo se compara con los puntos de las celdas que cubren su círculo de búsqueda.
+        """
+        k = int(math.ceil(radio / self.tam))
+        lado = 2 * k + 1
+        desp = np.arange(-k, k + 1)
+        col_a = np.clip(_casilla(ax, self.tam), 0, self.columnas - 1)
+        fila_a = np.clip(_casilla(ay, self.tam), 0, self.filas - 1)
+        vc = (col_a[:, None] + np.tile(desp, lado)).ravel()
+        vf = (fila_a[:, None] + np.repeat(desp, lado)).ravel()
+        dentro = (vc >= 0) & (vc < self.columnas) & (vf >= 0) & (vf < self.filas)
+        celdas = (vf * self.columnas + vc)[dentro]
+        desde = self.inicios[celdas]
+        cuantos = self.inicios[celdas + 1] - desde
+
+        total = int(cuantos.sum())
+        if total == 0:
+            vacio = np.zeros(0, dtype=np.int64)
+            return vacio, vacio
+        a = np.repeat(np.flatnonzero(dentro) // (lado * lado), cuantos)
+        b = self.orden[np.repeat(desde - (np.cumsum(cuantos) - cuantos), cuantos) + np.arange(total)]
+        dx = ax[a] - self.x[b]
+        dy = ay[a] - self.y[b]
+        cerca = dx * dx + dy * dy < radio * radio
+        return a[cerca], b[cerca]
+
+def _emparejar(a, b, libres):
+    """Asigna a cada a su primera b libre (en el orden de los pares); en un conflicto gana el a de menor índice.
+
+    `a` debe venir agrupado en orden creciente. Se resuelve por rondas
+    vectorizadas: los perdedores de una ronda vuelven a elegir entre las b que
+    siguen libres. Devuelve los pares ganadores.
+    """
+    libres = libres.copy()
+    asignado = np.zeros(int(a.max()) + 1 if len(a) else 0, dtype=bool)
+    ganadores_a, ganadores_b = [], []
+    while len(a):
+        validos = libres[b] & ~asignado[a]
+        a, b = a[validos], b[validos]
+        if len(a) == 0:
+            break
+        primero = np.flatnonzero(np.r_[True, a[1:] != a[:-1]])
+        # np.unique devuelve la primera aparición de cada b, que es la del a más bajo
+        elegidas_b, idx_ganador = np.unique(b[primero], return_index=True)
+        elegidos_a = a[primero][idx_ganador]
+        libres[elegidas_b] = False
+        asignado[elegidos_a] = True
+        ganadores_a.append(elegidos_a)
+        ganadores_b.append(elegidas_b)
+    if not ganadores_a:
+        vacio = np.zeros(0, dtype=np.int64)
+        return vacio, vacio
+    a = np.concatenate(ganadores_a)
+    b = np.concatenate(ganadores_b)
+    orden = np.argsort(a, kind="stable")
+    return a[orden], b[orden]
+
+def _enteros(x, y):
+    """[(x, y), ...] en coordenadas enteras, como las de estado_por_especie()."""
+    return list(zip(x.astype(np.int64).tolist(), y.astype(np.int64).tolist()))
+
+class Poblacion:
+    """Estado de una especie como estructura de arreglos.
+
+    `ident` da a cada individuo un número estable mientras vive (para las
+    tramas de los visores remotos); no forma parte de CAMPOS porque no se
+    guarda en los puntos de control.
+    """
+    CAMPOS = ("x", "y", "direccion", "vida", "edad", "cooldown_comer", "cooldown_repro", "viva", "ya_reprodujo")
+
+    def __init__(self, ancho=ANCHO, alto=ALTO):
+        self.ancho = ancho
+        self.alto = alto
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.direccion = np.zeros(0)
+        self.vida = np.zeros(0)
+        self.edad = np.zeros(0, dtype=np.int64)
+        self.cooldown_comer = np.zeros(0, dtype=np.int32)
+        self.cooldown_repro = np.zeros(0, dtype=np.int32)
+        self.viva = np.zeros(0, dtype=bool)
+        self.ya_reprodujo = np.zeros(0, dtype=bool)
+        self.ident = np.zeros(0, dtype=np.int64)
+        self._siguiente_ident = 0
+        self._indice = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def agregar(self, x, y, vida, direccion, edad=0, cooldown_comer=0, cooldown_repro=0):
+        """Añade un lote de individuos (todos los argumentos aceptan arreglos o escalares)."""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        n = len(x)
+        if n == 0:
+            return
+        nuevos = {
+            "x": x,
+            "y": np.broadcast_to(np.asarray(y, dtype=float), n),
+            "direccion": np.broadcast_to(np.asarray(direccion, dtype=float), n),
+            "vida": np.broadcast_to(np.asarray(vida, dtype=float), n),
+            "edad": np.broadcast_to(edad, n),
+            "cooldown_comer": np.broadcast_to(cooldown_comer, n),
+            "cooldown_repro": np.broadcast_to(cooldown_repro, n),
+            "viva": np.ones(n, dtype=bool),
+            "ya_reprodujo": np.zeros(n, dtype=bool),
+        }
+        for campo in self.CAMPOS:
+            actual = getattr(self, campo)
+            setattr(self, campo, np.concatenate([actual, nuevos[campo].astype(actual.dtype)]))
+        self.ident = np.concatenate([self.ident, np.arange(self._siguiente_ident, self._siguiente_ident + n)])
+        self._siguiente_ident += n
+
+    def numerar(self):
+        """Identificadores nuevos para todos (tras asignar los CAMPOS directamente, p. ej. al cargar)."""
+        self.ident = np.arange(len(self))
+        self._siguiente_ident = len(self)
+
+    def indice(self):
+        """Índice de celdas de las posiciones actuales (se reconstruye si han cambiado)."""
+        if self._indice is None or self._indice.x is not self.x or self._indice.y is not self.y:
+            self._indice = IndiceCeldas(self.x, self.y, TAM_CELDA, self.ancho, self.alto)
+        return self._indice
+
+    def conservar(self, mascara):
+        """Se queda solo con los individuos marcados en la máscara."""
+        for campo in self.CAMPOS:
+            setattr(self, campo, getattr(self, campo)[mascara])
+        self.ident = self.ident[mascara]
+
+    def compactar(self):
+        """Elimina de una pasada a los individuos muertos."""
+        if not self.viva.all():
+            self.conservar(self.viva)
+
+class EcosistemaNumpy:
+    """Ecosistema con estado en arreglos; misma interfaz de lectura que Ecosistema."""
+    motor = "numpy"
+
+    def __init__(self, semilla=None, config=CONFIG_POR_DEFECTO):
+        self.config = config
+        self.turno = 0
+        self.rng = np.random.default_rng(semilla)
+        # Contadores del último turno y, si se asigna, su registro (telemetria.Telemetria)
+        self.nacimientos = 0
+        self.cazas = 0
+        # Las entidades son filas de arreglos: nunca se crea un objeto por entidad
+        self.asignaciones = 0
+        self.telemetria = None
+        self.estadisticas = Estadisticas()
+        # Plantas nacidas y muertas en el último turno, como en Ecosistema
+        self.plantas_nacidas = []
+        self.plantas_muertas = []
+        terreno = config.terreno
+        self.ancho = terreno.ancho_mundo
+        self.alto = terreno.alto_mundo
+        self.escala = terreno.escala
+        self.agua = mascara_agua(terreno)
+        self.indices_agua = np.array(terreno.indices_agua, dtype=np.int64)
+        self.poblaciones = {cls: Poblacion(self.ancho, self.alto) for cls in (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)}
+
+    def agregar(self, especie):
+        """Incorpora una entidad creada como objeto (p. ej. desde inicializar_entidades)."""
+        if type(especie) is Planta or especie.nacimiento is None:
+            edad = cooldown_comer = cooldown_repro = 0
+        else:
+            # Un animal del motor de objetos guarda turnos absolutos: se pasan a edad y turnos restantes
+            edad = self.turno - especie.nacimiento
+            cooldown_comer = max(0, especie.fin_comer - self.turno) if especie.fin_comer else 0
+            cooldown_repro = max(0, especie.fin_repro - self.turno) if especie.fin_repro else 0
+        self.poblaciones[type(especie)].agregar(
+            especie.posicion_x, especie.posicion_y, especie.vida, especie.direccion,
+            edad, cooldown_comer, cooldown_repro,
+        )
+
+    def cerrar(self):
+        """Como Ecosistema.cerrar(): el motor numpy no tiene nada que liberar."""
+
+    def conteos(self):
+        """Número de entidades vivas de cada especie."""
+        return {
+            "plantas": len(self.poblaciones[Planta]),
+            "herbivoros": len(self.poblaciones[Herbivoro]),
+            "carnivoros": len(self.poblaciones[Carnivoro]),
+            "omnivoros": len(self.poblaciones[Omnivoro]),
+            "peces": len(self.poblaciones[Pez]),
+        }
+
+    @property
+    def entidades(self):
+        """Lista de objetos de solo lectura construidos a partir de los arreglos (para la vista)."""
+        entidades = []
+        for cls, p in self.poblaciones.items():
+            for x, y, vida in zip(p.x.tolist(), p.y.tolist(), p.vida.tolist()):
+                e = cls.__new__(cls)
+                e.posicion_x = x
+                e.posicion_y = y
+                e.viva = True
+                if cls is not Planta:  # la vida de las plantas es un valor fijo de la clase
+                    e.vida = vida
+                entidades.append(e)
+        return entidades
+
+    def estado_por_especie(self):
+        """{clase: [(x, y, vida), ...]} en coordenadas enteras, sin construir objetos (para la vista)."""
+        return {
+            cls: list(zip(p.x.astype(np.int64).tolist(), p.y.astype(np.int64).tolist(), p.vida.tolist()))
+            for cls, p in self.poblaciones.items()
+        }
+
+    # --- Fases del turno ---
+    def _mover_terrestres(self, p, salto):
+        n = len(p)
+        if n == 0:
+            return
+        d = p.direccion + self.rng.uniform(-0.06, 0.06, n)
+        tx = p.x + np.cos(d) * salto
+        ty = p.y + np.sin(d) * salto
+        agua = en_agua(self.agua, tx, ty, self.escala)
+        # Rebotar contra el lago sin avanzar
+        d = np.where(agua, d + math.pi + self.rng.uniform(-0.1, 0.1, n), d)
+        tierra = ~agua
+        nx = np.clip(tx, 0, self.ancho)
+        ny = np.clip(ty, 0, self.alto)
+        p.x = np.where(tierra, nx, p.x)
+        p.y = np.where(tierra, ny, p.y)
+        # Reflejar en las paredes del mapa
+        d = np.where(tierra & ((nx <= 0) | (nx >= self.ancho)), math.pi - d, d)
+        d = np.where(tierra & ((ny <= 0) | (ny >= self.alto)), -d, d)
+        p.direccion = d
+
+    def _mover_peces(self, p, salto):
+        n = len(p)
+        if n == 0:
+            return
+        d = p.direccion + self.rng.uniform(-0.15, 0.15, n)
+        tx = p.x + np.cos(d) * salto
+        ty = p.y + np.sin(d) * salto
+        dentro = en_agua(self.agua, tx, ty, self.escala)
+        d = np.where(dentro, d, d + math.pi + self.rng.uniform(-0.5, 0.5, n))
+        p.x = np.where(dentro, tx, p.x - np.cos(d) * (salto * 0.1))
+        p.y = np.where(dentro, ty, p.y - np.sin(d) * (salto * 0.1))
+        p.direccion = d
+
+    def _envejecer(self, p, desgaste, edad_maxima, usa_cooldown_comer=True):
+        p.edad += 1
+        p.vida -= desgaste
+        if usa_cooldown_comer:
+            np.maximum(p.cooldown_comer - 1, 0, out=p.cooldown_comer)
+        np.maximum(p.cooldown_repro - 1, 0, out=p.cooldown_repro)
+        p.viva &= ~((p.edad > edad_maxima) | (p.vida <= 0))
+
+    def _consumir(self, comedores, idx, presas, radio, exito=None):
+        """Empareja cada comedor con la primera presa viva a distancia < radio.
+
+        Devuelve los pares (comedor, presa) y marca las presas como muertas.
+        Si se pasa `exito`, un par solo cuenta cuando su tirada también tiene éxito.
+        """
+        if len(idx) == 0 or len(presas) == 0:
+            return []
+        a, b = presas.indice().pares(comedores.x[idx], comedores.y[idx], radio)
+        if exito is not None:
+            acierto = self.rng.random(len(a)) < exito
+            a, b = a[acierto], b[acierto]
+        a, b = _emparejar(a, b, presas.viva)
+        presas.viva[b] = False
+        return list(zip(idx[a].tolist(), b.tolist()))
+
+    def _alimentar(self):
+        plantas = self.poblaciones[Planta]
+        herbivoros = self.poblaciones[Herbivoro]
+        carnivoros = self.poblaciones[Carnivoro]
+        omnivoros = self.poblaciones[Omnivoro]
+
+        # Herbívoros: primera planta a < 30
+        idx = np.flatnonzero(herbivoros.viva & (herbivoros.cooldown_comer == 0))
+        for i, _ in self._consumir(herbivoros, idx, plantas, 30):
+            herbivoros.vida[i] = min(herbivoros.vida[i] + 20, 10000)
+            herbivoros.cooldown_comer[i] = 4
+
+        # Carnívoros: primer herbívoro a < 18 cuya tirada (70%) tenga éxito
+        idx = np.flatnonzero(carnivoros.viva & (carnivoros.cooldown_comer == 0))
+        cazas = self._consumir(carnivoros, idx, herbivoros, 18, exito=0.7)
+        self.cazas += len(cazas)
+        self.estadisticas.contar("cazas", "carnivoros", len(cazas))
+        for i, _ in cazas:
+            carnivoros.vida[i] = min(carnivoros.vida[i] + 10, 1150)
+            carnivoros.cooldown_comer[i] = 15
+
+        # Omnívoros: primero plantas a < 20 y, si no hay, herbívoros a < 18
+        idx = np.flatnonzero(omnivoros.viva & (omnivoros.cooldown_comer == 0))
+        comieron = set()
+        for i, _ in self._consumir(omnivoros, idx, plantas, 20):
+            omnivoros.vida[i] = min(omnivoros.vida[i] + 8, 1100)
+            omnivoros.cooldown_comer[i] = 4
+            comieron.add(i)
+        idx = np.array([i for i in idx if i not in comieron], dtype=np.int64)
+        cazas = self._consumir(omnivoros, idx, herbivoros, 18)
+        self.cazas += len(cazas)
+        self.estadisticas.contar("cazas", "omnivoros", len(cazas))
+        for i, _ in cazas:
+            if self.rng.random() < 0.6:
+                omnivoros.vida[i] = min(omnivoros.vida[i] + 8, 1100)
+            omnivoros.cooldown_comer[i] = 8
+
+    def _posiciones_crias(self, x, y, dispersion, intentos):
+        """Busca, para cada progenitor, la primera posición fuera del lago entre varios intentos."""
+        n = len(x)
+        nx = np.clip(x[:, None] + self.rng.uniform(-dispersion, dispersion, (n, intentos)), 0, self.ancho)
+        ny = np.clip(y[:, None] + self.rng.uniform(-dispersion, dispersion, (n, intentos)), 0, self.alto)
+        validas = ~en_agua(self.agua, nx, ny, self.escala)
+        tiene = validas.any(axis=1)
+        k = validas.argmax(axis=1)
+        filas = np.arange(n)
+        return nx[filas, k][tiene], ny[filas, k][tiene]
+
+    def _reproduccion(self, cls):
+        """(coste, cooldown) de reproducción de un animal terrestre según la configuración."""
+        nombre = cls.__name__.lower()
+        return (getattr(self.config, f"{nombre}_repro_coste"),
+                getattr(self.config, f"{nombre}_repro_cooldown"))
+
+    def _reproducir_terrestres(self, cls):
+        p = self.poblaciones[cls]
+        coste, cooldown = self._reproduccion(cls)
+        idx = np.flatnonzero(p.viva & (p.cooldown_repro == 0) & ~p.ya_reprodujo)
+        if len(idx) < 2:
+            return np.zeros(0), np.zeros(0)
+        cerca = _cercanos(p.x[idx], p.y[idx], p.x[idx], p.y[idx], 28)
+        np.fill_diagonal(cerca, False)
+        disponibles = np.ones(len(idx), dtype=bool)
+        padres = []
+        for a in range(len(idx)):
+            if not disponibles[a]:
+                continue
+            candidatas = cerca[a] & disponibles
+            b = candidatas.argmax()
+            if not candidatas[b]:
+                continue
+            disponibles[a] = disponibles[b] = False
+            i, j = idx[a], idx[b]
+            p.vida[i] -= coste
+            p.vida[j] -= coste
+            if p.vida[i] <= 0: p.viva[i] = False
+            if p.vida[j] <= 0: p.viva[j] = False
+            if not p.viva[i] or not p.viva[j]:
+                continue
+            if self.rng.random() < 0.25:
+                p.ya_reprodujo[i] = p.ya_reprodujo[j] = True
+            p.cooldown_repro[i] = p.cooldown_repro[j] = cooldown
+            padres.append(i)
+        if not padres:
+            return np.zeros(0), np.zeros(0)
+        padres = np.array(padres)
+        return self._posiciones_crias(p.x[padres], p.y[padres], 20, 5)
+
+    def _reproducir_plantas(self):
+        p = self.poblaciones[Planta]
+        if not self.config.dispersion_plantas or len(p) == 0 or len(p) >= self.config.max_plantas:
+            return np.zeros(0), np.zeros(0)
+        padres = np.flatnonzero(p.viva & (self.rng.random(len(p)) < 0.20))
+        return self._posiciones_crias(p.x[padres], p.y[padres], 25, 1)
+
+    def _reproducir_peces(self):
+        """Cada pez libre, en orden, prueba con los libres a menos de 28 (buscados con una máscara) hasta emparejarse."""
+        p = self.poblaciones[Pez]
+        poblacion_actual = len(p)
+        crias = []
+        if poblacion_actual >= self.config.max_peces:
+            return crias
+        # Un pez deja de estar libre al emparejarse, así que la máscara sirve para todo el recorrido
+        libres = p.viva & ~p.ya_reprodujo & (p.cooldown_repro <= 0)
+        for i in np.flatnonzero(libres):
+            if not libres[i]:
+                continue
+            cerca = libres & ((p.x - p.x[i])**2 + (p.y - p.y[i])**2 < 28 * 28)
+            cerca[i] = False
+            for j in np.flatnonzero(cerca):
+                p.vida[i] -= 50
+                p.vida[j] -= 50
+                if self.rng.random() < 0.35:
+                    p.ya_reprodujo[i] = p.ya_reprodujo[j] = True
+                    p.cooldown_repro[i] = p.cooldown_repro[j] = 50
+                    libres[i] = libres[j] = False
+                    nx = p.x[i] + self.rng.uniform(-10, 10)
+                    ny = p.y[i] + self.rng.uniform(-10, 10)
+                    if not en_agua(self.agua, nx, ny, self.escala):
+                        nx, ny = self._posiciones_lago(1)
+                        nx, ny = nx[0], ny[0]
+                    crias.append((nx, ny))
+                    break
+        return crias
+
+    def _posiciones_lago(self, n):
+        """Genera n posiciones aleatorias dentro del agua, eligiendo píxeles de agua al azar."""
+        i = self.indices_agua[self.rng.integers(len(self.indices_agua), size=n)]
+        ancho = self.config.terreno.ancho
+        return (i % ancho + self.rng.random(n)) * self.escala, (i // ancho + self.rng.random(n)) * self.escala
+
+    def _nacer(self, cls, x, y, maximo):
+        """Añade como mucho `maximo` crías de la especie."""
+        maximo = max(0, maximo)
+        x, y = np.asarray(x)[:maximo], np.asarray(y)[:maximo]
+        if len(x):
+            self.poblaciones[cls].agregar(x, y, VIDA_INICIAL[cls], self.rng.uniform(0, 2 * math.pi, len(x)))
+            self.nacimientos += len(x)
+            self.estadisticas.contar("nacimientos", cls.nombre, len(x))
+            if cls is Planta:
+                self.plantas_nacidas = _enteros(x, y)
+
+    def _reponer_estadisticas(self):
+        """Repone la población, la vida y el histograma de edades de cada especie a partir de los arreglos."""
+        estadisticas = self.estadisticas
+        for cls, p in self.poblaciones.items():
+            if cls is Planta:
+                estadisticas.reponer(cls.nombre, len(p))
+                continue
+            vida = Momentos()
+            if len(p):
+                media = float(p.vida.mean())
+                vida = Momentos(len(p), media, float(np.square(p.vida - media).sum()))
+            edades = np.bincount(np.minimum(p.edad // ANCHO_EDAD, CASILLAS_EDAD - 1), minlength=CASILLAS_EDAD)
+            estadisticas.reponer(cls.nombre, len(p), vida, edades.tolist())
+
+    def simular_turno(self):
+        self.turno += 1
+        estadisticas = self.estadisticas
+        estadisticas.empezar_turno(self.turno)
+        self.nacimientos = 0
+        self.cazas = 0
+        self.plantas_nacidas = []
+        plantas = self.poblaciones[Planta]
+        herbivoros = self.poblaciones[Herbivoro]
+        carnivoros = self.poblaciones[Carnivoro]
+        omnivoros = self.poblaciones[Omnivoro]
+        peces = self.poblaciones[Pez]
+
+        for p in (herbivoros, carnivoros, omnivoros, peces):
+            p.ya_reprodujo[:] = False
+
+        # 1. Movimiento y envejecimiento por lotes
+        for cls in (Herbivoro, Carnivoro, Omnivoro):
+            self._mover_terrestres(self.poblaciones[cls], SALTO[cls])
+            self._envejecer(self.poblaciones[cls], 0.15, 300000)
+        self._mover_peces(peces, SALTO[Pez])
+        self._envejecer(peces, 0.05, 50000, usa_cooldown_comer=False)
+
+        # 2. Alimentación y reproducción
+        self._alimentar()
+        crias_plantas = self._reproducir_plantas()
+        crias = {cls: self._reproducir_terrestres(cls) for cls in (Herbivoro, Carnivoro, Omnivoro)}
+        crias_peces = self._reproducir_peces()
+
+        # 3. Compactar muertos y aplicar límites de población a las crías
+        muertas = ~plantas.viva
+        self.plantas_muertas = _enteros(plantas.x[muertas], plantas.y[muertas])
+        for cls, p in self.poblaciones.items():
+            estadisticas.contar("muertes", cls.nombre, len(p) - int(np.count_nonzero(p.viva)))
+            p.compactar()
+        config = self.config
+        self._nacer(Planta, *crias_plantas, config.max_plantas - len(plantas))
+        self._nacer(Herbivoro, *crias[Herbivoro], config.max_herbivoros - len(herbivoros))
+        # Omnívoros: no más que herbívoros y por debajo del límite global (y del propio, si lo hay)
+        tope = min(len(herbivoros), config.max_herbivoros)
+        if config.max_omnivoros:
+            tope = min(tope, config.max_omnivoros)
+        self._nacer(Omnivoro, *crias[Omnivoro], tope - len(omnivoros))
+        self._nacer(Carnivoro, *crias[Carnivoro], config.max_carnivoros - len(carnivoros))
+        if crias_peces:
+            self._nacer(Pez, *zip(*crias_peces), config.max_peces - len(peces))
+
+        # 4. Control estricto de población de peces (min_peces <= Pez <= max_peces)
+        if len(peces) < config.min_peces:
+            faltan = config.min_peces - len(peces)
+            self._nacer(Pez, *self._posiciones_lago(faltan), faltan)
+        if len(peces) > config.max_peces:
+            # Eliminar los de menos vida y, a igualdad, menos edad
+            orden = np.lexsort((peces.edad, peces.vida))
+            conservar = np.ones(len(peces), dtype=bool)
+            conservar[orden[:len(peces) - config.max_peces]] = False
+            estadisticas.contar("muertes", "peces", len(peces) - config.max_peces)
+            peces.conservar(conservar)
+
+        self._reponer_estadisticas()
+        estadisticas.terminar_turno()
+        if self.telemetria is not None:
+            self.telemetria.registrar(fila_turno(self))
@@ -0,0 +1,220 @@
+"""Perfilado por fases de simular_turno, activable en caliente.
+
+Mientras está desactivado no cuesta nada: el camino caliente no comprueba
+ninguna bandera. activar() sustituye los métodos de cada fase por envoltorios
+que acumulan su tiempo en el turno en curso, y desactivar() deja los
+originales. En el motor de objetos las fases por entidad (mover, comer,
+reproducir...) se envuelven en la clase, así que afectan a todos los
+ecosistemas del proceso mientras el perfilador está activo; cada llamada
+medida añade alrededor de un microsegundo. Las comprobaciones de distancia se
+cuentan por especie en las consultas a las rejillas espaciales (el motor numpy
+no las cuenta).
+
+De cada fase se guardan los últimos `ventana` turnos, de los que se sacan los
+percentiles para el panel de la vista y para exportar en JSON. La simulación
+puede ir en otro hilo que la vista: cada turno se cierra bajo un cerrojo y el
+resumen copia las muestras bajo el mismo cerrojo antes de ordenarlas.
+"""
+import collections
+import json
+import threading
+import time
+
+from dinos import Planta, Herbivoro, Carnivoro, Omnivoro, Pez, Ecosistema
+
+VENTANA = 500
+PERCENTILES = (50, 90, 99)
+# Cada cuánto se recalcula el resumen que pide la vista
+INTERVALO_RESUMEN = 0.25
+NOMBRES = {Planta: "plantas", Herbivoro: "herbivoros", Carnivoro: "carnivoros", Omnivoro: "omnivoros", Pez: "peces"}
+_AUSENTE = object()
+
+def _fases_objetos(ecosistema):
+    """(objeto, método, fase) que se miden en el motor de objetos."""
+    for cls in (Herbivoro, Carnivoro, Omnivoro, Pez):
+        yield cls, "mover", "mover"
+        yield cls, "envejecer", "envejecer"
+        yield cls, "reproducir", "reproduccion"
+    yield Herbivoro, "comer", "alimentacion"
+    yield Carnivoro, "cazar", "alimentacion"
+    yield Omnivoro, "alimentarse", "alimentacion"
+    yield Planta, "reproducir", "plantas"
+    if ecosistema.campo is not None:
+        yield ecosistema.campo, "crecer", "plantas"
+    for rejilla in ecosistema.rejillas.values():
+        if rejilla is not ecosistema.campo:
+            yield rejilla, "actualizar", "rejillas"
+    yield ecosistema.agenda, "avanzar", "agenda"
+    yield ecosistema, "_compactar", "compactar"
+    yield ecosistema, "_admitir", "nacimientos"
+    yield ecosistema, "_controlar_peces", "peces"
+
+def _fases_dos_fases(ecosistema):
+    """Fases de EcosistemaFases: las propuestas se miden enteras, en el hilo o proceso que sea."""
+    yield ecosistema.agenda, "avanzar", "agenda"
+    yield ecosistema, "_foto", "foto"
+    yield ecosistema, "_proponer", "propuestas"
+    yield ecosistema, "_resolver", "resolucion"
+    yield ecosistema, "_compactar", "compactar"
+    yield ecosistema, "_admitir", "nacimientos"
+    yield ecosistema, "_controlar_peces", "peces"
+
+def _fases_numpy(ecosistema):
+    yield ecosistema, "_mover_terrestres", "mover"
+    yield ecosistema, "_mover_peces", "mover"
+    yield ecosistema, "_envejecer", "envejecer"
+    yield ecosistema, "_alimentar", "alimentacion"
+    yield ecosistema, "_reproducir_terrestres", "reproduccion"
+    yield ecosistema, "_reproducir_peces", "reproduccion"
+    yield ecosistema, "_reproducir_plantas", "plantas"
+    for p in ecosistema.poblaciones.values():
+        yield p, "compactar", "compactar"
+    yield ecosistema, "_nacer", "nacimientos"
+
+def _percentiles(muestras, escala=1):
+    ordenadas = sorted(muestras)
+    n = len(ordenadas)
+    resumen = {f"p{q}": ordenadas[min(n - 1, n * q // 100)] * escala for q in PERCENTILES}
+    resumen["media"] = sum(ordenadas) / n * escala
+    resumen["muestras"] = n
+    return resumen
+
+class Perfilador:
+    """Tiempos por fase y comprobaciones de proximidad de los últimos `ventana` turnos."""
+    def __init__(self, ventana=VENTANA):
+        self.ventana = ventana
+        self.tiempos = collections.defaultdict(lambda: collections.deque(maxlen=ventana))
+        self.comprobaciones = collections.defaultdict(lambda: collections.deque(maxlen=ventana))
+        self.pintado = collections.deque(maxlen=ventana)
+        self.ecosistema = None
+        self._turno = collections.defaultdict(float)
+        self._contadas = collections.defaultdict(int)
+        self._parches = []
+        self._resumen = None
+        self._resumen_en = 0.0
+        self._cerrojo = threading.Lock()
+
+    @property
+    def activo(self):
+        return self.ecosistema is not None
+
+    # --- Activación ---
+    def _sustituir(self, objeto, nombre, valor):
+        self._parches.append((objeto, nombre, vars(objeto).get(nombre, _AUSENTE)))
+        setattr(objeto, nombre, valor)
+
+    def _medir(self, objeto, nombre, fase):
+        original = getattr(objeto, nombre)
+        acumulado = self._turno
+        reloj = time.perf_counter
+
+        def medido(*args, **kwargs):
+            inicio = reloj()
+            resultado = original(*args, **kwargs)
+            acumulado[fase] += reloj() - inicio
+            return resultado
+        self._sustituir(objeto, nombre, medido)
+
+    def _contar(self, rejilla, especie):
+        original = rejilla.vecinos
+        candidatos = rejilla.candidatos
+        contadas = self._contadas
+
+        def vecinos(x, y, radio):
+            contadas[especie] += candidatos(x, y, radio)
+            return original(x, y, radio)
+        self._sustituir(rejilla, "vecinos", vecinos)
+
+    def activar(self, ecosistema):
+        """Empieza a medir cada turno de `ecosistema` (llamar entre turnos)."""
+        if self.activo:
+            self.desactivar()
+        self.ecosistema = ecosistema
+        if ecosistema.motor == "fases":
+            # Las propuestas buscan vecinos en la foto, no en las rejillas: no hay comprobaciones que contar
+            fases = _fases_dos_fases(ecosistema)
+        elif isinstance(ecosistema, Ecosistema):
+            fases = _fases_objetos(ecosistema)
+            for cls, rejilla in ecosistema.rejillas.items():
+                if rejilla is not ecosistema.campo:
+                    self._contar(rejilla, NOMBRES[cls])
+        else:
+            fases = _fases_numpy(ecosistema)
+        for objeto, nombre, fase in fases:
+            self._medir(objeto, nombre, fase)
+
+        original = ecosistema.simular_turno
+        reloj = time.perf_counter
+
+        def simular_turno():
+            self._turno.clear()
+            self._contadas.clear()
+            inicio = reloj()
+            original()
+            self._cerrar_turno(reloj() - inicio)
+        self._sustituir(ecosistema, "simular_turno", simular_turno)
+
+    def desactivar(self):
+        """Restaura los métodos originales; lo ya medido se conserva."""
+        for objeto, nombre, anterior in reversed(self._parches):
+            if anterior is _AUSENTE:
+                delattr(objeto, nombre)
+            else:
+                setattr(objeto, nombre, anterior)
+        self._parches = []
+        self.ecosistema = None
+
+    def _cerrar_turno(self, total):
+        with self._cerrojo:
+            self.tiempos["turno"].append(total)
+            for fase, segundos in self._turno.items():
+                self.tiempos[fase].append(segundos)
+            if self._contadas or self.comprobaciones:
+                for especie in NOMBRES.values():
+                    self.comprobaciones[especie].append(self._contadas.get(especie, 0))
+
+    def registrar_pintado(self, segundos):
+        with self._cerrojo:
+            self.pintado.append(segundos)
+
+    # --- Resultados ---
+    def resumen(self):
+        """Percentiles de cada fase y del pintado (en ms) y de las comprobaciones por turno."""
+        # Copias: el hilo de la simulación añade fases y muestras mientras la vista lee
+        with self._cerrojo:
+            tiempos = {fase: list(m) for fase, m in self.tiempos.items() if m}
+            pintado = list(self.pintado)
+            comprobaciones = {especie: list(m) for especie, m in self.comprobaciones.items() if m}
+        return {
+            "ventana": self.ventana,
+            "fases": {fase: _percentiles(m, 1000) for fase, m in tiempos.items()},
+            "pintado": _percentiles(pintado, 1000) if pintado else None,
+            "comprobaciones": {especie: _percentiles(m) for especie, m in comprobaciones.items()},
+        }
+
+    def lineas(self):
+        """Texto del panel de la vista; el resumen se recalcula como mucho cada INTERVALO_RESUMEN."""
+        ahora = time.perf_counter()
+        if self._resumen is None or ahora - self._resumen_en >= INTERVALO_RESUMEN:
+            self._resumen = self._formatear(self.resumen())
+            self._resumen_en = ahora
+        return self._resumen
+
+    @staticmethod
+    def _formatear(resumen):
+        lineas = ["ms             p50    p90    p99"]
+        filas = sorted(resumen["fases"].items(), key=lambda par: (par[0] != "turno", -par[1]["p50"]))
+        if resumen["pintado"]:
+            filas.append(("pintado", resumen["pintado"]))
+        for fase, r in filas:
+            lineas.append(f"{fase:<12} {r['p50']:6.2f} {r['p90']:6.2f} {r['p99']:6.2f}")
+        if resumen["comprobaciones"]:
+            lineas.append("distancias/turno (p50)")
+            for especie, r in resumen["comprobaciones"].items():
+                if r["p50"]:
+                    lineas.append(f"{especie:<12} {r['p50']:6d}")
+        return lineas
+
+    def exportar(self, ruta):
+        with open(ruta, "w") as archivo:
+            json.dump(self.resumen(), archivo, indent=2)
@@ -0,0 +1,287 @@
+"""Puntos de control binarios para guardar y reanudar un ecosistema.
+
+Formato del archivo: MAGIA, la longitud de la cabecera (uint32) y la cabecera
+en JSON, seguidas de las columnas en binario crudo (orden de bytes nativo),
+cada una alineada a 8 bytes. La cabecera guarda el motor, el turno, la
+configuración, el estado de los generadores aleatorios y, por columna, la
+especie, el nombre, el tipo (formato de memoryview), el número de elementos y
+su desplazamiento. Al cargar, el archivo se proyecta en memoria con mmap y
+cada columna se lee directamente como memoryview (o con np.frombuffer en el
+motor numpy), sin analizar nada entidad por entidad.
+"""
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+
+from dinos import (
+    CONFIG_POR_DEFECTO, TERRENO_POR_DEFECTO,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez,
+    Ecosistema,
+)
+from terreno import Terreno
+
+MAGIA = b"ECOPC001"
+# 2: el estado del generador del motor de objetos incluye los valores sin leer de su bloque
+VERSION = 2
+ESPECIES = {cls.__name__: cls for cls in (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)}
+
+# Columnas del motor de objetos: (nombre, atributo, tipo de array); las plantas solo guardan x, y.
+# Edad y cooldowns se guardan como turnos transcurridos y restantes, igual que en el motor numpy,
+# aunque el motor de objetos los lleve como turnos absolutos (ver _valores)
+COLUMNAS = (
+    ("x", "posicion_x", "d"),
+    ("y", "posicion_y", "d"),
+    ("direccion", "direccion", "d"),
+    ("vida", "vida", "d"),
+    ("edad", "nacimiento", "q"),
+    ("cooldown_comer", "fin_comer", "q"),
+    ("cooldown_repro", "fin_repro", "q"),
+    ("viva", "viva", "B"),
+    ("ya_reprodujo", "ya_reprodujo", "B"),
+)
+COLUMNAS_PLANTA = COLUMNAS[:2]
+
+def _alinear(n):
+    return (n + 7) & ~7
+
+@dataclass(frozen=True)
+class Captura:
+    """Copia del estado de un turno lista para escribirse: cabecera y [(especie, nombre, buffer)]."""
+    cabecera: dict
+    columnas: list
+
+# --- Captura ---
+def _cabecera(ecosistema, motor, plantas):
+    config = ecosistema.config
+    cabecera = {
+        "version": VERSION,
+        "orden_bytes": sys.byteorder,
+        "motor": motor,
+        "plantas": plantas,
+        "turno": ecosistema.turno,
+        "config": {campo.name: getattr(config, campo.name) for campo in fields(config) if campo.type in (int, bool)},
+        "terreno": None,
+    }
+    columnas = []
+    if config.terreno is not TERRENO_POR_DEFECTO:
+        terreno = config.terreno
+        cabecera["terreno"] = {"ancho": terreno.ancho, "alto": terreno.alto, "margen": terreno.margen,
+                               "margen_final": terreno.margen_final,
+                               "escala": terreno.escala}
+        columnas.append(("terreno", "agua", terreno.agua))
+    return cabecera, columnas
+
+def _valores(ecosistema, atributo, entidades):
+    agenda = ecosistema.agenda
+    if atributo == "nacimiento":
+        return (agenda.edad(e) for e in entidades)
+    if atributo.startswith("fin_"):
+        return (agenda.restante(getattr(e, atributo)) for e in entidades)
+    return (getattr(e, atributo) for e in entidades)
+
+def _capturar_objetos(ecosistema):
+    plantas = "campo" if ecosistema.campo is not None else "objetos"
+    cabecera, columnas = _cabecera(ecosistema, ecosistema.motor, plantas)
+    cabecera["rng"] = ecosistema.rng.getstate()
+
+    # La posición en la lista de cada entidad permite reconstruir el orden exacto del turno
+    por_especie = {cls: [] for cls in ESPECIES.values()}
+    for i, e in enumerate(ecosistema.entidades):
+        por_especie[type(e)].append((i, e))
+    for cls, pares in por_especie.items():
+        entidades = [e for _, e in pares]
+        columnas.append((cls.__name__, "orden", array.array("q", (i for i, _ in pares))))
+        for nombre, atributo, tipo in (COLUMNAS_PLANTA if cls is Planta else COLUMNAS):
+            columnas.append((cls.__name__, nombre, array.array(tipo, _valores(ecosistema, atributo, entidades))))
+
+    if ecosistema.campo is not None:
+        campo = ecosistema.campo
+        cabecera["campo"] = {"filas": campo.filas, "columnas": campo.columnas,
+                             "rng": campo.rng.bit_generator.state}
+        columnas.append(("campo", "biomasa", campo.biomasa.copy()))
+    return Captura(cabecera, columnas)
+
+def _capturar_numpy(ecosistema):
+    from motor_numpy import Poblacion
+
+    cabecera, columnas = _cabecera(ecosistema, "numpy", "objetos")
+    cabecera["rng"] = ecosistema.rng.bit_generator.state
+    for cls, p in ecosistema.poblaciones.items():
+        for nombre in Poblacion.CAMPOS:
+            # Copia: las fases del turno modifican algunos arreglos en el sitio
+            columnas.append((cls.__name__, nombre, getattr(p, nombre).copy()))
+    return Captura(cabecera, columnas)
+
+def capturar(ecosistema):
+    """Copia el estado actual (entre turnos) sin escribir nada: es lo único que frena la simulación."""
+    if isinstance(ecosistema, Ecosistema):
+        return _capturar_objetos(ecosistema)
+    return _capturar_numpy(ecosistema)
+
+# --- Escritura ---
+def escribir(captura, ruta):
+    """Escribe la captura en `ruta` (primero en un temporal, que luego sustituye al archivo)."""
+    descripciones = []
+    desplazamiento = 0
+    vistas = []
+    for especie, nombre, buffer in captura.columnas:
+        vista = memoryview(buffer)
+        if vista.ndim != 1:
+            vista = vista.cast("B").cast(vista.format)
+        descripciones.append({"especie": especie, "nombre": nombre, "tipo": vista.format,
+                              "n": len(vista), "desplazamiento": desplazamiento})
+        vistas.append(vista)
+        desplazamiento = _alinear(desplazamiento + vista.nbytes)
+
+    cabecera = dict(captura.cabecera, columnas=descripciones)
+    texto = json.dumps(cabecera).encode()
+    inicio = _alinear(len(MAGIA) + 4 + len(texto))
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(MAGIA)
+        archivo.write(struct.pack("<I", len(texto)))
+        archivo.write(texto)
+        for descripcion, vista in zip(descripciones, vistas):
+            archivo.seek(inicio + descripcion["desplazamiento"])
+            archivo.write(vista)
+    os.replace(temporal, ruta)
+
+def guardar(ecosistema, ruta):
+    escribir(capturar(ecosistema), ruta)
+
+# --- Lectura ---
+def _leer(ruta):
+    """(cabecera, {(especie, nombre): memoryview}) con las columnas proyectadas en memoria."""
+    with open(ruta, "rb") as archivo:
+        datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    if datos[:len(MAGIA)] != MAGIA:
+        raise ValueError(f"{ruta} no es un punto de control del ecosistema")
+    (longitud,) = struct.unpack_from("<I", datos, len(MAGIA))
+    cabecera = json.loads(datos[len(MAGIA) + 4:len(MAGIA) + 4 + longitud])
+    if cabecera["version"] != VERSION:
+        raise ValueError(f"{ruta} usa la versión {cabecera['version']} del formato (se espera la {VERSION})")
+    if cabecera["orden_bytes"] != sys.byteorder:
+        raise ValueError(f"{ruta} se escribió con otro orden de bytes ({cabecera['orden_bytes']})")
+
+    inicio = _alinear(len(MAGIA) + 4 + longitud)
+    vista = memoryview(datos)
+    columnas = {}
+    for d in cabecera["columnas"]:
+        ancho = struct.calcsize(d["tipo"])
+        desde = inicio + d["desplazamiento"]
+        columnas[d["especie"], d["nombre"]] = vista[desde:desde + d["n"] * ancho].cast(d["tipo"])
+    return cabecera, columnas
+
+def _config(cabecera, columnas):
+    config = replace(CONFIG_POR_DEFECTO, **cabecera["config"])
+    if cabecera["terreno"] is not None:
+        t = cabecera["terreno"]
+        agua = columnas["terreno", "agua"].tobytes()
+        config = replace(config, terreno=Terreno(agua, t["ancho"], t["alto"], t["margen"], t.get("escala", 1),
+                                                  t["margen_final"]))
+    return config
+
+def _cargar_objetos(cabecera, columnas, config):
+    if cabecera["motor"] == "fases":
+        # Sin trabajadores: quien lo carga puede repartir las propuestas con repartir()
+        from fases import EcosistemaFases
+        ecosistema = EcosistemaFases(config, plantas=cabecera["plantas"])
+    else:
+        ecosistema = Ecosistema(config, plantas=cabecera["plantas"])
+    turno = ecosistema.turno = cabecera["turno"]
+    (version, estado, gauss), resto = cabecera["rng"]
+    ecosistema.rng.setstate(((version, tuple(estado), gauss), resto))
+
+    total = sum(len(columnas[nombre, "orden"]) for nombre in ESPECIES)
+    entidades = [None] * total
+    for nombre, cls in ESPECIES.items():
+        orden = columnas[nombre, "orden"]
+        if cls is Planta:
+            for i, x, y in zip(orden, columnas[nombre, "x"], columnas[nombre, "y"]):
+                e = cls.__new__(cls)
+                e.posicion_x, e.posicion_y, e.viva = x, y, True
+                entidades[i] = e
+            continue
+        valores = [columnas[nombre, n] for n, _, _ in COLUMNAS]
+        for i, (x, y, direccion, vida, edad, cooldown_comer, cooldown_repro, viva, ya_reprodujo) in zip(orden, zip(*valores)):
+            e = cls.__new__(cls)
+            e.posicion_x, e.posicion_y, e.direccion, e.vida = x, y, direccion, vida
+            e.nacimiento = turno - edad
+            e.fin_comer = turno + cooldown_comer if cooldown_comer else 0
+            e.fin_repro = turno + cooldown_repro if cooldown_repro else 0
+            e.viva, e.ya_reprodujo = bool(viva), bool(ya_reprodujo)
+            entidades[i] = e
+    for e in entidades:
+        ecosistema.agregar(e)
+
+    if ecosistema.campo is not None:
+        import numpy as np
+
+        c = cabecera["campo"]
+        campo = ecosistema.campo
+        campo.biomasa = np.array(columnas["campo", "biomasa"], dtype=np.int64).reshape(c["filas"], c["columnas"])
+        campo.total = int(campo.biomasa.sum())
+        campo.rng.bit_generator.state = c["rng"]
+    return ecosistema
+
+def _cargar_numpy(cabecera, columnas, config):
+    import numpy as np
+    from motor_numpy import EcosistemaNumpy, Poblacion
+
+    ecosistema = EcosistemaNumpy(config=config)
+    ecosistema.turno = cabecera["turno"]
+    ecosistema.rng.bit_generator.state = cabecera["rng"]
+    for nombre, cls in ESPECIES.items():
+        p = ecosistema.poblaciones[cls]
+        for campo in Poblacion.CAMPOS:
+            # frombuffer lee la proyección sin analizarla; la copia la hace modificable
+            setattr(p, campo, np.frombuffer(columnas[nombre, campo], dtype=getattr(p, campo).dtype).copy())
+        p.numerar()
+    return ecosistema
+
+def cargar(ruta):
+    """Reconstruye el ecosistema guardado en `ruta`, con el motor y el modelo de plantas originales."""
+    cabecera, columnas = _leer(ruta)
+    config = _config(cabecera, columnas)
+    if cabecera["motor"] == "numpy":
+        return _cargar_numpy(cabecera, columnas, config)
+    return _cargar_objetos(cabecera, columnas, config)
+
+# --- Guardado periódico ---
+class GuardadoPeriodico:
+    """Guarda un punto de control cada `cada` turnos escribiendo en un hilo aparte.
+
+    Solo la captura ocurre en el hilo de la simulación; si la escritura anterior
+    todavía no ha terminado, ese punto de control se omite en lugar de esperar.
+    """
+    def __init__(self, ruta, cada=0):
+        self.ruta = ruta
+        self.cada = cada
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="punto_control")
+        self._pendiente = None
+
+    def tras_turno(self, ecosistema):
+        if self.cada and ecosistema.turno % self.cada == 0:
+            self.guardar(ecosistema)
+
+    def guardar(self, ecosistema):
+        if self._pendiente is not None and not self._pendiente.done():
+            return False
+        self._pendiente = self._escritor.submit(escribir, capturar(ecosistema), self.ruta)
+        return True
+
+    def cerrar(self, ecosistema=None):
+        """Termina las escrituras; con `ecosistema`, guarda antes un último punto de control."""
+        if ecosistema is not None:
+            if self._pendiente is not None:
+                self._pendiente.result()
+            self.guardar(ecosistema)
+        self._escritor.shutdown(wait=True)
+        if self._pendiente is not None:
+            self._pendiente.result()
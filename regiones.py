@@ -0,0 +1,389 @@
+"""Motor por regiones para mundos grandes: cada región la simula su propio proceso.
+
+El mundo se divide en filas x columnas regiones rectangulares (Particion) y
+cada una es un Ecosistema cuyas rejillas solo cubren la región y un halo de
+HALO unidades alrededor. Los turnos avanzan a la vez en todas las regiones:
+
+1. El coordinador envía a cada región las entidades que han entrado en ella,
+   los fantasmas (copias de las entidades de las regiones vecinas que están a
+   menos de HALO de su borde), las bajas de sus propios fantasmas y la cuota
+   de nacimientos de cada especie.
+2. La región aplica las bajas, añade las entidades nuevas, inserta los
+   fantasmas solo en sus rejillas (se pueden comer, cazar o elegir como
+   pareja, pero no actúan) y simula el turno.
+3. Devuelve las entidades que han salido de la región, las de su franja de
+   borde para las vecinas y los fantasmas que han muerto.
+
+Una planta o presa comida en el halo muere en su región un turno después, y el
+coste de reproducirse con un fantasma solo lo paga la cría de este lado. Los
+límites globales se respetan exactamente: cada región puede crecer como mucho
+su cuota, y las cuotas suman lo que falta hasta cada límite.
+"""
+import csv
+import math
+import multiprocessing
+import sys
+import time
+from dataclasses import dataclass, fields, replace
+
+from dinos import (
+    CONFIG_POR_DEFECTO, COLUMNAS_CONTEOS, TERRENO_POR_DEFECTO,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez,
+    Ecosistema, GeneradorAleatorio, fila_conteos, poblar_inicial,
+)
+from estadisticas import Estadisticas
+from terreno import Terreno
+
+# Mayor radio de búsqueda de las reglas (comer a < 30; parejas a < 28; presas a < 18)
+HALO = 30
+ESPECIES = {"plantas": Planta, "herbivoros": Herbivoro, "carnivoros": Carnivoro, "omnivoros": Omnivoro, "peces": Pez}
+# Todas las regiones van por el mismo turno: nacimiento y fin de cooldowns (turnos absolutos) valen tal cual
+ATRIBUTOS = ("posicion_x", "posicion_y", "direccion", "vida", "nacimiento", "fin_comer", "fin_repro", "ya_reprodujo")
+# Píxeles del mapa de agua de un mundo grande: la escala se elige para no pasar de aquí
+PIXELES_TERRENO = 1_000_000
+
+def _empaquetar(e):
+    """(clase, valores) de una entidad, listo para enviarse a otro proceso."""
+    if type(e) is Planta:
+        return Planta, (e.posicion_x, e.posicion_y)
+    return type(e), tuple(getattr(e, atributo) for atributo in ATRIBUTOS)
+
+def _desempaquetar(cls, valores):
+    e = cls.__new__(cls)
+    if cls is Planta:
+        e.posicion_x, e.posicion_y = valores
+    else:
+        for atributo, valor in zip(ATRIBUTOS, valores):
+            setattr(e, atributo, valor)
+    e.viva = True
+    return e
+
+def config_para(terreno, base=CONFIG_POR_DEFECTO):
+    """`base` con el terreno dado y los límites y poblaciones iniciales escalados por su área.
+
+    Los límites a 0 (sin límite propio, como max_omnivoros) se quedan a 0.
+    """
+    factor = (terreno.ancho_mundo * terreno.alto_mundo) / (TERRENO_POR_DEFECTO.ancho_mundo * TERRENO_POR_DEFECTO.alto_mundo)
+    cambios = {
+        campo.name: max(1, round(getattr(base, campo.name) * factor))
+        for campo in fields(base)
+        if (campo.name.startswith(("max_", "min_")) or campo.name.endswith("_iniciales")) and getattr(base, campo.name)
+    }
+    return replace(base, terreno=terreno, **cambios)
+
+@dataclass(frozen=True)
+class Particion:
+    """División de un mundo de `ancho` x `alto` en filas x columnas regiones iguales."""
+    ancho: float
+    alto: float
+    filas: int
+    columnas: int
+
+    def __len__(self):
+        return self.filas * self.columnas
+
+    def region_de(self, x, y):
+        columna = min(self.columnas - 1, max(0, int(x * self.columnas / self.ancho)))
+        fila = min(self.filas - 1, max(0, int(y * self.filas / self.alto)))
+        return fila * self.columnas + columna
+
+    def limites(self, i):
+        """(x0, y0, x1, y1) de la región i."""
+        fila, columna = divmod(i, self.columnas)
+        return (columna * self.ancho / self.columnas, fila * self.alto / self.filas,
+                (columna + 1) * self.ancho / self.columnas, (fila + 1) * self.alto / self.filas)
+
+    def vecinas(self, i):
+        fila, columna = divmod(i, self.columnas)
+        return [f * self.columnas + c
+                for f in range(max(0, fila - 1), min(self.filas, fila + 2))
+                for c in range(max(0, columna - 1), min(self.columnas, columna + 2))
+                if (f, c) != (fila, columna)]
+
+# --- Región (en el proceso trabajador) ---
+class Region:
+    """Una región del mundo con su Ecosistema, sus fantasmas y lo que exportó a las vecinas."""
+    def __init__(self, indice, particion, config, semilla):
+        self.indice = indice
+        self.particion = particion
+        self.config = config
+        self.limites = x0, y0, x1, y1 = particion.limites(indice)
+        self.ecosistema = Ecosistema(config, semilla, region=(x0 - HALO, y0 - HALO, x1 + HALO, y1 + HALO))
+        # Sin reserva: las bajas de las vecinas llegan a entidades exportadas hace dos turnos,
+        # que no pueden haberse reutilizado para otro nacimiento
+        self.ecosistema.reserva = None
+        # Rectángulos (con halo) de las vecinas: a cada una se le envía lo que cae dentro del suyo
+        self.vecinas = [(j, a - HALO, b - HALO, c + HALO, d + HALO)
+                        for j in particion.vecinas(indice) for a, b, c, d in [particion.limites(j)]]
+        # Exportaciones de los dos últimos turnos: las bajas llegan referidas a la más antigua
+        self.exportadas = [{}, {}]
+
+    def turno(self, entrantes, fantasmas, bajas, cuotas, faltan_peces):
+        ecosistema = self.ecosistema
+        rejillas = ecosistema.rejillas
+
+        # 1. Bajas de nuestras entidades comidas o cazadas en el halo de una vecina
+        for vecina, indices in bajas.items():
+            exportadas = self.exportadas[0].get(vecina, [])
+            for k in indices:
+                e = exportadas[k]
+                if e.viva and e in rejillas[type(e)].celda_de:
+                    e.viva = False
+        ecosistema._compactar()
+        for cls, valores in entrantes:
+            ecosistema.agregar(_desempaquetar(cls, valores))
+
+        # 2. Fantasmas: solo en las rejillas, no en la lista de entidades que actúan
+        insertados = []
+        for duena, paquete in fantasmas:
+            for k, (cls, valores) in enumerate(paquete):
+                e = _desempaquetar(cls, valores)
+                rejillas[cls].insertar(e)
+                insertados.append((duena, k, e, e.vida))
+
+        # 3. Límites locales: la población actual (con fantasmas) más la cuota de cada especie. Los
+        # omnívoros tienen además su propio límite: su regla local solo compara con los herbívoros
+        peces = len(rejillas[Pez])
+        ecosistema.config = replace(
+            self.config,
+            max_plantas=len(rejillas[Planta]) + cuotas["plantas"],
+            max_herbivoros=len(rejillas[Herbivoro]) + cuotas["herbivoros"],
+            max_omnivoros=len(rejillas[Omnivoro]) + cuotas["omnivoros"],
+            max_carnivoros=len(rejillas[Carnivoro]) + cuotas["carnivoros"],
+            max_peces=peces + cuotas["peces"],
+            min_peces=peces + faltan_peces if faltan_peces else 0,
+        )
+        ecosistema.simular_turno()
+
+        # 4. Fantasmas muertos (bajas para su región) y fuera de las rejillas
+        muertos = {}
+        for duena, k, e, vida in insertados:
+            if not e.viva:
+                muertos.setdefault(duena, []).append(k)
+            if e.vida != vida:
+                # El coste de reproducirse con un fantasma se avisó como si fuera de esta región: se deshace
+                ecosistema.estadisticas.vida[e.nombre].cambiar(e.vida, vida)
+            rejillas[type(e)].quitar(e)
+
+        # 5. Emigrantes y franja de borde para las vecinas
+        salientes = {}
+        exportadas = {j: [] for j, *_ in self.vecinas}
+        x0, y0, x1, y1 = self.limites
+        region_de = self.particion.region_de
+        propias = []
+        for e in ecosistema.entidades:
+            x = e.posicion_x
+            y = e.posicion_y
+            # La comparación con los límites es barata; region_de solo para las que parecen fuera
+            if not (x0 <= x < x1 and y0 <= y < y1):
+                destino = region_de(x, y)
+                if destino != self.indice:
+                    rejillas[type(e)].quitar(e)
+                    ecosistema.estadisticas.baja(e)
+                    salientes.setdefault(destino, []).append(_empaquetar(e))
+                    continue
+            propias.append(e)
+            if x - x0 < HALO or x1 - x < HALO or y - y0 < HALO or y1 - y < HALO:
+                for j, a, b, c, d in self.vecinas:
+                    if a <= x <= c and b <= y <= d:
+                        exportadas[j].append(e)
+        ecosistema.entidades = propias
+        self.exportadas = [self.exportadas[1], exportadas]
+
+        conteos = ecosistema.conteos()
+        return {
+            "salientes": salientes,
+            "fantasmas": {j: [_empaquetar(e) for e in lista] for j, lista in exportadas.items() if lista},
+            "bajas": muertos,
+            "conteos": conteos,
+            "estadisticas": ecosistema.estadisticas.parte(),
+            "nacimientos": ecosistema.nacimientos,
+            "cazas": ecosistema.cazas,
+            # Los nacimientos y las entidades que han llegado de otras regiones o como fantasmas
+            "asignaciones": ecosistema.asignaciones + len(entrantes) + len(insertados),
+        }
+
+def _trabajar(conexion, indice, particion, config, semilla):
+    """Bucle del proceso trabajador: recibe los datos de cada turno y devuelve el resultado."""
+    region = Region(indice, particion, config, semilla)
+    while True:
+        mensaje = conexion.recv()
+        if mensaje is None:
+            break
+        conexion.send(region.turno(*mensaje))
+    conexion.close()
+
+class _RegionLocal:
+    """Región en el propio proceso (procesos=0): misma interfaz que _RegionRemota."""
+    def __init__(self, indice, particion, config, semilla):
+        self.region = Region(indice, particion, config, semilla)
+        self._resultado = None
+
+    def enviar(self, mensaje):
+        self._resultado = self.region.turno(*mensaje)
+
+    def recibir(self):
+        return self._resultado
+
+    def cerrar(self):
+        pass
+
+class _RegionRemota:
+    def __init__(self, indice, particion, config, semilla):
+        self.conexion, remota = multiprocessing.Pipe()
+        self.proceso = multiprocessing.Process(target=_trabajar, args=(remota, indice, particion, config, semilla),
+                                               name=f"region-{indice}", daemon=True)
+        self.proceso.start()
+        remota.close()
+
+    def enviar(self, mensaje):
+        self.conexion.send(mensaje)
+
+    def recibir(self):
+        return self.conexion.recv()
+
+    def cerrar(self):
+        self.conexion.send(None)
+        self.proceso.join()
+
+# --- Coordinador ---
+class EcosistemaRegiones:
+    """Coordina las regiones de un mundo; misma interfaz de lectura que Ecosistema (sin vista).
+
+    Con `procesos` (por defecto) cada región corre en su propio proceso; con
+    procesos=False todas corren aquí, con el mismo resultado para la misma semilla.
+    """
+    def __init__(self, config, semilla=None, filas=2, columnas=2, procesos=True):
+        self.config = config
+        self.turno = 0
+        self.rng = GeneradorAleatorio(semilla)
+        self.particion = Particion(config.terreno.ancho_mundo, config.terreno.alto_mundo, filas, columnas)
+        base = 0 if semilla is None else semilla
+        tipo = _RegionRemota if procesos else _RegionLocal
+        # Semilla distinta y reproducible por región
+        self.regiones = [tipo(i, self.particion, config, base * 1_000_003 + i) for i in range(len(self.particion))]
+        self._entrantes = [[] for _ in self.regiones]
+        self._fantasmas = [[] for _ in self.regiones]
+        self._bajas = [{} for _ in self.regiones]
+        self._conteos = [dict.fromkeys(ESPECIES, 0) for _ in self.regiones]
+        self.nacimientos = 0
+        self.cazas = 0
+        self.asignaciones = 0
+        self.telemetria = None
+        # Suma de las estadísticas de las regiones, repuesta cada turno
+        self.estadisticas = Estadisticas()
+
+    def agregar(self, especie):
+        """Asigna la entidad a la región de su posición (se incorpora en el siguiente turno)."""
+        i = self.particion.region_de(especie.posicion_x, especie.posicion_y)
+        self._entrantes[i].append(_empaquetar(especie))
+        self._conteos[i][_nombre(type(especie))] += 1
+        self.estadisticas.alta(especie)
+
+    def conteos(self):
+        return {nombre: sum(c[nombre] for c in self._conteos) for nombre in ESPECIES}
+
+    def _cuotas(self):
+        """Nacimientos permitidos a cada región: lo que falta hasta cada límite, repartido según su población."""
+        config = self.config
+        conteos = self.conteos()
+        limites = {
+            "plantas": config.max_plantas,
+            "herbivoros": config.max_herbivoros,
+            "carnivoros": config.max_carnivoros,
+            "omnivoros": min(conteos["herbivoros"], config.max_herbivoros),
+            "peces": config.max_peces,
+        }
+        n = len(self.regiones)
+        cuotas = [{} for _ in range(n)]
+        for nombre, limite in limites.items():
+            libre = max(0, limite - conteos[nombre])
+            total = conteos[nombre] + n
+            for i in range(n):
+                cuotas[i][nombre] = libre * (self._conteos[i][nombre] + 1) // total
+        return cuotas
+
+    def simular_turno(self):
+        self.turno += 1
+        self.estadisticas.empezar_turno(self.turno)
+        cuotas = self._cuotas()
+        faltan_peces = max(0, self.config.min_peces - self.conteos()["peces"])
+        for i, region in enumerate(self.regiones):
+            # La región 0 repone los peces que falten; aparecen en cualquier lago y luego migran
+            region.enviar((self._entrantes[i], self._fantasmas[i], self._bajas[i], cuotas[i],
+                           faltan_peces if i == 0 else 0))
+        resultados = [region.recibir() for region in self.regiones]
+
+        self._entrantes = [[] for _ in self.regiones]
+        self._fantasmas = [[] for _ in self.regiones]
+        self._bajas = [{} for _ in self.regiones]
+        self.nacimientos = self.cazas = self.asignaciones = 0
+        for i, resultado in enumerate(resultados):
+            for destino, paquete in resultado["salientes"].items():
+                self._entrantes[destino].extend(paquete)
+            for vecina, paquete in resultado["fantasmas"].items():
+                self._fantasmas[vecina].append((i, paquete))
+            for duena, indices in resultado["bajas"].items():
+                self._bajas[duena][i] = indices
+            self.nacimientos += resultado["nacimientos"]
+            self.cazas += resultado["cazas"]
+            self.asignaciones += resultado["asignaciones"]
+        # Los conteos de cada región ya no incluyen a los que se van: se suman en la de destino
+        for i, resultado in enumerate(resultados):
+            self._conteos[i] = resultado["conteos"]
+        self.estadisticas.combinar([resultado["estadisticas"] for resultado in resultados])
+        for resultado in resultados:
+            for destino, paquete in resultado["salientes"].items():
+                for cls, valores in paquete:
+                    nombre = _nombre(cls)
+                    self._conteos[destino][nombre] += 1
+                    if cls is Planta:
+                        self.estadisticas.alta_valores(nombre)
+                    else:
+                        self.estadisticas.alta_valores(nombre, valores[3], valores[4])
+        self.estadisticas.terminar_turno()
+
+    def cerrar(self):
+        for region in self.regiones:
+            region.cerrar()
+
+def _nombre(cls):
+    return next(nombre for nombre, c in ESPECIES.items() if c is cls)
+
+# --- Subcomando ---
+def terreno_para(ancho, alto, lagos, semilla=None):
+    """Mapa con `lagos` lagos al azar y la escala mínima para no pasar de PIXELES_TERRENO píxeles."""
+    escala = max(1, math.ceil(math.sqrt(ancho * alto / PIXELES_TERRENO)))
+    return Terreno.lagos_aleatorios(lagos, ancho, alto, semilla, escala=escala)
+
+def ejecutar_mundo(args):
+    """Subcomando `world`: simula un mundo grande por regiones y escribe los conteos en CSV."""
+    filas, _, columnas = args.tiles.partition("x")
+    filas, columnas = int(filas), int(columnas or filas)
+    ancho, alto = args.width, args.height
+    factor = ancho * alto / (TERRENO_POR_DEFECTO.ancho_mundo * TERRENO_POR_DEFECTO.alto_mundo)
+    lagos = args.lakes if args.lakes is not None else max(1, round(factor))
+    config = config_para(terreno_para(ancho, alto, lagos, args.seed))
+    print(f"Mundo de {ancho} x {alto} con {lagos} lagos en {filas} x {columnas} regiones; "
+          f"límite de plantas {config.max_plantas}.", file=sys.stderr)
+
+    ecosistema = EcosistemaRegiones(config, args.seed, filas, columnas, procesos=not args.serial)
+    try:
+        poblar_inicial(ecosistema)
+        salida = open(args.output, "w", newline="") if args.output else sys.stdout
+        escritor = csv.writer(salida)
+        escritor.writerow(COLUMNAS_CONTEOS)
+        inicio = time.perf_counter()
+        for _ in range(args.turns):
+            ecosistema.simular_turno()
+            if args.every and ecosistema.turno % args.every == 0:
+                escritor.writerow(fila_conteos(ecosistema))
+        duracion = time.perf_counter() - inicio
+        if not (args.every and ecosistema.turno % args.every == 0):
+            escritor.writerow(fila_conteos(ecosistema))
+        if args.output:
+            salida.close()
+    finally:
+        ecosistema.cerrar()
+    print(f"Simulación detenida después de {ecosistema.turno} turnos "
+          f"({ecosistema.turno / max(duracion, 1e-9):.1f} turnos/s).", file=sys.stderr)
@@ -0,0 +1,538 @@
+"""Motor por lotes: muchas réplicas independientes del mismo escenario en los mismos arreglos.
+
+Cada especie es un Lote: arreglos de forma (réplicas, capacidad) con una fila
+por réplica y una columna por hueco; `viva` marca los huecos ocupados y las
+crías ocupan los libres de su fila. Un solo simular_turno avanza todas las
+réplicas con las fases y reglas de EcosistemaNumpy (movimiento y rebote en el
+lago, envejecimiento, radios de alimentación, límites por especie, peces entre
+min_peces y max_peces); cada réplica conserva sus propios límites.
+
+Las búsquedas de vecinos se hacen de una vez para todas las réplicas con un
+índice de celdas por (réplica, celda), así que nunca se mezclan. Las
+reproducciones por parejas recorren los huecos en un bucle corto (capacidad
+del lote) vectorizado sobre las réplicas.
+
+Una réplica termina cuando se quedan sin herbívoros, carnívoros ni omnívoros:
+se anota el turno y su fila sale de los arreglos. Todas las réplicas comparten
+un generador, así que el resultado depende de la semilla y del número de
+réplicas, y ninguna repite paso a paso la trayectoria de EcosistemaNumpy.
+"""
+import csv
+import math
+import sys
+import time
+
+import numpy as np
+
+from dinos import CONFIG_POR_DEFECTO, COLUMNAS_CONTEOS, Planta, Herbivoro, Carnivoro, Omnivoro, Pez
+from motor_numpy import SALTO, TAM_CELDA, VIDA_INICIAL, _casilla, _emparejar, en_agua, mascara_agua
+
+ESPECIES = (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)
+
+class Lote:
+    """Una especie en todas las réplicas: arreglos de (réplicas x capacidad) con huecos libres.
+
+    Con `fija` (plantas) las posiciones no cambian mientras viven y la celda
+    de cada hueco se calcula una sola vez, al ocuparlo.
+    """
+    CAMPOS = {
+        "x": float, "y": float, "direccion": float, "vida": float, "edad": np.int64,
+        "cooldown_comer": np.int32, "cooldown_repro": np.int32, "viva": bool, "ya_reprodujo": bool,
+        "celda": np.int32,
+    }
+
+    def __init__(self, replicas, ancho, alto, fija=False, capacidad=1):
+        self.fija = fija
+        self.ancho = ancho
+        self.alto = alto
+        for campo, tipo in self.CAMPOS.items():
+            setattr(self, campo, np.zeros((replicas, capacidad), dtype=tipo))
+
+    @property
+    def capacidad(self):
+        return self.x.shape[1]
+
+    def conteos(self):
+        """Individuos vivos de cada réplica."""
+        return np.count_nonzero(self.viva, axis=1)
+
+    def dimensiones(self, tam):
+        """(columnas, filas) de una rejilla de celdas de `tam` sobre el mundo."""
+        return int(self.ancho // tam) + 1, int(self.alto // tam) + 1
+
+    def _celda(self, x, y, tam=TAM_CELDA):
+        columnas, filas = self.dimensiones(tam)
+        return np.clip(_casilla(y, tam), 0, filas - 1) * columnas + np.clip(_casilla(x, tam), 0, columnas - 1)
+
+    def celdas(self, tam=TAM_CELDA):
+        """Celda de cada hueco en la rejilla de `tam`; los libres van a la celda extra columnas * filas."""
+        columnas, filas = self.dimensiones(tam)
+        celda = self.celda if self.fija and tam == TAM_CELDA else self._celda(self.x, self.y, tam)
+        return np.where(self.viva, celda, columnas * filas)
+
+    def ampliar(self, capacidad):
+        """Añade huecos libres al final de todas las filas."""
+        extra = capacidad - self.capacidad
+        for campo in self.CAMPOS:
+            actual = getattr(self, campo)
+            setattr(self, campo, np.concatenate([actual, np.zeros((len(actual), extra), dtype=actual.dtype)], axis=1))
+
+    def conservar_replicas(self, mascara):
+        """Se queda solo con las filas marcadas."""
+        for campo in self.CAMPOS:
+            setattr(self, campo, getattr(self, campo)[mascara])
+
+    def agregar(self, r, x, y, vida, direccion):
+        """Ocupa huecos libres de las filas `r` (en orden creciente) con individuos recién nacidos."""
+        if len(r) == 0:
+            return
+        nuevos = np.bincount(r, minlength=len(self.viva))
+        necesaria = int((self.conteos() + nuevos).max())
+        if necesaria > self.capacidad:
+            self.ampliar(max(necesaria, self.capacidad + self.capacidad // 2))
+        # La k-ésima cría de cada fila ocupa el k-ésimo hueco libre de esa fila (solo se miran las filas con crías)
+        filas = np.flatnonzero(nuevos)
+        libres = ~self.viva[filas]
+        por_fila = np.count_nonzero(libres, axis=1)
+        _, columnas = np.nonzero(libres)
+        c = columnas[(np.cumsum(por_fila) - por_fila)[np.searchsorted(filas, r)] + _rango_en_fila(r)]
+        self.x[r, c] = x
+        self.y[r, c] = y
+        self.direccion[r, c] = direccion
+        self.vida[r, c] = vida
+        self.edad[r, c] = 0
+        self.cooldown_comer[r, c] = 0
+        self.cooldown_repro[r, c] = 0
+        self.viva[r, c] = True
+        self.ya_reprodujo[r, c] = False
+        if self.fija:
+            self.celda[r, c] = self._celda(x, y)
+
+def _rango_en_fila(r):
+    """Posición de cada elemento dentro de su grupo en `r` (ordenado): 0, 1, 2... por fila."""
+    return np.arange(len(r)) - np.searchsorted(r, r)
+
+def _limitar(r, maximo):
+    """Máscara de los primeros maximo[fila] elementos de cada fila de `r` (ordenado)."""
+    return _rango_en_fila(r) < np.maximum(maximo, 0)[r]
+
+class IndiceReplicas:
+    """Como motor_numpy.IndiceCeldas para un Lote: huecos agrupados por (réplica, celda).
+
+    Cada fila se ordena por separado con claves de 16 bits (NumPy usa entonces
+    una ordenación por radix) y los huecos libres van a una celda extra que
+    ninguna búsqueda visita. Los índices devueltos son de lote.x.ravel(). Con
+    pocos individuos conviene una celda de `tam` cercana al radio de búsqueda:
+    hay menos celdas que contar y que visitar.
+    """
+    def __init__(self, lote, tam=TAM_CELDA):
+        self.x = lote.x.ravel()
+        self.y = lote.y.ravel()
+        self.tam = tam
+        self.columnas, self.filas = lote.dimensiones(tam)
+        self.celdas = self.columnas * self.filas + 1
+        replicas, capacidad = lote.x.shape
+        tipo = np.int16 if self.celdas <= np.iinfo(np.int16).max else np.int32
+        celda = lote.celdas(tam).astype(tipo)
+        self.orden = (np.argsort(celda, axis=1, kind="stable") + (np.arange(replicas) * capacidad)[:, None]).ravel()
+        clave = (celda + (np.arange(replicas) * self.celdas)[:, None].astype(np.int64)).ravel()
+        self.inicios = np.zeros(replicas * self.celdas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(clave, minlength=replicas * self.celdas), out=self.inicios[1:])
+
+    def pares(self, r, ax, ay, radio):
+        """Pares (a, b) a distancia < radio dentro de la réplica r[a], agrupados por a en orden creciente."""
+        k = int(math.ceil(radio / self.tam))
+        lado = 2 * k + 1
+        desp = np.arange(-k, k + 1)
+        col_a = np.clip(_casilla(ax, self.tam), 0, self.columnas - 1)
+        fila_a = np.clip(_casilla(ay, self.tam), 0, self.filas - 1)
+        vc = (col_a[:, None] + np.tile(desp, lado)).ravel()
+        vf = (fila_a[:, None] + np.repeat(desp, lado)).ravel()
+        dentro = (vc >= 0) & (vc < self.columnas) & (vf >= 0) & (vf < self.filas)
+        celdas = (np.repeat(r * self.celdas, lado * lado) + vf * self.columnas + vc)[dentro]
+        desde = self.inicios[celdas]
+        cuantos = self.inicios[celdas + 1] - desde
+
+        total = int(cuantos.sum())
+        if total == 0:
+            vacio = np.zeros(0, dtype=np.int64)
+            return vacio, vacio
+        a = np.repeat(np.flatnonzero(dentro) // (lado * lado), cuantos)
+        b = self.orden[np.repeat(desde - (np.cumsum(cuantos) - cuantos), cuantos) + np.arange(total)]
+        dx = ax[a] - self.x[b]
+        dy = ay[a] - self.y[b]
+        cerca = dx * dx + dy * dy < radio * radio
+        return a[cerca], b[cerca]
+
+class EcosistemaReplicas:
+    """`replicas` ecosistemas con la misma configuración, avanzados juntos con operaciones por lotes."""
+    motor = "replicas"
+
+    def __init__(self, replicas, semilla=None, config=CONFIG_POR_DEFECTO):
+        self.config = config
+        self.turno = 0
+        self.rng = np.random.default_rng(semilla)
+        terreno = config.terreno
+        self.ancho = terreno.ancho_mundo
+        self.alto = terreno.alto_mundo
+        self.escala = terreno.escala
+        self.agua = mascara_agua(terreno)
+        self.indices_agua = np.array(terreno.indices_agua, dtype=np.int64)
+        self.indices_tierra = np.array(terreno.indices_tierra, dtype=np.int64)
+        self.lotes = {cls: Lote(replicas, self.ancho, self.alto, fija=cls is Planta) for cls in ESPECIES}
+        # Réplica original de cada fila que sigue activa y turno en que terminó cada una (-1: activa)
+        self.ids = np.arange(replicas)
+        self.fin = np.full(replicas, -1, dtype=np.int64)
+        self._historia = []
+
+    @property
+    def replicas(self):
+        return len(self.fin)
+
+    def conteos(self):
+        """{especie: arreglo con su población en cada réplica activa}."""
+        return {cls.nombre: lote.conteos() for cls, lote in self.lotes.items()}
+
+    def _matriz_conteos(self):
+        return np.stack([lote.conteos() for lote in self.lotes.values()], axis=1)
+
+    def _registrar(self):
+        """Guarda los conteos del turno; las réplicas terminadas repiten su última fila."""
+        fila = self._historia[-1].copy() if self._historia else np.zeros((self.replicas, len(ESPECIES)), dtype=np.int32)
+        fila[self.ids] = self._matriz_conteos()
+        self._historia.append(fila)
+
+    # --- Posiciones ---
+    def _posiciones_tierra(self, n):
+        """Como Terreno.posicion_tierra: píxeles de tierra al azar (enteros si la escala es 1)."""
+        i = self.indices_tierra[self.rng.integers(len(self.indices_tierra), size=n)]
+        ancho = self.config.terreno.ancho
+        if self.escala == 1:
+            return (i % ancho).astype(float), (i // ancho).astype(float)
+        return (i % ancho + self.rng.random(n)) * self.escala, (i // ancho + self.rng.random(n)) * self.escala
+
+    def _posiciones_lago(self, n):
+        i = self.indices_agua[self.rng.integers(len(self.indices_agua), size=n)]
+        ancho = self.config.terreno.ancho
+        return (i % ancho + self.rng.random(n)) * self.escala, (i // ancho + self.rng.random(n)) * self.escala
+
+    def _posiciones_crias(self, r, x, y, dispersion, intentos):
+        """Para cada progenitor, la primera posición fuera del lago entre varios intentos; sin ninguna, no hay cría."""
+        n = len(x)
+        nx = np.clip(x[:, None] + self.rng.uniform(-dispersion, dispersion, (n, intentos)), 0, self.ancho)
+        ny = np.clip(y[:, None] + self.rng.uniform(-dispersion, dispersion, (n, intentos)), 0, self.alto)
+        validas = ~en_agua(self.agua, nx, ny, self.escala)
+        tiene = validas.any(axis=1)
+        k = validas.argmax(axis=1)
+        filas = np.arange(n)
+        return r[tiene], nx[filas, k][tiene], ny[filas, k][tiene]
+
+    def _nacer(self, cls, r, x, y, maximo):
+        """Añade las crías de cada réplica que quepan en su `maximo`."""
+        dentro = _limitar(r, maximo)
+        r = r[dentro]
+        self.lotes[cls].agregar(r, x[dentro], y[dentro], VIDA_INICIAL[cls], self.rng.uniform(0, 2 * math.pi, len(r)))
+
+    def poblar(self):
+        """Población inicial de la configuración en cada réplica."""
+        config = self.config
+        n = len(self.ids)
+        iniciales = ((Planta, config.plantas_iniciales), (Herbivoro, config.herbivoros_iniciales),
+                     (Carnivoro, config.carnivoros_iniciales), (Omnivoro, config.omnivoros_iniciales),
+                     (Pez, config.peces_iniciales))
+        for cls, cuantos in iniciales:
+            r = np.repeat(np.arange(n), cuantos)
+            x, y = self._posiciones_lago(len(r)) if cls is Pez else self._posiciones_tierra(len(r))
+            self.lotes[cls].agregar(r, x, y, VIDA_INICIAL[cls], self.rng.uniform(0, 2 * math.pi, len(r)))
+        self._historia = []
+        self._registrar()
+
+    # --- Fases del turno ---
+    def _mover_terrestres(self, p, salto):
+        d = p.direccion + self.rng.uniform(-0.06, 0.06, p.x.shape)
+        tx = p.x + np.cos(d) * salto
+        ty = p.y + np.sin(d) * salto
+        agua = en_agua(self.agua, tx, ty, self.escala)
+        # Rebotar contra el lago sin avanzar
+        d = np.where(agua, d + math.pi + self.rng.uniform(-0.1, 0.1, p.x.shape), d)
+        tierra = ~agua
+        nx = np.clip(tx, 0, self.ancho)
+        ny = np.clip(ty, 0, self.alto)
+        p.x = np.where(tierra, nx, p.x)
+        p.y = np.where(tierra, ny, p.y)
+        # Reflejar en las paredes del mapa
+        d = np.where(tierra & ((nx <= 0) | (nx >= self.ancho)), math.pi - d, d)
+        d = np.where(tierra & ((ny <= 0) | (ny >= self.alto)), -d, d)
+        p.direccion = d
+
+    def _mover_peces(self, p, salto):
+        d = p.direccion + self.rng.uniform(-0.15, 0.15, p.x.shape)
+        tx = p.x + np.cos(d) * salto
+        ty = p.y + np.sin(d) * salto
+        dentro = en_agua(self.agua, tx, ty, self.escala)
+        d = np.where(dentro, d, d + math.pi + self.rng.uniform(-0.5, 0.5, p.x.shape))
+        p.x = np.where(dentro, tx, p.x - np.cos(d) * (salto * 0.1))
+        p.y = np.where(dentro, ty, p.y - np.sin(d) * (salto * 0.1))
+        p.direccion = d
+
+    def _envejecer(self, p, desgaste, edad_maxima, usa_cooldown_comer=True):
+        p.edad += 1
+        p.vida -= desgaste
+        if usa_cooldown_comer:
+            np.maximum(p.cooldown_comer - 1, 0, out=p.cooldown_comer)
+        np.maximum(p.cooldown_repro - 1, 0, out=p.cooldown_repro)
+        p.viva &= ~((p.edad > edad_maxima) | (p.vida <= 0))
+
+    def _consumir(self, comedores, r, c, presas, indice, radio, exito=None):
+        """Como EcosistemaNumpy._consumir en todas las réplicas a la vez.
+
+        (r, c) son los huecos de los comedores e `indice` el IndiceReplicas de las presas;
+        devuelve los índices de los que comieron dentro de (r, c) y marca sus
+        presas como muertas.
+        """
+        if len(r) == 0:
+            return np.zeros(0, dtype=np.int64)
+        a, b = indice.pares(r, comedores.x[r, c], comedores.y[r, c], radio)
+        if exito is not None:
+            acierto = self.rng.random(len(a)) < exito
+            a, b = a[acierto], b[acierto]
+        a, b = _emparejar(a, b, presas.viva.ravel())
+        presas.viva[b // presas.capacidad, b % presas.capacidad] = False
+        return a
+
+    def _alimentar(self):
+        plantas = self.lotes[Planta]
+        herbivoros = self.lotes[Herbivoro]
+        carnivoros = self.lotes[Carnivoro]
+        omnivoros = self.lotes[Omnivoro]
+
+        # Las plantas no se mueven durante el turno: un solo índice para herbívoros y omnívoros
+        indice_plantas = IndiceReplicas(plantas)
+        indice_herbivoros = IndiceReplicas(herbivoros)
+
+        # Herbívoros: primera planta a < 30
+        r, c = np.nonzero(herbivoros.viva & (herbivoros.cooldown_comer == 0))
+        a = self._consumir(herbivoros, r, c, plantas, indice_plantas, 30)
+        r_a, c_a = r[a], c[a]
+        herbivoros.vida[r_a, c_a] = np.minimum(herbivoros.vida[r_a, c_a] + 20, 10000)
+        herbivoros.cooldown_comer[r_a, c_a] = 4
+
+        # Carnívoros: primer herbívoro a < 18 cuya tirada (70%) tenga éxito
+        r, c = np.nonzero(carnivoros.viva & (carnivoros.cooldown_comer == 0))
+        a = self._consumir(carnivoros, r, c, herbivoros, indice_herbivoros, 18, exito=0.7)
+        r_a, c_a = r[a], c[a]
+        carnivoros.vida[r_a, c_a] = np.minimum(carnivoros.vida[r_a, c_a] + 10, 1150)
+        carnivoros.cooldown_comer[r_a, c_a] = 15
+
+        # Omnívoros: primero plantas a < 20 y, si no hay, herbívoros a < 18
+        r, c = np.nonzero(omnivoros.viva & (omnivoros.cooldown_comer == 0))
+        a = self._consumir(omnivoros, r, c, plantas, indice_plantas, 20)
+        r_a, c_a = r[a], c[a]
+        omnivoros.vida[r_a, c_a] = np.minimum(omnivoros.vida[r_a, c_a] + 8, 1100)
+        omnivoros.cooldown_comer[r_a, c_a] = 4
+        resto = np.ones(len(r), dtype=bool)
+        resto[a] = False
+        r, c = r[resto], c[resto]
+        a = self._consumir(omnivoros, r, c, herbivoros, indice_herbivoros, 18)
+        r_a, c_a = r[a], c[a]
+        nutre = self.rng.random(len(a)) < 0.6
+        omnivoros.vida[r_a[nutre], c_a[nutre]] = np.minimum(omnivoros.vida[r_a[nutre], c_a[nutre]] + 8, 1100)
+        omnivoros.cooldown_comer[r_a, c_a] = 8
+
+    def _reproducir_plantas(self, poblacion):
+        p = self.lotes[Planta]
+        if not self.config.dispersion_plantas:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+        # Las réplicas en el límite de plantas no tiran los dados
+        filas = np.flatnonzero((poblacion > 0) & (poblacion < self.config.max_plantas))
+        r, c = np.nonzero(p.viva[filas] & (self.rng.random((len(filas), p.capacidad)) < 0.20))
+        r = filas[r]
+        return self._posiciones_crias(r, p.x[r, c], p.y[r, c], 25, 1)
+
+    def _reproducir_terrestres(self, cls):
+        """Parejas a < 28 como en EcosistemaNumpy: cada hueco elige al primer compañero libre de su réplica."""
+        p = self.lotes[cls]
+        nombre = cls.__name__.lower()
+        coste = getattr(self.config, f"{nombre}_repro_coste")
+        cooldown = getattr(self.config, f"{nombre}_repro_cooldown")
+        disponibles = p.viva & (p.cooldown_repro == 0) & ~p.ya_reprodujo
+        # Parejas a < 28 del índice por celdas, sin matrices de todos contra todos
+        r_d, c_d = np.nonzero(disponibles)
+        i, b = IndiceReplicas(p, 28).pares(r_d, p.x[r_d, c_d], p.y[r_d, c_d], 28)
+        pareja = (b != r_d[i] * p.capacidad + c_d[i]) & disponibles.ravel()[b]
+        i, b = i[pareja], b[pareja] % p.capacidad
+        # Por hueco a, luego réplica y luego compañero: el primero libre de cada réplica es su pareja
+        orden = np.lexsort((b, r_d[i], c_d[i]))
+        huecos, rs, bs = c_d[i][orden], r_d[i][orden], b[orden]
+        con_pareja, inicios = np.unique(huecos, return_index=True)
+        padres_r, padres_c = [], []
+        for a, desde, hasta in zip(con_pareja, inicios, np.append(inicios[1:], len(huecos))):
+            r, b = rs[desde:hasta], bs[desde:hasta]
+            libres = disponibles[r, a] & disponibles[r, b]
+            r, primero = np.unique(r[libres], return_index=True)
+            if len(r) == 0:
+                continue
+            b = b[libres][primero]
+            disponibles[r, a] = disponibles[r, b] = False
+            p.vida[r, a] -= coste
+            p.vida[r, b] -= coste
+            p.viva[r, a] &= p.vida[r, a] > 0
+            p.viva[r, b] &= p.vida[r, b] > 0
+            vivos = p.viva[r, a] & p.viva[r, b]
+            r, b = r[vivos], b[vivos]
+            suerte = self.rng.random(len(r)) < 0.25
+            p.ya_reprodujo[r[suerte], a] = p.ya_reprodujo[r[suerte], b[suerte]] = True
+            p.cooldown_repro[r, a] = p.cooldown_repro[r, b] = cooldown
+            padres_r.append(r)
+            padres_c.append(np.full(len(r), a))
+        if not padres_r:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+        r = np.concatenate(padres_r)
+        c = np.concatenate(padres_c)
+        orden = np.argsort(r, kind="stable")
+        r, c = r[orden], c[orden]
+        return self._posiciones_crias(r, p.x[r, c], p.y[r, c], 20, 5)
+
+    def _reproducir_peces(self, poblacion):
+        """Bucle i/j de EcosistemaNumpy._reproducir_peces sobre los huecos, con cada paso vectorizado en las réplicas."""
+        p = self.lotes[Pez]
+        activas = poblacion < self.config.max_peces
+        crias_r, crias_x, crias_y = [], [], []
+        for i in range(p.capacidad):
+            buscando = activas & p.viva[:, i] & (p.cooldown_repro[:, i] == 0) & ~p.ya_reprodujo[:, i]
+            for j in range(p.capacidad):
+                if j == i:
+                    continue
+                r = np.flatnonzero(buscando & p.viva[:, j] & ~p.ya_reprodujo[:, j] & (p.cooldown_repro[:, j] == 0)
+                                   & ((p.x[:, i] - p.x[:, j]) ** 2 + (p.y[:, i] - p.y[:, j]) ** 2 < 28 * 28))
+                if len(r) == 0:
+                    continue
+                p.vida[r, i] -= 50
+                p.vida[r, j] -= 50
+                r = r[self.rng.random(len(r)) < 0.35]
+                if len(r) == 0:
+                    continue
+                p.ya_reprodujo[r, i] = p.ya_reprodujo[r, j] = True
+                p.cooldown_repro[r, i] = p.cooldown_repro[r, j] = 50
+                buscando[r] = False
+                nx = p.x[r, i] + self.rng.uniform(-10, 10, len(r))
+                ny = p.y[r, i] + self.rng.uniform(-10, 10, len(r))
+                fuera = ~en_agua(self.agua, nx, ny, self.escala)
+                if fuera.any():
+                    nx[fuera], ny[fuera] = self._posiciones_lago(int(fuera.sum()))
+                crias_r.append(r)
+                crias_x.append(nx)
+                crias_y.append(ny)
+        if not crias_r:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+        r = np.concatenate(crias_r)
+        orden = np.argsort(r, kind="stable")
+        return r[orden], np.concatenate(crias_x)[orden], np.concatenate(crias_y)[orden]
+
+    def _controlar_peces(self):
+        """min_peces <= peces <= max_peces en cada réplica."""
+        config = self.config
+        peces = self.lotes[Pez]
+        faltan = np.maximum(config.min_peces - peces.conteos(), 0)
+        if faltan.any():
+            r = np.repeat(np.arange(len(faltan)), faltan)
+            self._nacer(Pez, r, *self._posiciones_lago(len(r)), faltan)
+        sobran = peces.conteos() - config.max_peces
+        if (sobran > 0).any():
+            # Eliminar los de menos vida y, a igualdad, menos edad (los huecos libres van al final)
+            orden = np.lexsort((peces.edad, np.where(peces.viva, peces.vida, np.inf)))
+            r, k = np.nonzero(np.arange(peces.capacidad) < sobran[:, None])
+            peces.viva[r, orden[r, k]] = False
+
+    def _retirar_terminadas(self):
+        """Saca de los arreglos las réplicas sin animales terrestres y anota su turno final."""
+        terrestres = sum(self.lotes[cls].conteos() for cls in (Herbivoro, Carnivoro, Omnivoro))
+        terminadas = terrestres == 0
+        if not terminadas.any():
+            return
+        self.fin[self.ids[terminadas]] = self.turno
+        for lote in self.lotes.values():
+            lote.conservar_replicas(~terminadas)
+        self.ids = self.ids[~terminadas]
+
+    def simular_turno(self):
+        """Avanza un turno todas las réplicas activas."""
+        if len(self.ids) == 0:
+            return
+        self.turno += 1
+        config = self.config
+        plantas = self.lotes[Planta]
+        herbivoros = self.lotes[Herbivoro]
+        carnivoros = self.lotes[Carnivoro]
+        omnivoros = self.lotes[Omnivoro]
+        peces = self.lotes[Pez]
+        poblacion_plantas = plantas.conteos()
+        poblacion_peces = peces.conteos()
+
+        for p in (herbivoros, carnivoros, omnivoros, peces):
+            p.ya_reprodujo[:] = False
+
+        # 1. Movimiento y envejecimiento por lotes
+        for cls in (Herbivoro, Carnivoro, Omnivoro):
+            self._mover_terrestres(self.lotes[cls], SALTO[cls])
+            self._envejecer(self.lotes[cls], 0.15, 300000)
+        self._mover_peces(peces, SALTO[Pez])
+        self._envejecer(peces, 0.05, 50000, usa_cooldown_comer=False)
+
+        # 2. Alimentación y reproducción
+        self._alimentar()
+        crias_plantas = self._reproducir_plantas(poblacion_plantas)
+        crias = {cls: self._reproducir_terrestres(cls) for cls in (Herbivoro, Carnivoro, Omnivoro)}
+        crias_peces = self._reproducir_peces(poblacion_peces)
+
+        # 3. Límites de población de cada réplica (los muertos ya dejaron su hueco libre)
+        self._nacer(Planta, *crias_plantas, config.max_plantas - plantas.conteos())
+        self._nacer(Herbivoro, *crias[Herbivoro], config.max_herbivoros - herbivoros.conteos())
+        # Omnívoros: no más que herbívoros y por debajo del límite global (y del propio, si lo hay)
+        tope = np.minimum(herbivoros.conteos(), config.max_herbivoros)
+        if config.max_omnivoros:
+            tope = np.minimum(tope, config.max_omnivoros)
+        self._nacer(Omnivoro, *crias[Omnivoro], tope - omnivoros.conteos())
+        self._nacer(Carnivoro, *crias[Carnivoro], config.max_carnivoros - carnivoros.conteos())
+        self._nacer(Pez, *crias_peces, config.max_peces - peces.conteos())
+
+        # 4. Control estricto de población de peces y réplicas terminadas
+        self._controlar_peces()
+        self._registrar()
+        self._retirar_terminadas()
+
+    def simular(self, turnos):
+        """Simula hasta `turnos` turnos o hasta que terminen todas las réplicas; devuelve las series."""
+        for _ in range(turnos):
+            if len(self.ids) == 0:
+                break
+            self.simular_turno()
+        return self.series()
+
+    def series(self):
+        """Una matriz (turnos + 1) x especies por réplica, hasta el turno en que terminó."""
+        historia = np.stack(self._historia, axis=1)
+        return [historia[r, :fin + 1] if fin >= 0 else historia[r] for r, fin in enumerate(self.fin.tolist())]
+
+def ejecutar_replicas(args):
+    """Subcomando `replicas`: simula las réplicas por lotes y escribe la serie de cada una en CSV."""
+    ecosistema = EcosistemaReplicas(args.count, args.seed)
+    ecosistema.poblar()
+    inicio = time.perf_counter()
+    series = ecosistema.simular(args.turns)
+    duracion = time.perf_counter() - inicio
+
+    salida = open(args.output, "w", newline="") if args.output else sys.stdout
+    escritor = csv.writer(salida)
+    escritor.writerow(("replica",) + COLUMNAS_CONTEOS)
+    for replica, serie in enumerate(series):
+        ultimo = len(serie) - 1
+        for turno, fila in enumerate(serie.tolist()):
+            if (args.every and turno % args.every == 0) or turno == ultimo:
+                escritor.writerow([replica, turno] + fila)
+    if args.output:
+        salida.close()
+    terminadas = int(np.count_nonzero(ecosistema.fin >= 0))
+    print(f"{ecosistema.replicas} réplicas, {terminadas} sin animales terrestres antes del final; "
+          f"{ecosistema.turno} turnos en {duracion:.1f} s "
+          f"({ecosistema.replicas * ecosistema.turno / max(duracion, 1e-9):.0f} turnos de réplica/s).", file=sys.stderr)
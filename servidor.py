@@ -0,0 +1,139 @@
+"""Servidor sin interfaz que difunde el ecosistema a visores en otros procesos.
+
+La simulación corre en el hilo de un Simulador; como mucho `fps` veces por
+segundo el Seguidor codifica la delta del turno (tramas.py) en ese mismo hilo
+y la pasa al bucle de asyncio, que la escribe en cada visor conectado por TCP
+o por un socket Unix. Nunca se espera a un visor: si el búfer de salida de uno
+pasa de LIMITE_BUFER se le saltan las tramas y, cuando vuelve a vaciarse,
+recibe una clave con el estado completo en lugar de las deltas perdidas. Un
+visor atascado más de PLAZO_ATASCO segundos se desconecta.
+"""
+import asyncio
+import sys
+import time
+
+from dinos import MAX_TURNS, crear_ecosistema, poblar_inicial
+from simulador import Simulador
+from tramas import Seguidor, codificar_saludo
+
+LIMITE_BUFER = 256 * 1024
+PLAZO_ATASCO = 10.0
+PLAZO_CIERRE = 2.0
+FPS = 30
+
+class _Visor:
+    __slots__ = ("escritor", "tarea", "necesita_clave", "atascado_desde")
+
+    def __init__(self, escritor, tarea):
+        self.escritor = escritor
+        self.tarea = tarea
+        self.necesita_clave = True
+        self.atascado_desde = None
+
+class Servidor:
+    """Difunde las tramas de un ecosistema a todos los visores conectados."""
+    def __init__(self, ecosistema, velocidad=1, max_turnos=MAX_TURNS, fps=FPS):
+        self.ecosistema = ecosistema
+        self.saludo = codificar_saludo(ecosistema)
+        self.seguidor = Seguidor()
+        self.visores = set()
+        self.ultima = None
+        self.tramas = 0
+        self.saltadas = 0
+        self._bucle = None
+        self.simulador = Simulador(ecosistema, velocidad, max_turnos, publicar=self._publicar, intervalo=1 / fps)
+
+    # --- Hilo de la simulación ---
+    def _publicar(self, ecosistema):
+        trama = self.seguidor.trama(ecosistema)
+        self._bucle.call_soon_threadsafe(self._difundir, trama)
+
+    # --- Bucle de asyncio ---
+    def _difundir(self, trama):
+        self.ultima = trama
+        self.tramas += 1
+        ahora = time.monotonic()
+        for visor in list(self.visores):
+            transporte = visor.escritor.transport
+            if transporte.is_closing():
+                self.visores.discard(visor)
+                continue
+            if transporte.get_write_buffer_size() > LIMITE_BUFER:
+                # Visor lento: se salta la trama y, al recuperarse, recibe una clave
+                self.saltadas += 1
+                visor.necesita_clave = True
+                if visor.atascado_desde is None:
+                    visor.atascado_desde = ahora
+                elif ahora - visor.atascado_desde > PLAZO_ATASCO:
+                    transporte.abort()
+                    self.visores.discard(visor)
+                continue
+            visor.atascado_desde = None
+            self._enviar(visor, trama)
+
+    def _enviar(self, visor, trama):
+        if visor.necesita_clave:
+            visor.escritor.write(trama.clave())
+            visor.necesita_clave = False
+        else:
+            visor.escritor.write(trama.delta)
+
+    async def _atender(self, lector, escritor):
+        visor = _Visor(escritor, asyncio.current_task())
+        escritor.write(self.saludo)
+        if self.ultima is not None:
+            self._enviar(visor, self.ultima)
+        self.visores.add(visor)
+        try:
+            # Los visores no envían nada: solo se espera a que cierren (lo que llegue se descarta)
+            while await lector.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.visores.discard(visor)
+            escritor.close()
+
+    async def servir(self, host="127.0.0.1", puerto=8765, unix=None):
+        """Escucha hasta que termina la simulación (o se interrumpe) y cierra los visores."""
+        self._bucle = asyncio.get_running_loop()
+        if unix:
+            servidor = await asyncio.start_unix_server(self._atender, unix)
+        else:
+            servidor = await asyncio.start_server(self._atender, host, puerto)
+        direccion = unix or ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+        print(f"Sirviendo el ecosistema en {direccion}", file=sys.stderr)
+        self.simulador.iniciar()
+        try:
+            async with servidor:
+                while not await asyncio.to_thread(self.simulador.esperar, 0.5):
+                    pass
+                # Deja que se difunda la última trama y cierra los visores, que vacían su búfer al cerrar;
+                # los que no lo vacían a tiempo se cortan
+                await asyncio.sleep(0)
+                visores = list(self.visores)
+                for visor in visores:
+                    visor.escritor.close()
+                if visores:
+                    await asyncio.wait([visor.tarea for visor in visores], timeout=PLAZO_CIERRE)
+                    for visor in visores:
+                        visor.escritor.transport.abort()
+                    await asyncio.wait([visor.tarea for visor in visores])
+        finally:
+            self.simulador.detener()
+        print(f"Simulación detenida en el turno {self.ecosistema.turno}: {self.tramas} tramas, "
+              f"{self.saltadas} saltadas a visores lentos.", file=sys.stderr)
+
+def ejecutar_servidor(args):
+    """Subcomando `serve`."""
+    if args.resume:
+        from punto_control import cargar
+        ecosistema = cargar(args.resume)
+    else:
+        ecosistema = crear_ecosistema(args.motor, args.seed, plantas=args.plantas)
+        poblar_inicial(ecosistema)
+    servidor = Servidor(ecosistema, args.speed or None, ecosistema.turno + args.turns, args.fps)
+    try:
+        asyncio.run(servidor.servir(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        servidor.simulador.detener()
@@ -0,0 +1,157 @@
+"""Simulación en un hilo trabajador que publica instantáneas para la vista.
+
+El hilo avanza el ecosistema a la velocidad elegida y, como mucho una vez por
+INTERVALO_PUBLICACION, publica una Instantanea nueva sustituyendo la
+referencia a la anterior. La vista siempre lee la última publicada, así que
+ni el dibujo espera a la simulación ni la simulación espera al dibujo.
+
+Cada instantánea lleva también las plantas nacidas y muertas en los últimos
+TRAMOS_PLANTAS intervalos entre publicaciones, para que la vista actualice su
+capa de plantas aunque se haya saltado alguna instantánea.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from dinos import MAX_TURNS
+from telemetria import ESPECIES
+
+# Turnos por segundo a velocidad 1× (el temporizador original era de 50 ms)
+TURNOS_POR_SEGUNDO = 20
+# Tiempo mínimo entre instantáneas: más a menudo no se llegarían a dibujar
+INTERVALO_PUBLICACION = 1 / 60
+# Turnos de historia que acompañan a cada instantánea (para las gráficas de la vista)
+TURNOS_SERIES = 200
+# Intervalos entre publicaciones cuyos cambios de plantas acompañan a cada instantánea
+TRAMOS_PLANTAS = 8
+
+@dataclass(frozen=True)
+class Instantanea:
+    """Estado de un turno ya calculado; no se modifica después de publicarse."""
+    turno: int
+    conteos: dict
+    estado: dict  # {clase: [(x, y, vida), ...]}
+    series: dict  # {especie: [conteo de cada uno de los últimos turnos]}
+    # Estadisticas.resumen() del turno (None si la fuente solo tiene conteos, p. ej. un visor remoto)
+    resumen: dict = None
+    # ((turno inicial, turno final, plantas nacidas, plantas muertas), ...) de los últimos intervalos,
+    # del más antiguo al más reciente; el último acaba en `turno`. Vacío si no se conocen los cambios.
+    tramos_plantas: tuple = ()
+
+def tomar_instantanea(ecosistema, tramos_plantas=()):
+    telemetria = ecosistema.telemetria
+    series = {especie: telemetria.ultimas(especie, TURNOS_SERIES) for especie in ESPECIES} if telemetria else {}
+    return Instantanea(ecosistema.turno, ecosistema.conteos(), ecosistema.estado_por_especie(), series,
+                       ecosistema.estadisticas.resumen(), tramos_plantas)
+
+class Simulador:
+    """Ejecuta simular_turno() en segundo plano.
+
+    `velocidad` es un multiplicador sobre TURNOS_POR_SEGUNDO (1 = tiempo real);
+    None significa tan rápido como sea posible. Con `guardado`
+    (punto_control.GuardadoPeriodico) se guardan puntos de control durante la
+    ejecución y uno más al detenerse; con `grabacion` (grabacion.Grabador) se
+    graba cada turno. `perfil` (perfil.Perfilador) se activa y
+    desactiva con alternar_perfil(). Con `publicar`, en vez de tomar una
+    Instantanea se llama a publicar(ecosistema) desde el hilo de la simulación,
+    como mucho una vez por `intervalo` segundos.
+    """
+    def __init__(self, ecosistema, velocidad=1, max_turnos=MAX_TURNS, guardado=None, perfil=None,
+                 publicar=None, intervalo=INTERVALO_PUBLICACION, grabacion=None):
+        self.ecosistema = ecosistema
+        self.publicar = publicar or self._publicar_instantanea
+        self.intervalo = intervalo
+        self.guardado = guardado
+        self.grabacion = grabacion
+        self.perfil = perfil
+        self._alternar_perfil = False
+        self.velocidad = velocidad
+        self.max_turnos = max_turnos
+        self.instantanea = tomar_instantanea(ecosistema)
+        # Cambios de plantas desde la última instantánea (None si no se publican instantáneas
+        # o el ecosistema no los da, como con el campo de plantas)
+        self._nacidas = self._muertas = None
+        if publicar is None and getattr(ecosistema, "plantas_nacidas", None) is not None:
+            self._nacidas, self._muertas = [], []
+        self._desde = ecosistema.turno
+        self._tramos = ()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="simulacion", daemon=True)
+
+    @property
+    def terminado(self):
+        return not self._hilo.is_alive() and self.ecosistema.turno >= self.max_turnos
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
+
+    def esperar(self, tiempo=None):
+        """Espera a que termine la simulación; devuelve False si sigue en marcha pasado `tiempo`."""
+        self._hilo.join(tiempo)
+        return not self._hilo.is_alive()
+
+    def alternar_perfil(self):
+        """Activa o desactiva el perfilado; el hilo lo aplica entre dos turnos."""
+        self._alternar_perfil = True
+
+    def _publicar_instantanea(self, ecosistema):
+        if self._nacidas is not None:
+            tramo = (self._desde, ecosistema.turno, tuple(self._nacidas), tuple(self._muertas))
+            self._tramos = (self._tramos + (tramo,))[-TRAMOS_PLANTAS:]
+            self._nacidas, self._muertas = [], []
+            self._desde = ecosistema.turno
+        # Publicar es sustituir una referencia: el lector ve la anterior o la nueva, entera
+        self.instantanea = tomar_instantanea(ecosistema, self._tramos)
+
+    def _bucle(self):
+        ecosistema = self.ecosistema
+        siguiente = ultima_publicacion = time.perf_counter()
+        if self.grabacion is not None:
+            self.grabacion.registrar(ecosistema)
+        while ecosistema.turno < self.max_turnos and not self._detener.is_set():
+            velocidad = self.velocidad
+            if self._alternar_perfil:
+                self._alternar_perfil = False
+                if self.perfil.activo:
+                    self.perfil.desactivar()
+                else:
+                    self.perfil.activar(ecosistema)
+            ecosistema.simular_turno()
+            if self._nacidas is not None:
+                self._nacidas += ecosistema.plantas_nacidas
+                self._muertas += ecosistema.plantas_muertas
+            if self.guardado is not None:
+                self.guardado.tras_turno(ecosistema)
+            if self.grabacion is not None:
+                self.grabacion.registrar(ecosistema)
+
+            ahora = time.perf_counter()
+            if ahora - ultima_publicacion >= self.intervalo:
+                self.publicar(ecosistema)
+                ultima_publicacion = ahora
+
+            if velocidad:
+                siguiente += 1 / (TURNOS_POR_SEGUNDO * velocidad)
+                espera = siguiente - time.perf_counter()
+                if espera > 0:
+                    self._detener.wait(espera)
+                else:
+                    # Si la simulación no da abasto, no acumular retraso
+                    siguiente = time.perf_counter()
+
+        self.publicar(ecosistema)
+        if self.perfil is not None and self.perfil.activo:
+            self.perfil.desactivar()
+        if self.guardado is not None:
+            self.guardado.cerrar(ecosistema)
+        if self.grabacion is not None:
+            self.grabacion.cerrar()
+        if ecosistema.telemetria is not None:
+            ecosistema.telemetria.cerrar()
+        if ecosistema.turno >= self.max_turnos:
+            print(f"Simulación detenida después de {self.max_turnos} turnos.")
@@ -0,0 +1,138 @@
+"""Serie temporal de métricas por turno del ecosistema.
+
+Cada turno se escribe una fila de COLUMNAS en un búfer circular preasignado
+(un array de doubles), sin crear objetos por turno más allá de la propia
+fila. Si hay archivo, cada media vuelta del búfer se copia en bloque y un
+hilo aparte la añade al final del archivo: una cabecera (MAGIA, longitud y
+lista JSON de columnas) seguida de filas de doubles en el orden de bytes
+nativo. leer() devuelve el archivo completo como columnas. Solo se añaden filas
+a un archivo existente si su cabecera tiene las mismas columnas.
+"""
+import array
+import json
+import os
+import queue
+import struct
+import threading
+
+COLUMNAS = (
+    "turno", "plantas", "herbivoros", "carnivoros", "omnivoros", "peces",
+    "nacimientos", "muertes", "cazas", "asignaciones",
+    "vida_herbivoros", "vida_carnivoros", "vida_omnivoros", "vida_peces",
+)
+ESPECIES = ("plantas", "herbivoros", "carnivoros", "omnivoros", "peces")
+MAGIA = b"ECOTEL01"
+
+def fila_turno(ecosistema):
+    """Fila de métricas del turno recién simulado, leída de ecosistema.estadisticas sin recorrer entidades.
+
+    Las muertes cuentan todas las causas (hambre, vejez, depredación, recortes).
+    Las asignaciones son las entidades creadas en memoria en el turno (las
+    que no han salido de la reserva de muertas).
+    """
+    conteos = ecosistema.conteos()
+    estadisticas = ecosistema.estadisticas
+    ultimos = estadisticas.ultimos
+    return (
+        ecosistema.turno, conteos["plantas"], conteos["herbivoros"], conteos["carnivoros"],
+        conteos["omnivoros"], conteos["peces"],
+        sum(ultimos["nacimientos"].values()), sum(ultimos["muertes"].values()), sum(ultimos["cazas"].values()),
+        ecosistema.asignaciones,
+        estadisticas.media_vida("herbivoros"), estadisticas.media_vida("carnivoros"),
+        estadisticas.media_vida("omnivoros"), estadisticas.media_vida("peces"),
+    )
+
+def _cabecera():
+    texto = json.dumps(COLUMNAS).encode()
+    return MAGIA + struct.pack("<I", len(texto)) + texto
+
+def _comprobar_cabecera(ruta):
+    """Error si `ruta` ya tiene datos con otras columnas: añadir filas de otro ancho lo corrompería."""
+    if not os.path.exists(ruta) or os.path.getsize(ruta) == 0:
+        return
+    cabecera = _cabecera()
+    with open(ruta, "rb") as archivo:
+        inicio = archivo.read(len(cabecera))
+    if inicio[:len(MAGIA)] != MAGIA:
+        raise ValueError(f"{ruta} no es un archivo de telemetría")
+    if inicio != cabecera:
+        raise ValueError(f"{ruta} se escribió con otras columnas de telemetría; usa un archivo nuevo")
+
+class Telemetria:
+    """Búfer circular de `capacidad` turnos con volcado opcional a `ruta` en segundo plano."""
+    def __init__(self, ruta=None, capacidad=4096):
+        self.ruta = ruta
+        self.capacidad = capacidad
+        self.ancho = len(COLUMNAS)
+        self.datos = array.array("d", bytes(8 * self.ancho * capacidad))
+        self.registradas = 0
+        self._volcadas = 0
+        self._cola = None
+        if ruta:
+            _comprobar_cabecera(ruta)
+            self._cola = queue.Queue()
+            self._hilo = threading.Thread(target=self._escribir, name="telemetria", daemon=True)
+            self._hilo.start()
+
+    def registrar(self, fila):
+        inicio = (self.registradas % self.capacidad) * self.ancho
+        self.datos[inicio:inicio + self.ancho] = array.array("d", fila)
+        self.registradas += 1
+        if self._cola is not None and self.registradas - self._volcadas >= self.capacidad // 2:
+            self._volcar()
+
+    def _filas(self, desde, hasta):
+        """Bytes de las filas [desde, hasta) que siguen en el búfer (como mucho `capacidad`)."""
+        desde = max(desde, hasta - self.capacidad)
+        partes = []
+        while desde < hasta:
+            i = desde % self.capacidad
+            n = min(hasta - desde, self.capacidad - i)
+            partes.append(self.datos[i * self.ancho:(i + n) * self.ancho].tobytes())
+            desde += n
+        return b"".join(partes)
+
+    def _volcar(self):
+        self._cola.put(self._filas(self._volcadas, self.registradas))
+        self._volcadas = self.registradas
+
+    def _escribir(self):
+        with open(self.ruta, "ab") as archivo:
+            if archivo.tell() == 0:
+                archivo.write(_cabecera())
+            while True:
+                bloque = self._cola.get()
+                if bloque is None:
+                    return
+                archivo.write(bloque)
+                archivo.flush()
+
+    def cerrar(self):
+        """Vuelca lo pendiente y espera al hilo escritor."""
+        if self._cola is None:
+            return
+        if self.registradas > self._volcadas:
+            self._volcar()
+        self._cola.put(None)
+        self._hilo.join()
+        self._cola = None
+
+    def ultimas(self, columna, n):
+        """Los últimos `n` valores registrados de una columna (del más antiguo al más reciente)."""
+        j = COLUMNAS.index(columna)
+        n = min(n, self.registradas, self.capacidad)
+        return [self.datos[((self.registradas - n + k) % self.capacidad) * self.ancho + j] for k in range(n)]
+
+def leer(ruta):
+    """{columna: array('d')} con todos los turnos guardados en `ruta`."""
+    with open(ruta, "rb") as archivo:
+        contenido = archivo.read()
+    if contenido[:len(MAGIA)] != MAGIA:
+        raise ValueError(f"{ruta} no es un archivo de telemetría")
+    (longitud,) = struct.unpack_from("<I", contenido, len(MAGIA))
+    inicio = len(MAGIA) + 4 + longitud
+    columnas = json.loads(contenido[len(MAGIA) + 4:inicio])
+    filas = memoryview(contenido)[inicio:]
+    # Descarta una fila incompleta al final (p. ej. si el proceso se interrumpió al escribir)
+    filas = filas[:len(filas) - len(filas) % (8 * len(columnas))].cast("d")
+    return {nombre: array.array("d", filas[j::len(columnas)]) for j, nombre in enumerate(columnas)}
@@ -0,0 +1,142 @@
+"""Mapa de agua y tierra precalculado.
+
+El terreno es un mapa de bits (1 = agua) que se calcula una sola vez, ya sea a
+partir de uno o varios lagos ovalados, de una máscara (listas o arreglo de
+NumPy) o de una imagen PNG. Cada píxel cubre `escala` x `escala` unidades del
+mundo: con escala 1 el mundo mide lo mismo que el mapa, y con escalas mayores
+se describen mundos grandes sin un píxel por unidad. Consultar si un punto es
+agua cuesta una indexación, sin importar cuántos lagos tenga el mapa, y las
+posiciones de aparición se eligen directamente de listas de píxeles válidos,
+sin bucles de rechazo.
+"""
+import array
+import itertools
+import math
+import random
+
+def _pintar_elipse(agua, ancho, alto, cx, cy, rx, ry):
+    """Marca como agua los píxeles cuyo centro cae en la elipse (en píxeles)."""
+    rx2 = rx ** 2
+    ry2 = ry ** 2
+    for fila in range(max(0, math.floor(cy - ry)), min(alto, math.ceil(cy + ry) + 1)):
+        # En cada fila el agua es un tramo continuo de columnas alrededor de cx
+        resto = 1 - (fila + 0.5 - cy) ** 2 / ry2
+        if resto < 0:
+            continue
+        for columna in range(max(0, math.floor(cx - 0.5 - (rx2 * resto) ** 0.5) - 1),
+                             min(ancho, math.ceil(cx + (rx2 * resto) ** 0.5) + 1)):
+            if (columna + 0.5 - cx) ** 2 / rx2 + (fila + 0.5 - cy) ** 2 / ry2 <= 1:
+                agua[fila * ancho + columna] = 1
+
+class Terreno:
+    """Mapa de bits de agua de `ancho` x `alto` píxeles de `escala` unidades de lado.
+
+    Las posiciones de aparición en tierra se limitan a los píxeles que quedan a
+    `margen` píxeles de los bordes izquierdo y superior y a `margen_final` de los
+    bordes derecho e inferior: con el mundo de 480 x 380, el rectángulo
+    [50, 450] x [50, 350] de la versión original.
+    """
+    def __init__(self, agua, ancho, alto, margen=50, escala=1, margen_final=30):
+        if len(agua) != ancho * alto:
+            raise ValueError(f"La máscara tiene {len(agua)} píxeles y se esperaban {ancho} x {alto}")
+        self.ancho = ancho
+        self.alto = alto
+        self.margen = margen
+        self.margen_final = margen_final
+        self.escala = escala
+        self._inverso_escala = 1 / escala
+        # Tamaño del mundo en unidades de la simulación
+        self.ancho_mundo = ancho * escala
+        self.alto_mundo = alto * escala
+        self.agua = agua if isinstance(agua, bytes) else bytes(1 if a else 0 for a in agua)
+        self._ultima_columna = ancho - 1
+        self._ultima_fila = alto - 1
+
+        # Arrays de enteros y no listas: en mapas grandes ocupan 8 bytes por píxel
+        self.indices_agua = array.array("q", itertools.compress(range(len(self.agua)), self.agua))
+        self.indices_tierra = array.array("q", (
+            fila * ancho + columna
+            for fila in range(margen, min(alto, alto - margen_final + 1))
+            for columna in range(margen, min(ancho, ancho - margen_final + 1))
+            if not self.agua[fila * ancho + columna]
+        ))
+        if not self.indices_tierra:
+            # Mapas pequeños: sin margen
+            self.indices_tierra = array.array("q", (i for i, a in enumerate(self.agua) if not a))
+
+    # --- Construcción ---
+    @classmethod
+    def lago_ovalado(cls, x_inicio, y_inicio, x_fin, y_fin, ancho=480, alto=380, margen=50, escala=1,
+                     margen_final=30):
+        """Un lago elíptico inscrito en el rectángulo dado (un píxel es agua si lo es su centro).
+
+        Las coordenadas y el tamaño del mundo están en unidades del mundo.
+        """
+        columnas = math.ceil(ancho / escala)
+        filas = math.ceil(alto / escala)
+        agua = bytearray(columnas * filas)
+        _pintar_elipse(agua, columnas, filas, (x_inicio + x_fin) / 2 / escala, (y_inicio + y_fin) / 2 / escala,
+                       (x_fin - x_inicio) / 2 / escala, (y_fin - y_inicio) / 2 / escala)
+        return cls(bytes(agua), columnas, filas, margen, escala, margen_final)
+
+    @classmethod
+    def lagos_aleatorios(cls, n, ancho, alto, semilla=None, radio_min=20, radio_max=120, margen=50, escala=1,
+                          margen_final=30):
+        """`n` lagos elípticos con centros y semiejes (entre radio_min y radio_max) al azar."""
+        rng = random.Random(semilla)
+        columnas = math.ceil(ancho / escala)
+        filas = math.ceil(alto / escala)
+        agua = bytearray(columnas * filas)
+        for _ in range(n):
+            _pintar_elipse(agua, columnas, filas, rng.uniform(0, ancho) / escala, rng.uniform(0, alto) / escala,
+                           rng.uniform(radio_min, radio_max) / escala, rng.uniform(radio_min, radio_max) / escala)
+        return cls(bytes(agua), columnas, filas, margen, escala, margen_final)
+
+    @classmethod
+    def desde_mascara(cls, mascara, margen=50, escala=1, margen_final=30):
+        """Máscara por filas (listas o arreglo 2D de NumPy) con valores verdaderos en el agua."""
+        if hasattr(mascara, "tolist"):
+            mascara = mascara.tolist()
+        filas = [list(fila) for fila in mascara]
+        ancho = len(filas[0]) if filas else 0
+        if any(len(fila) != ancho for fila in filas):
+            raise ValueError("Todas las filas de la máscara deben tener la misma longitud")
+        return cls([a for fila in filas for a in fila], ancho, len(filas), margen, escala, margen_final)
+
+    @classmethod
+    def desde_png(cls, ruta, margen=50, escala=1, margen_final=30):
+        """Imagen en la que el agua son los píxeles más azules que rojos y verdes (requiere Pillow)."""
+        from PIL import Image
+
+        with Image.open(ruta) as imagen:
+            imagen = imagen.convert("RGB")
+            ancho, alto = imagen.size
+            agua = [b > r and b > g for r, g, b in imagen.getdata()]
+        return cls(agua, ancho, alto, margen, escala, margen_final)
+
+    # --- Consultas ---
+    def es_agua(self, x, y):
+        """Verdadero si el píxel de (x, y) es agua; fuera del mapa vale el píxel del borde."""
+        columna = int(x * self._inverso_escala)
+        fila = int(y * self._inverso_escala)
+        if columna < 0:
+            columna = 0
+        elif columna > self._ultima_columna:
+            columna = self._ultima_columna
+        if fila < 0:
+            fila = 0
+        elif fila > self._ultima_fila:
+            fila = self._ultima_fila
+        return self.agua[fila * self.ancho + columna] == 1
+
+    def posicion_tierra(self, rng=random):
+        """Posición en tierra firme: el píxel (entero) con escala 1, o un punto dentro de él."""
+        i = self.indices_tierra[int(rng.random() * len(self.indices_tierra))]
+        if self.escala == 1:
+            return i % self.ancho, i // self.ancho
+        return (i % self.ancho + rng.random()) * self.escala, (i // self.ancho + rng.random()) * self.escala
+
+    def posicion_agua(self, rng=random):
+        """Posición en el agua, uniforme dentro de un píxel de agua al azar."""
+        i = self.indices_agua[int(rng.random() * len(self.indices_agua))]
+        return (i % self.ancho + rng.random()) * self.escala, (i // self.ancho + rng.random()) * self.escala
@@ -0,0 +1,37 @@
+import pytest
+
+from barrido import (
+    barrer, combinaciones_aleatorias, combinaciones_rejilla, leer_rangos, leer_rejilla, leer_semillas, resumir,
+    simular,
+)
+
+def test_leer_argumentos():
+    assert leer_rejilla(["max_herbivoros=20,40", "max_carnivoros=10"]) == {"max_herbivoros": [20, 40],
+                                                                            "max_carnivoros": [10]}
+    assert leer_rangos(["max_herbivoros=20:60"]) == {"max_herbivoros": (20, 60)}
+    assert leer_semillas("1,3-5,9") == [1, 3, 4, 5, 9]
+
+def test_combinaciones():
+    rejilla = combinaciones_rejilla({"max_herbivoros": [20, 40], "max_carnivoros": [10, 15, 20]})
+    assert len(rejilla) == 6 and {"max_herbivoros": 40, "max_carnivoros": 15} in rejilla
+    muestra = combinaciones_aleatorias({"max_herbivoros": (20, 60)}, 8, semilla=1)
+    assert muestra == combinaciones_aleatorias({"max_herbivoros": (20, 60)}, 8, semilla=1)
+    assert all(20 <= c["max_herbivoros"] <= 60 for c in muestra)
+    with pytest.raises(ValueError):
+        combinaciones_rejilla({"terreno": [1]})
+
+def _clave(resultado):
+    return resultado["parametros"]["max_herbivoros"], resultado["semilla"]
+
+def test_barrer_en_procesos_como_en_serie():
+    combinaciones = combinaciones_rejilla({"max_herbivoros": [10, 40]})
+    semillas = [1, 2]
+    en_serie = [simular(cambios, semilla, 150) for cambios in combinaciones for semilla in semillas]
+    en_procesos = list(barrer(combinaciones, semillas, 150, procesos=2))
+
+    # Los resultados llegan según terminan
+    assert sorted(en_procesos, key=_clave) == sorted(en_serie, key=_clave)
+    assert all(r["final"]["herbivoros"] <= r["parametros"]["max_herbivoros"] for r in en_serie)
+
+    filas = {fila["max_herbivoros"]: fila for fila in resumir(en_procesos)}
+    assert filas.keys() == {10, 40} and all(fila["ejecuciones"] == 2 for fila in filas.values())
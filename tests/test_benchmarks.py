@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from benchmarks import _ecosistema, _medida, comparar, ejecutar_todo
+
+@pytest.mark.parametrize("motor, plantas", [("objetos", "objetos"), ("numpy", "objetos"), ("objetos", "campo")])
+def test_ejecutar_todo_da_todas_las_medidas(motor, plantas):
+    resultados = ejecutar_todo((300,), 10, motor, plantas)
+    assert json.loads(json.dumps(resultados)) == resultados
+    assert resultados["meta"]["motor"] == motor
+    medidas = resultados["resultados"]
+    for nombre in ("is_in_lake", "turnos_s/plantas=300", "turno_ms_p50/plantas=300", "turno_ms_p90/plantas=300",
+                   "memoria_pico_mb/plantas=300", "busqueda_comida_us/plantas=300"):
+        assert medidas[nombre]["valor"] > 0
+    assert medidas["turnos_s/plantas=300"]["mayor_es_mejor"]
+
+def test_el_escenario_es_fijo_y_mantiene_las_plantas():
+    a, b = _ecosistema(500), _ecosistema(500)
+    for _ in range(30):
+        a.simular_turno()
+        b.simular_turno()
+    assert a.conteos() == b.conteos()
+    # Con la dispersión activada las plantas se reponen hasta el nivel pedido
+    assert a.conteos()["plantas"] > 450
+
+def test_comparar_orienta_la_mejora():
+    base = {"resultados": {"turnos_s": _medida(100, "turnos/s", True), "turno_ms": _medida(10, "ms"),
+                           "solo_en_base": _medida(1, "ms")}}
+    nuevo = {"resultados": {"turnos_s": _medida(200, "turnos/s", True), "turno_ms": _medida(20, "ms"),
+                            "pintado_ms": _medida(3, "ms")}}
+    assert comparar(base, nuevo) == [("turnos_s", 100, 200, 2.0), ("turno_ms", 10, 20, 0.5)]
@@ -0,0 +1,61 @@
+import random
+from dataclasses import replace
+
+import pytest
+
+from dinos import CONFIG_POR_DEFECTO, Carnivoro, Herbivoro, Omnivoro, Pez, crear_ecosistema, poblar_inicial
+from estadisticas import ANCHO_EDAD, CASILLAS_EDAD, Momentos
+
+def _media_varianza(valores):
+    media = sum(valores) / len(valores)
+    return media, sum((v - media) ** 2 for v in valores) / len(valores)
+
+def test_momentos_como_recalcular():
+    rng = random.Random(2)
+    momentos, valores = Momentos(), []
+    for _ in range(2000):
+        accion = rng.random()
+        if accion < 0.4 or not valores:
+            valores.append(rng.uniform(0, 1200))
+            momentos.agregar(valores[-1])
+        elif accion < 0.6:
+            momentos.quitar(valores.pop(rng.randrange(len(valores))))
+        else:
+            i = rng.randrange(len(valores))
+            antes, valores[i] = valores[i], valores[i] + rng.uniform(-400, 100)
+            momentos.cambiar(antes, valores[i])
+        assert momentos.n == len(valores)
+    assert (momentos.media, momentos.varianza) == pytest.approx(_media_varianza(valores))
+
+    otros = [rng.uniform(0, 1200) for _ in range(300)]
+    otro = Momentos()
+    for v in otros:
+        otro.agregar(v)
+    momentos.combinar(otro)
+    assert (momentos.n, momentos.media, momentos.varianza) == pytest.approx(
+        (len(valores) + 300, *_media_varianza(valores + otros)))
+
+@pytest.mark.parametrize("dispersion_plantas", [False, True])
+def test_estadisticas_como_recorrer_las_entidades(dispersion_plantas):
+    # Con dispersión hay más nacimientos y muertes, y más entidades reutilizadas de la reserva
+    config = replace(CONFIG_POR_DEFECTO, dispersion_plantas=dispersion_plantas, max_plantas=600)
+    ecosistema = crear_ecosistema("objetos", 4, config)
+    poblar_inicial(ecosistema)
+    estadisticas = ecosistema.estadisticas
+    # Más de ANCHO_EDAD turnos para que algunas edades cambien de casilla
+    for turno in range(1, 1251):
+        ecosistema.simular_turno()
+        if turno % 250:
+            continue
+        assert estadisticas.poblacion == ecosistema.conteos()
+        for cls in (Herbivoro, Carnivoro, Omnivoro, Pez):
+            animales = list(ecosistema.rejillas[cls])
+            momentos = estadisticas.vida[cls.nombre]
+            assert momentos.n == len(animales)
+            if animales:
+                assert (momentos.media, momentos.varianza) == pytest.approx(
+                    _media_varianza([e.vida for e in animales]), rel=1e-6, abs=1e-3)
+            edades = [0] * CASILLAS_EDAD
+            for e in animales:
+                edades[min((turno - e.nacimiento) // ANCHO_EDAD, CASILLAS_EDAD - 1)] += 1
+            assert estadisticas.edades[cls.nombre] == edades
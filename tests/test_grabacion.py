@@ -0,0 +1,47 @@
+from dinos import crear_ecosistema, poblar_inicial
+from grabacion import Grabacion, Grabador
+from tramas import EstadoRemoto
+
+def _grabar(ruta, turnos, cada_clave):
+    ecosistema = crear_ecosistema("objetos", 11)
+    poblar_inicial(ecosistema)
+    grabador = Grabador(ruta, cada_clave)
+    grabador.registrar(ecosistema)
+    # Lo que se ha grabado de cada turno: {clase: {ident: (x, y, vida)}}
+    grabados = [grabador.seguidor.estado]
+    for _ in range(turnos):
+        ecosistema.simular_turno()
+        grabador.registrar(ecosistema)
+        grabados.append(grabador.seguidor.estado)
+    grabador.cerrar()
+    return grabados
+
+def _estado(estado):
+    return estado.turno, estado.conteos, {cls: dict(entidades) for cls, entidades in estado.entidades.items()}
+
+def test_buscar_un_turno_como_reproducir_hasta_el(tmp_path):
+    ruta = str(tmp_path / "ejecucion.grb")
+    grabados = _grabar(ruta, 300, cada_clave=50)
+    grabacion = Grabacion(ruta)
+    try:
+        assert len(grabacion) == 301 and grabacion.claves == list(range(0, 301, 50))
+
+        # Reproducción de principio a fin: cada turno tiene las entidades grabadas
+        seguido = EstadoRemoto()
+        estados = []
+        for i in range(len(grabacion)):
+            grabacion.aplicar(seguido, i)
+            assert seguido.turno == i
+            assert seguido.entidades == grabados[i]
+            assert seguido.conteos == {cls.nombre: len(e) for cls, e in grabados[i].items()}
+            estados.append(_estado(seguido))
+
+        # Saltos hacia delante y hacia atrás, dentro de un tramo entre claves y cruzando claves
+        estado, actual = EstadoRemoto(), -1
+        for i in (0, 37, 49, 50, 51, 173, 120, 299, 300, 3, 251, 250):
+            grabacion.ir_a(estado, actual, i)
+            actual = i
+            assert _estado(estado) == estados[i]
+            assert grabacion.series(i, 10)["herbivoros"] == [estados[j][1]["herbivoros"] for j in range(max(0, i - 9), i + 1)]
+    finally:
+        grabacion.cerrar()
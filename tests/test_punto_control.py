@@ -0,0 +1,46 @@
+import pytest
+
+from dinos import crear_ecosistema, poblar_inicial
+from punto_control import GuardadoPeriodico, cargar, guardar
+
+def _conteos(ecosistema, turnos):
+    serie = []
+    for _ in range(turnos):
+        ecosistema.simular_turno()
+        serie.append(ecosistema.conteos())
+    return serie
+
+@pytest.mark.parametrize("motor, plantas", [("objetos", "objetos"), ("objetos", "campo"), ("numpy", "objetos"),
+                                            ("fases", "objetos")])
+def test_reanudar_como_sin_parar(tmp_path, motor, plantas):
+    ruta = str(tmp_path / "punto.dinos")
+    continua = crear_ecosistema(motor, 7, plantas=plantas)
+    poblar_inicial(continua)
+    esperada = _conteos(continua, 400)
+
+    ecosistema = crear_ecosistema(motor, 7, plantas=plantas)
+    poblar_inicial(ecosistema)
+    assert _conteos(ecosistema, 150) == esperada[:150]
+    guardar(ecosistema, ruta)
+    reanudado = cargar(ruta)
+    assert (reanudado.motor, reanudado.turno) == (motor, 150)
+    assert _conteos(reanudado, 250) == esperada[150:]
+    assert dict(reanudado.estadisticas.poblacion) == dict(continua.estadisticas.poblacion)
+
+def test_guardar_cada_n_turnos_no_cambia_la_trayectoria(tmp_path):
+    ruta = str(tmp_path / "punto.dinos")
+    sin_guardar = crear_ecosistema("objetos", 3)
+    poblar_inicial(sin_guardar)
+    esperada = _conteos(sin_guardar, 300)
+
+    ecosistema = crear_ecosistema("objetos", 3)
+    poblar_inicial(ecosistema)
+    guardado = GuardadoPeriodico(ruta, cada=50)
+    serie = []
+    for _ in range(300):
+        ecosistema.simular_turno()
+        guardado.tras_turno(ecosistema)
+        serie.append(ecosistema.conteos())
+    guardado.cerrar(ecosistema)
+    assert serie == esperada
+    assert cargar(ruta).turno == 300
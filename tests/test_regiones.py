@@ -0,0 +1,68 @@
+from dinos import CONFIG_POR_DEFECTO, GeneradorAleatorio, Herbivoro, Omnivoro, poblar_inicial
+from regiones import EcosistemaRegiones, Particion, Region, _empaquetar, config_para, terreno_para
+
+CUOTAS = dict.fromkeys(("plantas", "herbivoros", "carnivoros", "omnivoros", "peces"), 0)
+
+def test_reproducirse_con_un_fantasma_y_morir():
+    # Región 0 de dos columnas (x < 240); el fantasma es de la región 1, a menos de 28 de la local
+    region = Region(0, Particion(480, 380, 1, 2), CONFIG_POR_DEFECTO, 1)
+    rng = GeneradorAleatorio(1)
+    local = Herbivoro(230, 40, rng)
+    # Menos vida que el coste de reproducirse: muere al pagarlo
+    local.vida = CONFIG_POR_DEFECTO.herbivoro_repro_coste - 100
+    region.ecosistema.agregar(local)
+    fantasma = Herbivoro(245, 40, rng)
+
+    region.turno([], [(1, [_empaquetar(fantasma)])], {}, CUOTAS, 0)
+
+    assert not local.viva
+    estadisticas = region.ecosistema.estadisticas
+    assert estadisticas.poblacion["herbivoros"] == 0
+    assert estadisticas.vida["herbivoros"].n == 0
+
+def test_los_omnivoros_sin_cuota_no_nacen():
+    region = Region(0, Particion(480, 380, 1, 2), CONFIG_POR_DEFECTO, 1)
+    rng = GeneradorAleatorio(1)
+    padres = [Omnivoro(100, 100, rng), Omnivoro(110, 100, rng)]
+    # Herbívoros de sobra, lejos de los omnívoros: su regla local admitiría las crías
+    for i in range(4):
+        region.ecosistema.agregar(Herbivoro(20 + 10 * i, 300, rng))
+    for e in padres:
+        region.ecosistema.agregar(e)
+
+    region.turno([], [], {}, CUOTAS, 0)
+
+    assert all(e.fin_repro for e in padres)
+    eventos = region.ecosistema.estadisticas.eventos
+    assert eventos["nacimientos"]["omnivoros"] == 0
+    assert eventos["muertes"]["omnivoros"] == 0
+    assert region.ecosistema.estadisticas.poblacion["omnivoros"] == 2
+
+def _mundo(turnos, semilla=1, procesos=False, tiles=(2, 2)):
+    """Conteos de cada turno de un mundo de 960 x 760 (el doble del normal) por regiones."""
+    config = config_para(terreno_para(960, 760, 4, semilla))
+    ecosistema = EcosistemaRegiones(config, semilla, *tiles, procesos=procesos)
+    try:
+        poblar_inicial(ecosistema)
+        serie = []
+        for _ in range(turnos):
+            ecosistema.simular_turno()
+            serie.append(ecosistema.conteos())
+        return config, ecosistema.estadisticas, serie
+    finally:
+        ecosistema.cerrar()
+
+def test_mundo_por_regiones_es_determinista_y_respeta_los_limites():
+    config, estadisticas, serie = _mundo(300)
+    assert config.max_omnivoros == 0
+    assert _mundo(300)[2] == serie
+    for conteos in serie:
+        assert conteos["plantas"] <= config.max_plantas
+        assert conteos["herbivoros"] <= config.max_herbivoros
+        assert conteos["carnivoros"] <= config.max_carnivoros
+        assert conteos["omnivoros"] <= config.max_herbivoros
+        assert conteos["peces"] <= config.max_peces
+    assert dict(estadisticas.poblacion) == serie[-1]
+
+def test_regiones_en_procesos_como_en_serie():
+    assert _mundo(40, procesos=True, tiles=(1, 2))[2] == _mundo(40, tiles=(1, 2))[2]
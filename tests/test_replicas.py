@@ -0,0 +1,52 @@
+import numpy as np
+
+from dinos import CONFIG_POR_DEFECTO, Carnivoro, Herbivoro, Omnivoro
+from replicas import EcosistemaReplicas, IndiceReplicas, Lote
+
+def _series(replicas=20, turnos=300, semilla=5):
+    ecosistema = EcosistemaReplicas(replicas, semilla)
+    ecosistema.poblar()
+    return ecosistema.simular(turnos)
+
+def test_replicas_deterministas_y_dentro_de_los_limites():
+    series = _series()
+    assert len(series) == 20
+    for serie, otra in zip(series, _series()):
+        np.testing.assert_array_equal(serie, otra)
+
+    config = CONFIG_POR_DEFECTO
+    maximos = (config.max_plantas, config.max_herbivoros, config.max_carnivoros, config.max_herbivoros,
+               config.max_peces)
+    iniciales = (config.plantas_iniciales, config.herbivoros_iniciales, config.carnivoros_iniciales,
+                 config.omnivoros_iniciales, config.peces_iniciales)
+    for serie in series:
+        assert tuple(serie[0]) == iniciales
+        assert (serie <= maximos).all()
+
+def test_una_replica_sin_animales_terrestres_termina():
+    ecosistema = EcosistemaReplicas(3, 5)
+    ecosistema.poblar()
+    for cls in (Herbivoro, Carnivoro, Omnivoro):
+        ecosistema.lotes[cls].viva[1] = False
+    series = ecosistema.simular(10)
+    assert ecosistema.ids.tolist() == [0, 2]
+    assert len(series[1]) == 2 and series[1][-1, 1:4].sum() == 0
+    assert len(series[0]) == len(series[2]) == 11
+
+def test_indice_replicas_como_fuerza_bruta():
+    rng = np.random.default_rng(0)
+    lote = Lote(3, 480, 380, capacidad=60)
+    lote.x[:] = rng.uniform(0, 480, lote.x.shape)
+    lote.y[:] = rng.uniform(0, 380, lote.y.shape)
+    lote.viva[:] = rng.random(lote.viva.shape) < 0.7
+    r = rng.integers(3, size=40)
+    ax, ay = rng.uniform(0, 480, 40), rng.uniform(0, 380, 40)
+
+    viva = lote.viva.ravel()
+    fila = np.repeat(np.arange(3), 60)
+    d2 = (ax[:, None] - lote.x.ravel()) ** 2 + (ay[:, None] - lote.y.ravel()) ** 2
+    esperados = {(a, b) for a, b in zip(*np.nonzero((d2 < 28 * 28) & viva & (fila == r[:, None])))}
+    for tam in (10, 20, 40):
+        a, b = IndiceReplicas(lote, tam).pares(r, ax, ay, 28)
+        assert set(zip(a.tolist(), b.tolist())) == esperados
+        assert (np.diff(a) >= 0).all()
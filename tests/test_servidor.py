@@ -0,0 +1,65 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from dinos import crear_ecosistema, poblar_inicial
+from servidor import Servidor
+from tramas import (
+    CABECERA, CLAVE, DELTA, EstadoRemoto, Receptor, Seguidor, codificar_saludo, conectar, decodificar_saludo,
+)
+
+def _ecosistema(motor="objetos", plantas="objetos"):
+    ecosistema = crear_ecosistema(motor, 9, plantas=plantas)
+    poblar_inicial(ecosistema)
+    return ecosistema
+
+def test_saludo_con_la_configuracion_y_el_terreno():
+    ecosistema = _ecosistema()
+    config, _ = decodificar_saludo(codificar_saludo(ecosistema)[CABECERA.size:])
+    assert config.terreno.agua == ecosistema.config.terreno.agua
+    assert config.terreno.ancho_mundo == ecosistema.config.terreno.ancho_mundo
+    assert config.max_plantas == ecosistema.config.max_plantas
+
+@pytest.mark.parametrize("motor, plantas", [("objetos", "objetos"), ("objetos", "campo"), ("numpy", "objetos")])
+def test_deltas_y_claves_reconstruyen_el_estado(motor, plantas):
+    ecosistema = _ecosistema(motor, plantas)
+    seguidor = Seguidor()
+    desde_el_principio = EstadoRemoto()
+    tarde = EstadoRemoto()
+    for turno in range(200):
+        trama = seguidor.trama(ecosistema)
+        clave, delta = trama.clave()[CABECERA.size:], trama.delta[CABECERA.size:]
+        desde_el_principio.aplicar(*((CLAVE, clave) if turno == 0 else (DELTA, delta)))
+        # Un visor que llega a mitad de la ejecución empieza con una clave y sigue con las deltas
+        if turno >= 120:
+            tarde.aplicar(*((CLAVE, clave) if turno == 120 else (DELTA, delta)))
+            assert tarde.entidades == trama.estado
+        assert desde_el_principio.entidades == trama.estado
+        assert desde_el_principio.conteos == ecosistema.conteos()
+        ecosistema.simular_turno()
+
+def test_un_visor_recibe_el_ultimo_turno(tmp_path):
+    ruta = str(tmp_path / "dinos.sock")
+    servidor = Servidor(_ecosistema(), velocidad=10, max_turnos=100)
+    hilo = threading.Thread(target=asyncio.run, args=(servidor.servir(unix=ruta),))
+    hilo.start()
+    try:
+        limite = time.monotonic() + 10
+        while not os.path.exists(ruta) and time.monotonic() < limite:
+            time.sleep(0.01)
+        receptor = Receptor(conectar(unix=ruta))
+        receptor.iniciar()
+        # El servidor cierra los visores al llegar a max_turnos
+        limite = time.monotonic() + 30
+        while receptor.conectado and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert not receptor.conectado
+        assert receptor.estado.turno == 100
+        assert receptor.estado.entidades == servidor.ultima.estado
+        assert receptor.config.max_plantas == servidor.ecosistema.config.max_plantas
+    finally:
+        servidor.simulador.detener()
+        hilo.join(timeout=30)
@@ -0,0 +1,296 @@
+"""Tramas binarias con el estado del ecosistema para visores fuera del proceso.
+
+Cada mensaje va precedido de su longitud (uint32) y de un byte de tipo:
+
+- SALUDO: cabecera JSON (configuración, turnos máximos y dimensiones del
+  terreno) y la máscara de agua comprimida con zlib; se envía una vez al
+  conectar.
+- CLAVE: el estado completo de un turno.
+- DELTA: solo las entidades que han cambiado respecto a la trama anterior.
+
+CLAVE y DELTA comparten formato: turno y conteos por especie (uint32) y, por
+cada especie en el orden de ESPECIES, el número de entidades quitadas y
+cambiadas seguido de columnas con sus identificadores (uint32) y de las de x,
+y y vida de las cambiadas (uint16). Una clave es una delta sin quitadas sobre
+un estado vacío. Todo va en little-endian.
+
+Los identificadores son estables mientras la entidad vive: el Seguidor los
+asigna por objeto y turno de nacimiento en el motor de objetos (las plantas,
+por objeto y posición), ya que el ecosistema reutiliza los objetos de las
+entidades muertas; por casilla con el campo de plantas y a partir de
+Poblacion.ident en el motor numpy.
+"""
+import collections
+import json
+import socket
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from dataclasses import dataclass, field, fields, replace
+
+from dinos import (
+    CONFIG_POR_DEFECTO, MAX_TURNS,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez, Ecosistema,
+)
+from simulador import Instantanea, TURNOS_SERIES
+from terreno import Terreno
+
+SALUDO, CLAVE, DELTA = b"S", b"K", b"D"
+ESPECIES = (Planta, Herbivoro, Carnivoro, Omnivoro, Pez)
+NOMBRES = ("plantas", "herbivoros", "carnivoros", "omnivoros", "peces")
+CABECERA = struct.Struct("<IB")
+CONTEOS = struct.Struct("<6I")
+SECCION = struct.Struct("<II")
+MAXIMO_U16 = 0xFFFF
+
+def _columna(tipo, valores):
+    a = array(tipo, valores)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+def _leer_columna(tipo, datos, desde, n):
+    a = array(tipo)
+    a.frombytes(datos[desde:desde + n * a.itemsize])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a, desde + n * a.itemsize
+
+def _u16(valor):
+    return max(0, min(MAXIMO_U16, int(valor)))
+
+def mensaje(tipo, carga):
+    """Mensaje listo para escribir en el socket: longitud, tipo y carga."""
+    return CABECERA.pack(len(carga) + 1, tipo[0]) + carga
+
+# --- Saludo ---
+def codificar_saludo(ecosistema):
+    config = ecosistema.config
+    terreno = config.terreno
+    cabecera = {
+        "version": 1,
+        "turnos_max": MAX_TURNS,
+        "config": {campo.name: getattr(config, campo.name) for campo in fields(config) if campo.type in (int, bool)},
+        "terreno": {"ancho": terreno.ancho, "alto": terreno.alto, "margen": terreno.margen,
+                    "margen_final": terreno.margen_final,
+                    "escala": terreno.escala},
+    }
+    texto = json.dumps(cabecera).encode()
+    return mensaje(SALUDO, struct.pack("<I", len(texto)) + texto + zlib.compress(terreno.agua))
+
+def decodificar_saludo(carga):
+    """(configuración con su terreno, turnos máximos) de la carga de un SALUDO."""
+    (longitud,) = struct.unpack_from("<I", carga)
+    cabecera = json.loads(bytes(carga[4:4 + longitud]))
+    t = cabecera["terreno"]
+    agua = zlib.decompress(carga[4 + longitud:])
+    terreno = Terreno(agua, t["ancho"], t["alto"], t["margen"], t["escala"], t["margen_final"])
+    return replace(CONFIG_POR_DEFECTO, terreno=terreno, **cabecera["config"]), cabecera["turnos_max"]
+
+# --- Estado y deltas ---
+# Especies que no se mueven ni cambian de vida: de una trama a otra solo aparecen o desaparecen
+ESTATICAS = (Planta,)
+
+def _registro_objeto(e):
+    return _u16(e.posicion_x), _u16(e.posicion_y), _u16(e.vida)
+
+def _registro_punto(punto):
+    x, y, vida = punto
+    return _u16(x), _u16(y), _u16(vida)
+
+def _fuentes(ecosistema):
+    """{clase: (pares (clave estable, fuente), registro)}; registro(fuente) da (x, y, vida) como uint16.
+
+    El registro se calcula solo cuando hace falta, así que las especies
+    ESTATICAS no cuestan más que recorrer sus claves.
+    """
+    if isinstance(ecosistema, Ecosistema):
+        # Un objeto reutilizado para otro nacimiento cambia de clave (Ecosistema.nacer)
+        fuentes = {
+            cls: ((((e, e.nacimiento), e) for e in rejilla), _registro_objeto)
+            for cls, rejilla in ecosistema.rejillas.items() if cls is not Planta
+        }
+        if ecosistema.campo is None:
+            plantas = ecosistema.rejillas[Planta]
+            fuentes[Planta] = ((((e, e.posicion_x, e.posicion_y), e) for e in plantas), _registro_objeto)
+        else:
+            fuentes[Planta] = ((((x, y), (x, y, vida)) for x, y, vida in ecosistema.campo.puntos()), _registro_punto)
+        return fuentes
+    fuentes = {}
+    for cls, p in ecosistema.poblaciones.items():
+        puntos = list(zip(p.x.tolist(), p.y.tolist(), p.vida.tolist()))
+        fuentes[cls] = (zip(p.ident.tolist(), puntos), _registro_punto)
+    return fuentes
+
+def _seccion(quitados, cambiados):
+    partes = [SECCION.pack(len(quitados), len(cambiados)), _columna("I", quitados),
+              _columna("I", [i for i, _ in cambiados])]
+    for k in range(3):
+        partes.append(_columna("H", [r[k] for _, r in cambiados]))
+    return b"".join(partes)
+
+@dataclass
+class Trama:
+    """Un turno ya codificado como delta; la clave se codifica solo si algún visor la pide."""
+    turno: int
+    conteos: tuple
+    estado: dict  # {clase: {ident: (x, y, vida)}}; no se modifica después de crearse
+    delta: bytes
+    _clave: bytes = field(default=None, init=False, repr=False)
+
+    def clave(self):
+        if self._clave is None:
+            cuerpo = [CONTEOS.pack(self.turno, *self.conteos)]
+            cuerpo += [_seccion((), list(self.estado[cls].items())) for cls in ESPECIES]
+            self._clave = mensaje(CLAVE, b"".join(cuerpo))
+        return self._clave
+
+class Seguidor:
+    """Da identificadores estables a las entidades y calcula la delta de cada trama respecto a la anterior."""
+    def __init__(self):
+        self.ids = {cls: {} for cls in ESPECIES}
+        self.estado = {cls: {} for cls in ESPECIES}
+        self._siguiente = {cls: 0 for cls in ESPECIES}
+
+    def trama(self, ecosistema):
+        """Trama del turno actual (llamar entre turnos, en el hilo de la simulación)."""
+        fuentes = _fuentes(ecosistema)
+        conteos = ecosistema.conteos()
+        cuerpo = [CONTEOS.pack(ecosistema.turno, *(conteos[nombre] for nombre in NOMBRES))]
+        estado = {}
+        for cls in ESPECIES:
+            pares, calcular = fuentes.get(cls, ((), None))
+            estatica = cls in ESTATICAS
+            anterior = self.estado[cls]
+            ids = self.ids[cls]
+            siguiente = self._siguiente[cls]
+            nuevos_ids = {}
+            nuevo = {}
+            cambiados = []
+            for clave, fuente in pares:
+                ident = ids.get(clave)
+                if ident is None:
+                    ident = siguiente
+                    siguiente += 1
+                    registro = calcular(fuente)
+                    cambiados.append((ident, registro))
+                elif estatica:
+                    registro = anterior[ident]
+                else:
+                    registro = calcular(fuente)
+                    if anterior[ident] != registro:
+                        cambiados.append((ident, registro))
+                nuevos_ids[clave] = ident
+                nuevo[ident] = registro
+            # Si no falta ninguna de las anteriores no hace falta buscar las quitadas
+            nacidas = siguiente - self._siguiente[cls]
+            quitados = [ident for ident in anterior if ident not in nuevo] if len(anterior) + nacidas != len(nuevo) else []
+            self.ids[cls] = nuevos_ids
+            estado[cls] = nuevo
+            self._siguiente[cls] = siguiente
+            cuerpo.append(_seccion(quitados, cambiados))
+        self.estado = estado
+        return Trama(ecosistema.turno, tuple(conteos[nombre] for nombre in NOMBRES), estado,
+                     mensaje(DELTA, b"".join(cuerpo)))
+
+# --- Lado del visor ---
+class EstadoRemoto:
+    """Estado reconstruido a partir de las tramas recibidas (las deltas anteriores a la primera clave se ignoran)."""
+    def __init__(self):
+        self.turno = 0
+        self.conteos = dict.fromkeys(NOMBRES, 0)
+        self.entidades = {cls: {} for cls in ESPECIES}
+        self.sincronizado = False
+
+    def aplicar(self, tipo, carga):
+        """Aplica una CLAVE o DELTA; devuelve False si se ha ignorado."""
+        if tipo == CLAVE:
+            self.entidades = {cls: {} for cls in ESPECIES}
+            self.sincronizado = True
+        elif tipo != DELTA or not self.sincronizado:
+            return False
+        turno, *conteos = CONTEOS.unpack_from(carga)
+        desde = CONTEOS.size
+        for cls in ESPECIES:
+            n_quitados, n_cambiados = SECCION.unpack_from(carga, desde)
+            desde += SECCION.size
+            quitados, desde = _leer_columna("I", carga, desde, n_quitados)
+            ids, desde = _leer_columna("I", carga, desde, n_cambiados)
+            xs, desde = _leer_columna("H", carga, desde, n_cambiados)
+            ys, desde = _leer_columna("H", carga, desde, n_cambiados)
+            vidas, desde = _leer_columna("H", carga, desde, n_cambiados)
+            entidades = self.entidades[cls]
+            for ident in quitados:
+                entidades.pop(ident, None)
+            entidades.update(zip(ids, zip(xs, ys, vidas)))
+        self.turno = turno
+        self.conteos = dict(zip(NOMBRES, conteos))
+        return True
+
+    def estado_por_especie(self):
+        """{clase: [(x, y, vida), ...]}, como Ecosistema.estado_por_especie()."""
+        return {cls: list(entidades.values()) for cls, entidades in self.entidades.items()}
+
+def leer_mensaje(archivo):
+    """(tipo, carga) del siguiente mensaje de un archivo o socket.makefile("rb"); None al cerrarse."""
+    cabecera = archivo.read(CABECERA.size)
+    if len(cabecera) < CABECERA.size:
+        return None
+    longitud, tipo = CABECERA.unpack(cabecera)
+    carga = archivo.read(longitud - 1)
+    if len(carga) < longitud - 1:
+        return None
+    return bytes((tipo,)), carga
+
+def conectar(host="127.0.0.1", puerto=8765, unix=None):
+    """Archivo de lectura conectado a un servidor (servidor.py) por TCP o por un socket Unix."""
+    if unix:
+        conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexion.connect(unix)
+    else:
+        conexion = socket.create_connection((host, puerto))
+    return conexion.makefile("rb")
+
+class Receptor:
+    """Lee las tramas de `archivo` en un hilo y publica una Instantanea tras cada una, como un Simulador.
+
+    El SALUDO se lee al construirlo, así que `config` y `turnos_max` ya están
+    disponibles para preparar la vista antes de iniciar().
+    """
+    def __init__(self, archivo):
+        self.archivo = archivo
+        primero = leer_mensaje(archivo)
+        if primero is None or primero[0] != SALUDO:
+            raise ValueError("El servidor no ha enviado un saludo de ecosistema")
+        self.config, self.turnos_max = decodificar_saludo(primero[1])
+        self.estado = EstadoRemoto()
+        self.series = {nombre: collections.deque(maxlen=TURNOS_SERIES) for nombre in NOMBRES}
+        self.instantanea = Instantanea(0, dict(self.estado.conteos), {}, {})
+        self.conectado = True
+        self._hilo = threading.Thread(target=self._bucle, name="receptor", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self.archivo.close()
+
+    def _bucle(self):
+        try:
+            while True:
+                leido = leer_mensaje(self.archivo)
+                if leido is None:
+                    break
+                if not self.estado.aplicar(*leido):
+                    continue
+                for nombre, valor in self.estado.conteos.items():
+                    self.series[nombre].append(valor)
+                self.instantanea = Instantanea(self.estado.turno, self.estado.conteos,
+                                               self.estado.estado_por_especie(),
+                                               {nombre: list(valores) for nombre, valores in self.series.items()})
+        except (OSError, ValueError):
+            # Conexión cerrada desde detener() o por el servidor
+            pass
+        self.conectado = False
@@ -0,0 +1,594 @@
+import time
+
+import wx
+
+from dinos import (
+    CONFIG_POR_DEFECTO, MAX_TURNS,
+    Planta, Herbivoro, Carnivoro, Omnivoro, Pez,
+    crear_ecosistema, poblar_inicial,
+)
+from perfil import Perfilador
+from simulador import Simulador
+from telemetria import ESPECIES, Telemetria
+from grabacion import VELOCIDADES
+from tramas import Receptor, conectar
+
+
+# Vida máxima que representa una barra de vida llena
+VIDA_MAXIMA = {Pez: 1000, Herbivoro: 1250, Carnivoro: 1150, Omnivoro: 1100}
+# Rectángulo (dx, dy, ancho, alto) que cubre el dibujo de una planta en (x, y), trazos incluidos
+CAJA_PLANTA = (-7, -10, 15, 17)
+# Lado de las celdas con que la capa de plantas encuentra las plantas que tocan un rectángulo
+CELDA_PLANTAS = 16
+# Con más cambios que esta fracción de las plantas, la capa se redibuja entera (cada borrado
+# son unas cuantas llamadas al DC; redibujarla, tres llamadas Draw*List)
+CAMBIOS_MAXIMOS = 0.1
+
+class CapaDibujo:
+    """Dibuja el ecosistema con plumas y pinceles creados una sola vez.
+
+    Las entidades se agrupan por especie y cada primitiva se dibuja con una
+    sola llamada Draw*List, así que el número de llamadas al DC y de objetos
+    wx creados por cuadro no depende del número de entidades.
+
+    Las plantas no se mueven: el terreno y las plantas se dibujan en una capa
+    fuera de pantalla que se copia en cada cuadro, y solo los animales se
+    dibujan encima. Con los tramos de plantas nacidas y muertas de la
+    instantánea, la capa se actualiza: cada nacida se estampa encima y cada
+    muerta se borra reponiendo el terreno en su rectángulo y redibujando,
+    recortadas a él, las plantas que lo tocan. Así el coste de un cuadro
+    depende de los animales y de los cambios, no del número de plantas.
+    """
+    def __init__(self, terreno=CONFIG_POR_DEFECTO.terreno):
+        self.fondo = wx.Brush(wx.Colour(34, 139, 34))  # forest green (Bosque)
+        self.mapa = self._mapa_terreno(terreno)
+        # Capa de terreno y plantas; `terreno_capa` es la misma sin plantas, para borrar
+        self.ancho_capa = terreno.ancho_mundo + CAJA_PLANTA[2]
+        self.alto_capa = terreno.alto_mundo + CAJA_PLANTA[3]
+        self.terreno_capa = wx.MemoryDC(wx.Bitmap(self.ancho_capa, self.alto_capa))
+        self.terreno_capa.SetBackground(self.fondo)
+        self.terreno_capa.Clear()
+        self.terreno_capa.DrawBitmap(self.mapa, 0, 0)
+        self.capa_plantas = wx.MemoryDC(wx.Bitmap(self.ancho_capa, self.alto_capa))
+        # Turno de las plantas dibujadas en la capa (None: sin dibujar) y {celda: {(x, y): plantas}}
+        self.turno_plantas = None
+        self.celdas_plantas = {}
+        self.num_plantas = 0
+        self.fuente = wx.Font(8, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD)
+        self.color_texto = wx.Colour(255, 255, 255)
+
+        self.plumas = {
+            "planta": wx.Pen(wx.Colour(0, 128, 0), 2),
+            "pez": wx.Pen(wx.Colour(0, 0, 128), 1),
+            "herbivoro": wx.Pen(wx.Colour(0, 0, 180), 3),
+            "carnivoro": wx.Pen(wx.Colour(0, 0, 0), 3),
+            "garras": wx.Pen(wx.Colour(255, 0, 0), 1),
+            "omnivoro": wx.Pen(wx.Colour(120, 0, 120), 3),
+            "barra": wx.Pen(wx.Colour(0, 0, 0), 1),
+        }
+        self.pinceles = {
+            "flor": wx.Brush(wx.Colour(255, 255, 0)),
+            "hoja": wx.Brush(wx.Colour(0, 128, 0)),
+            "pez": wx.Brush(wx.Colour(255, 105, 180)),
+            "cola": wx.Brush(wx.Colour(139, 0, 0)),
+            "ojo": wx.Brush(wx.Colour(0, 0, 0)),
+            "herbivoro": wx.Brush(wx.Colour(100, 180, 255)),
+            "carnivoro": wx.Brush(wx.Colour(220, 0, 0)),
+            "omnivoro": wx.Brush(wx.Colour(180, 0, 220)),
+            "cresta": wx.Brush(wx.Colour(255, 165, 0)),
+            "barra": wx.Brush(wx.Colour(128, 128, 128)),
+        }
+        # Gráficas de población: un color por especie sobre un recuadro oscuro
+        self.plumas_series = {
+            "plantas": wx.Pen(wx.Colour(255, 255, 0), 1),
+            "herbivoros": wx.Pen(wx.Colour(100, 180, 255), 1),
+            "carnivoros": wx.Pen(wx.Colour(220, 0, 0), 1),
+            "omnivoros": wx.Pen(wx.Colour(180, 0, 220), 1),
+            "peces": wx.Pen(wx.Colour(255, 105, 180), 1),
+        }
+        self.recuadro_series = wx.Brush(wx.Colour(0, 0, 0))
+        self.fuente_perfil = wx.Font(8, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)
+        # Colores de la barra de vida: baja (< 0.3), media (< 0.6) y alta
+        self.salud = (wx.Brush(wx.Colour(255, 0, 0)), wx.Brush(wx.Colour(255, 255, 0)), wx.Brush(wx.Colour(0, 255, 0)))
+
+    @staticmethod
+    def _mapa_terreno(terreno):
+        """Mapa de bits con la tierra, el agua y su orilla, construido una sola vez."""
+        tierra = bytes((34, 139, 34))     # forest green (Bosque)
+        agua = bytes((135, 206, 250))     # Azul claro
+        orilla = bytes((0, 0, 255))       # Borde azul
+        ancho = terreno.ancho
+        filas = [terreno.agua[f * ancho:(f + 1) * ancho] for f in range(terreno.alto)]
+        pixeles = bytearray()
+        for f, fila in enumerate(filas):
+            arriba = filas[f - 1] if f > 0 else fila
+            abajo = filas[f + 1] if f + 1 < len(filas) else fila
+            for c, es_agua in enumerate(fila):
+                if not es_agua:
+                    pixeles += tierra
+                elif ((c > 0 and not fila[c - 1]) or (c + 1 < ancho and not fila[c + 1])
+                        or not arriba[c] or not abajo[c]):
+                    pixeles += orilla
+                else:
+                    pixeles += agua
+        return wx.Bitmap.FromBuffer(ancho, terreno.alto, bytes(pixeles))
+
+    def dibujar(self, dc, estado, turno=None, tramos_plantas=()):
+        """Dibuja fondo, terreno y entidades a partir de {clase: [(x, y, vida), ...]}.
+
+        `turno` y `tramos_plantas` son los de la Instantanea: sin turno la capa
+        de plantas se redibuja entera.
+        """
+        dc.SetBackground(self.fondo)
+        dc.Clear()
+
+        # 1. Terreno (lagos incluidos) y plantas, ya dibujados en la capa
+        self.actualizar_plantas(estado.get(Planta, ()), turno, tramos_plantas)
+        dc.Blit(0, 0, self.ancho_capa, self.alto_capa, self.capa_plantas, 0, 0)
+
+        self._peces(dc, estado.get(Pez, ()))
+        self._herbivoros(dc, estado.get(Herbivoro, ()))
+        self._carnivoros(dc, estado.get(Carnivoro, ()))
+        self._omnivoros(dc, estado.get(Omnivoro, ()))
+        self._barras_vida(dc, estado)
+
+    # --- Capa de plantas ---
+    def actualizar_plantas(self, puntos, turno, tramos=()):
+        """Pone la capa de plantas en `turno`, con los tramos si enlazan con el turno dibujado o desde `puntos` si no."""
+        if turno is not None and turno == self.turno_plantas:
+            return
+        pendientes = None
+        if turno is not None and self.turno_plantas is not None and tramos and tramos[-1][1] == turno:
+            pendientes = next((tramos[k:] for k, tramo in enumerate(tramos) if tramo[0] == self.turno_plantas), None)
+        if pendientes is not None:
+            cambios = sum(len(nacidas) + len(muertas) for _, _, nacidas, muertas in pendientes)
+            if cambios > CAMBIOS_MAXIMOS * max(self.num_plantas, 1):
+                pendientes = None
+        if pendientes is None:
+            self._redibujar_plantas(puntos)
+        else:
+            for _, _, nacidas, muertas in pendientes:
+                self._cambiar_plantas(nacidas, muertas)
+        self.turno_plantas = turno
+
+    def _redibujar_plantas(self, puntos):
+        capa = self.capa_plantas
+        capa.Blit(0, 0, self.ancho_capa, self.alto_capa, self.terreno_capa, 0, 0)
+        self._plantas(capa, puntos)
+        self.celdas_plantas = {}
+        self.num_plantas = 0
+        for x, y, _ in puntos:
+            self._anotar_planta(x, y)
+
+    def _anotar_planta(self, x, y):
+        celda = self.celdas_plantas.setdefault((x // CELDA_PLANTAS, y // CELDA_PLANTAS), {})
+        celda[(x, y)] = celda.get((x, y), 0) + 1
+        self.num_plantas += 1
+
+    def _quitar_planta(self, x, y):
+        """Quita una planta de (x, y) del registro de la capa; False si no había ninguna."""
+        celda = self.celdas_plantas.get((x // CELDA_PLANTAS, y // CELDA_PLANTAS))
+        n = celda.get((x, y)) if celda else None
+        if not n:
+            return False
+        if n > 1:
+            celda[(x, y)] = n - 1
+        else:
+            del celda[(x, y)]
+        self.num_plantas -= 1
+        return True
+
+    def _plantas_en(self, x0, y0, x1, y1):
+        """Plantas (x, y, None) cuyo dibujo toca el rectángulo [x0, x1) x [y0, y1)."""
+        dx, dy, ancho, alto = CAJA_PLANTA
+        # Centros cuyo rectángulo [x + dx, x + dx + ancho) corta [x0, x1)
+        cx0, cx1 = x0 - dx - ancho + 1, x1 - dx - 1
+        cy0, cy1 = y0 - dy - alto + 1, y1 - dy - 1
+        puntos = []
+        for i in range(cx0 // CELDA_PLANTAS, cx1 // CELDA_PLANTAS + 1):
+            for j in range(cy0 // CELDA_PLANTAS, cy1 // CELDA_PLANTAS + 1):
+                # Varias plantas en el mismo punto se dibujan igual que una
+                for x, y in self.celdas_plantas.get((i, j), ()):
+                    if cx0 <= x <= cx1 and cy0 <= y <= cy1:
+                        puntos.append((x, y, None))
+        return puntos
+
+    def _cambiar_plantas(self, nacidas, muertas):
+        """Estampa las plantas nacidas y borra las muertas de la capa."""
+        capa = self.capa_plantas
+        for x, y in nacidas:
+            self._anotar_planta(x, y)
+        self._plantas(capa, [(x, y, None) for x, y in nacidas])
+        dx, dy, ancho, alto = CAJA_PLANTA
+        for x, y in muertas:
+            if not self._quitar_planta(x, y):
+                continue
+            x0, y0 = x + dx, y + dy
+            capa.Blit(x0, y0, ancho, alto, self.terreno_capa, x0, y0)
+            capa.SetClippingRegion(x0, y0, ancho, alto)
+            self._plantas(capa, self._plantas_en(x0, y0, x0 + ancho, y0 + alto))
+            capa.DestroyClippingRegion()
+
+    def _plantas(self, dc, puntos):
+        if not puntos:
+            return
+        dc.SetPen(self.plumas["planta"])
+        dc.DrawLineList([(x, y+5, x, y-5) for x, y, _ in puntos])
+        dc.SetBrush(self.pinceles["flor"])
+        dc.DrawEllipseList([(x-4, y-9, 8, 8) for x, y, _ in puntos])
+        dc.SetBrush(self.pinceles["hoja"])
+        dc.DrawEllipseList([(x-6, y-2, 12, 6) for x, y, _ in puntos])
+
+    def _peces(self, dc, puntos):
+        if not puntos:
+            return
+        dc.SetPen(self.plumas["pez"])
+        dc.SetBrush(self.pinceles["pez"])
+        dc.DrawEllipseList([(x-10, y-5, 20, 10) for x, y, _ in puntos])
+        dc.SetBrush(self.pinceles["cola"])
+        dc.DrawPolygonList([[(x+10, y), (x+18, y-5), (x+18, y+5)] for x, y, _ in puntos])
+        dc.SetBrush(self.pinceles["ojo"])
+        dc.DrawEllipseList([(x-7, y-1, 2, 2) for x, y, _ in puntos])
+
+    def _herbivoros(self, dc, puntos):
+        if not puntos:
+            return
+        dc.SetPen(self.plumas["herbivoro"])
+        dc.SetBrush(self.pinceles["herbivoro"])
+        dc.DrawRectangleList([(x-12, y-6, 24, 12) for x, y, _ in puntos])
+        lineas = []
+        for x, y, _ in puntos:
+            lineas.append((x-12, y, x-20, y-10))
+            lineas.append((x-6, y+6, x-6, y+15))
+            lineas.append((x+6, y+6, x+6, y+15))
+        dc.DrawLineList(lineas)
+        dc.DrawEllipseList([(x-25, y-15, 10, 10) for x, y, _ in puntos])
+
+    def _carnivoros(self, dc, puntos):
+        if not puntos:
+            return
+        dc.SetPen(self.plumas["carnivoro"])
+        dc.SetBrush(self.pinceles["carnivoro"])
+        dc.DrawRectangleList([(x-15, y-7, 30, 14) for x, y, _ in puntos])
+        garras = []
+        patas = []
+        for x, y, _ in puntos:
+            garras.append((x-9, y+2, x-12, y+6))
+            garras.append((x+9, y+2, x+12, y+6))
+            patas.append((x-4, y+7, x-4, y+18))
+            patas.append((x+4, y+7, x+4, y+18))
+        dc.DrawLineList(garras, self.plumas["garras"])
+        dc.DrawLineList(patas)
+
+    def _omnivoros(self, dc, puntos):
+        if not puntos:
+            return
+        dc.SetPen(self.plumas["omnivoro"])
+        dc.SetBrush(self.pinceles["omnivoro"])
+        dc.DrawEllipseList([(x-12, y-7, 24, 14) for x, y, _ in puntos])
+        dc.SetBrush(self.pinceles["cresta"])
+        dc.DrawPolygonList([[(x-3, y-7), (x, y-12), (x+3, y-7)] for x, y, _ in puntos])
+        dc.DrawLineList([(x+12, y, x+18, y) for x, y, _ in puntos])
+
+    def _barras_vida(self, dc, estado):
+        """Barra de vida de todos los animales: un fondo gris y el tramo coloreado según la vida."""
+        bar_full_width = 24
+        bar_height = 5
+        fondos = []
+        tramos = []
+        pinceles = []
+        baja, media, alta = self.salud
+        for cls, max_life in VIDA_MAXIMA.items():
+            for x, y, vida in estado.get(cls, ()):
+                health_ratio = max(0, min(vida, max_life)) / max_life
+                bar_x = x - (bar_full_width // 2)
+                bar_y = y - 25
+                fondos.append((bar_x, bar_y, bar_full_width, bar_height))
+                tramos.append((bar_x, bar_y, int(bar_full_width * health_ratio), bar_height))
+                pinceles.append(baja if health_ratio < 0.3 else media if health_ratio < 0.6 else alta)
+        if not fondos:
+            return
+        dc.SetPen(self.plumas["barra"])
+        dc.SetBrush(self.pinceles["barra"])
+        dc.DrawRectangleList(fondos)
+        dc.DrawRectangleList(tramos, None, pinceles)
+
+    def dibujar_series(self, dc, series, x=5, y=5, ancho=160, alto=50):
+        """Gráficas de línea de la población reciente de cada especie, cada una escalada a su máximo."""
+        if not series or not any(series.values()):
+            return
+        dc.SetPen(self.plumas["barra"])
+        dc.SetBrush(self.recuadro_series)
+        dc.DrawRectangle(x, y, ancho, alto)
+        for especie in ESPECIES:
+            valores = series.get(especie)
+            if not valores or len(valores) < 2:
+                continue
+            maximo = max(max(valores), 1)
+            paso = (ancho - 4) / (len(valores) - 1)
+            dc.SetPen(self.plumas_series[especie])
+            dc.DrawLines([(int(x + 2 + k * paso), int(y + alto - 2 - (alto - 4) * v / maximo))
+                          for k, v in enumerate(valores)])
+
+    def dibujar_perfil(self, dc, lineas, x=300, y=5, alto_linea=11):
+        """Panel con los percentiles del perfilador, una línea de texto por fase."""
+        if not lineas:
+            return
+        dc.SetPen(self.plumas["barra"])
+        dc.SetBrush(self.recuadro_series)
+        dc.DrawRectangle(x, y, 185, alto_linea * len(lineas) + 4)
+        dc.SetFont(self.fuente_perfil)
+        dc.SetTextForeground(self.color_texto)
+        dc.DrawTextList(lineas, [(x + 3, y + 2 + alto_linea * i) for i in range(len(lineas))])
+
+    def dibujar_estado(self, dc, lineas, alto_linea=13):
+        """Dibuja las líneas de la barra de estado; la última queda abajo del todo."""
+        dc.SetFont(self.fuente)
+        dc.SetTextForeground(self.color_texto)
+        y = 390 - alto_linea * (len(lineas) - 1)
+        dc.DrawTextList(lineas, [(5, y + alto_linea * i) for i in range(len(lineas))])
+
+
+TITULO = "Ecosistema Virtual Equilibrado"
+ABREVIATURAS = {"plantas": "Plantas", "herbivoros": "Herbív.", "carnivoros": "Carnív.", "omnivoros": "Omnív.", "peces": "Peces"}
+
+def texto_estadisticas(resumen):
+    """Línea de la barra de estado con un Estadisticas.resumen(): vida media (± desviación), tasas y extinciones."""
+    vidas = ", ".join(f"{ABREVIATURAS[nombre]} {media:.0f}±{desviacion:.0f}"
+                      for nombre, (media, desviacion) in resumen["vida"].items())
+    tasas = resumen["tasas"]
+    texto = (f"Vida: {vidas} | Por turno: {tasas['nacimientos']:.1f} nac., "
+             f"{tasas['muertes']:.1f} muertes, {tasas['cazas']:.2f} cazas")
+    if resumen["extinciones"]:
+        texto += " | Extintos: " + ", ".join(f"{ABREVIATURAS[nombre]} (turno {turno})"
+                                             for nombre, turno in resumen["extinciones"].items())
+    return texto
+
+class VentanaEcosistema:
+    """Ventana que dibuja la última instantánea de `self.fuente` (un Simulador o un tramas.Receptor).
+
+    Las subclases crean la fuente y la CapaDibujo después de llamar a este
+    __init__ (que crea la wx.App) y terminan con mostrar().
+    """
+    def __init__(self):
+        self.app = wx.App()
+        self.ventana = wx.Frame(None, title=TITULO, size=(500, 420))
+        self.panel = wx.Panel(self.ventana, style=wx.WANTS_CHARS)
+        self.panel.Bind(wx.EVT_PAINT, self.on_paint)
+        
+        self.panel.Bind(wx.EVT_KEY_DOWN, self.on_key_down)
+        self.panel.SetFocus()
+        self.mostrar_series = True
+        self.config = CONFIG_POR_DEFECTO
+        self.turnos_max = MAX_TURNS
+
+    def mostrar(self):
+        self.ventana.Bind(wx.EVT_CLOSE, self.on_close)
+        self.actualizar_titulo()
+
+        self.draw_timer = wx.Timer(self.panel)
+        self.panel.Bind(wx.EVT_TIMER, self.on_draw_timer, self.draw_timer)
+        self.draw_timer.Start(16)
+
+        self.ventana.Centre()
+        self.ventana.Show()
+
+    def on_paint(self, event):
+        self.pintar(wx.PaintDC(self.panel))
+
+    def pintar(self, dc):
+        instantanea = self.fuente.instantanea
+        self.capa.dibujar(dc, instantanea.estado, instantanea.turno, instantanea.tramos_plantas)
+        if self.mostrar_series:
+            self.capa.dibujar_series(dc, instantanea.series)
+
+        # Mostrar estado
+        conteos = instantanea.conteos
+        status_text = (
+            f"Turno: {instantanea.turno} / {self.turnos_max} | " 
+            f"Plantas: {conteos['plantas']} | " 
+            f"Herbív.: {conteos['herbivoros']} (Max {self.config.max_herbivoros}) | " # Mostrar límite
+            f"Carnív.: {conteos['carnivoros']} (Max {self.config.max_carnivoros}) | " # Mostrar límite
+            f"Omnív.: {conteos['omnivoros']} (Max <= Herbív.) | " # Mostrar límite
+            f"Peces: {conteos['peces']} (2-10)"
+        )
+        # Las métricas salen de las estadísticas del ecosistema, sin recorrer las entidades
+        lineas = [status_text]
+        if instantanea.resumen:
+            lineas.insert(0, texto_estadisticas(instantanea.resumen))
+        self.capa.dibujar_estado(dc, lineas)
+
+    def on_draw_timer(self, event):
+        self.panel.Refresh()
+
+    def on_key_down(self, event): 
+        codigo = event.GetKeyCode()
+        if codigo == wx.WXK_ESCAPE:
+            self.ventana.Close()
+        elif codigo == ord("G"):
+            # Mostrar u ocultar las gráficas de población
+            self.mostrar_series = not self.mostrar_series
+        elif not self.tecla(codigo):
+            event.Skip()
+
+    def tecla(self, codigo):
+        """Teclas propias de cada ventana; devuelve False si no la ha usado."""
+        return False
+
+    def actualizar_titulo(self):
+        self.ventana.SetTitle(TITULO)
+
+    def on_close(self, event):
+        self.fuente.detener()
+        event.Skip()
+
+    def iniciar(self):
+        self.fuente.iniciar()
+        self.app.MainLoop()
+
+
+class VistaEcosistema(VentanaEcosistema):
+    """Ventana con la simulación en este proceso: velocidad (0-9) y perfilado (P)."""
+    def __init__(self, motor="objetos", semilla=None, plantas="objetos",
+                 reanudar=None, guardar=None, guardar_cada=500, telemetria=None, perfil=None,
+                 grabar=None, cada_clave=250):
+        super().__init__()
+        if reanudar:
+            from punto_control import cargar
+            self.ecosistema = cargar(reanudar)
+        else:
+            self.ecosistema = crear_ecosistema(motor, semilla, plantas=plantas)
+            self.inicializar_entidades()
+        self.config = self.ecosistema.config
+        self.capa = CapaDibujo(self.config.terreno)
+
+        # La simulación corre en su propio hilo; la vista solo lee sus instantáneas
+        guardado = None
+        if guardar:
+            from punto_control import GuardadoPeriodico
+            guardado = GuardadoPeriodico(guardar, guardar_cada)
+        # La telemetría alimenta las gráficas aunque no se guarde en un archivo
+        self.ecosistema.telemetria = Telemetria(telemetria)
+        # Perfilado por fases (tecla P); con `perfil` empieza activo y se exporta al cerrar
+        self.ruta_perfil = perfil
+        self.perfilador = Perfilador()
+        grabador = None
+        if grabar:
+            from grabacion import Grabador
+            grabador = Grabador(grabar, cada_clave)
+        self.simulador = self.fuente = Simulador(self.ecosistema, guardado=guardado, perfil=self.perfilador,
+                                                 grabacion=grabador)
+        if perfil:
+            self.simulador.alternar_perfil()
+        self.mostrar()
+
+    def inicializar_entidades(self):
+        """Inicializa todas las entidades, con poblaciones iniciales más bajas para el equilibrio."""
+        poblar_inicial(self.ecosistema)
+            
+    def on_paint(self, event):
+        inicio = time.perf_counter()
+        dc = wx.PaintDC(self.panel)
+        self.pintar(dc)
+        if self.perfilador.activo:
+            self.capa.dibujar_perfil(dc, self.perfilador.lineas())
+            self.perfilador.registrar_pintado(time.perf_counter() - inicio)
+
+    def tecla(self, codigo):
+        if codigo == ord("0"):
+            # Tan rápido como sea posible; la vista muestra la última instantánea
+            self.simulador.velocidad = None
+            self.actualizar_titulo()
+        elif ord("1") <= codigo <= ord("9"):
+            # 1 = tiempo real (20 turnos/s), N = N veces más rápido
+            self.simulador.velocidad = codigo - ord("0")
+            self.actualizar_titulo()
+        elif codigo == ord("P"):
+            # Activar o desactivar el perfilado y su panel
+            self.simulador.alternar_perfil()
+        else:
+            return False
+        return True
+
+    def actualizar_titulo(self):
+        velocidad = self.simulador.velocidad
+        texto = "máxima" if velocidad is None else f"{velocidad}×"
+        self.ventana.SetTitle(f"{TITULO} - velocidad {texto}")
+
+    def on_close(self, event):
+        self.simulador.detener()
+        if self.ruta_perfil:
+            self.perfilador.exportar(self.ruta_perfil)
+        event.Skip()
+
+
+class VistaRemota(VentanaEcosistema):
+    """Visor de un ecosistema que simula otro proceso (servidor.py), con el mismo dibujo que la vista local."""
+    def __init__(self, host="127.0.0.1", puerto=8765, unix=None):
+        super().__init__()
+        self.direccion = unix or f"{host}:{puerto}"
+        self.receptor = self.fuente = Receptor(conectar(host, puerto, unix))
+        self.config = self.receptor.config
+        self.turnos_max = self.receptor.turnos_max
+        self.capa = CapaDibujo(self.config.terreno)
+        self.conectado = True
+        self.mostrar()
+
+    def on_draw_timer(self, event):
+        if self.conectado and not self.receptor.conectado:
+            # Se conserva el último estado recibido
+            self.conectado = False
+            self.actualizar_titulo()
+        self.panel.Refresh()
+
+    def actualizar_titulo(self):
+        estado = "" if self.conectado else ", desconectado"
+        self.ventana.SetTitle(f"{TITULO} - visor de {self.direccion}{estado}")
+
+
+class VistaReproduccion(VentanaEcosistema):
+    """Reproduce una grabación (grabacion.py) con el mismo dibujo que la vista local.
+
+    Espacio pausa, + y - cambian la velocidad entre 1× y 100×, las flechas
+    saltan 100 turnos (1.000 con Mayús), Inicio y Fin van a los extremos y la
+    barra inferior lleva a cualquier turno.
+    """
+    def __init__(self, ruta, velocidad=1, turno=None):
+        super().__init__()
+        from grabacion import Grabacion, Reproductor
+
+        self.grabacion = Grabacion(ruta)
+        self.reproductor = self.fuente = Reproductor(self.grabacion, velocidad, turno)
+        self.config = self.grabacion.config
+        self.turnos_max = self.grabacion.turnos_max
+        self.capa = CapaDibujo(self.config.terreno)
+
+        turnos = self.grabacion.turnos
+        self.barra = wx.Slider(self.ventana, value=self.reproductor.turno, minValue=turnos[0], maxValue=turnos[-1])
+        self.barra.Bind(wx.EVT_SLIDER, self.on_slider)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.panel, 1, wx.EXPAND)
+        sizer.Add(self.barra, 0, wx.EXPAND)
+        self.ventana.SetSizer(sizer)
+        self.ventana.SetSize((500, 450))
+        self.mostrar()
+
+    def on_slider(self, event):
+        self.reproductor.buscar(self.barra.GetValue())
+        self.panel.SetFocus()
+
+    def on_draw_timer(self, event):
+        self.barra.SetValue(self.reproductor.instantanea.turno)
+        self.panel.Refresh()
+
+    def tecla(self, codigo):
+        reproductor = self.reproductor
+        salto = 1000 if wx.GetKeyState(wx.WXK_SHIFT) else 100
+        if codigo == wx.WXK_SPACE:
+            reproductor.alternar_pausa()
+        elif codigo in (ord("+"), wx.WXK_NUMPAD_ADD, ord("=")):
+            reproductor.velocidad = next((v for v in VELOCIDADES if v > reproductor.velocidad), VELOCIDADES[-1])
+        elif codigo in (ord("-"), wx.WXK_NUMPAD_SUBTRACT):
+            reproductor.velocidad = next((v for v in reversed(VELOCIDADES) if v < reproductor.velocidad),
+                                         VELOCIDADES[0])
+        elif codigo == wx.WXK_RIGHT:
+            reproductor.buscar(reproductor.instantanea.turno + salto)
+        elif codigo == wx.WXK_LEFT:
+            reproductor.buscar(reproductor.instantanea.turno - salto)
+        elif codigo == wx.WXK_HOME:
+            reproductor.buscar(self.grabacion.turnos[0])
+        elif codigo == wx.WXK_END:
+            reproductor.buscar(self.grabacion.turnos[-1])
+        else:
+            return False
+        self.actualizar_titulo()
+        return True
+
+    def actualizar_titulo(self):
+        estado = ", en pausa" if self.reproductor.pausado else ""
+        self.ventana.SetTitle(f"{TITULO} - reproducción {self.reproductor.velocidad}×{estado}")
+
+    def on_close(self, event):
+        self.reproductor.detener()
+        self.grabacion.cerrar()
+        event.Skip()